@@ -0,0 +1,42 @@
+# backend/src/config/caching.py
+"""
+Coerência dos caches entre workers.
+
+Os carimbos de versão (perfis, timelines) e os fragmentos guardados sob eles
+só são corretos se todo worker lê e grava no mesmo cache: um carimbo trocado
+em um processo precisa ser visto pelos outros. O LocMemCache é por processo,
+então com mais de um worker (WEB_CONCURRENCY, o mesmo valor que o gunicorn lê)
+cada um teria a sua versão e serviria fragmentos velhos.
+
+Nesse caso o cache em questão é tratado como ausente (`is_shared` devolve
+False) e o system check avisa que é preciso um backend compartilhado (Redis,
+Memcached, DatabaseCache).
+"""
+from django.conf import settings
+from django.core import checks
+
+PROCESS_LOCAL_BACKENDS = {'django.core.cache.backends.locmem.LocMemCache'}
+
+
+def get_web_concurrency():
+    return getattr(settings, 'WEB_CONCURRENCY', 1)
+
+
+def is_process_local(alias):
+    return settings.CACHES[alias]['BACKEND'] in PROCESS_LOCAL_BACKENDS
+
+
+def is_shared(alias):
+    """Se todos os workers enxergam o mesmo conteúdo no cache `alias`."""
+    return get_web_concurrency() <= 1 or not is_process_local(alias)
+
+
+def check_shared_cache(alias, setting, purpose):
+    if is_shared(alias):
+        return []
+    return [checks.Warning(
+        f'{setting}="{alias}" usa um cache por processo ({settings.CACHES[alias]["BACKEND"]}) '
+        f'com WEB_CONCURRENCY={get_web_concurrency()}; {purpose} fica desligado.',
+        hint='Configure CACHE_BACKEND com um cache compartilhado (Redis, Memcached ou DatabaseCache).',
+        id='config.W001',
+    )]
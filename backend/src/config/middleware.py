@@ -0,0 +1,91 @@
+# backend/src/config/middleware.py
+"""
+Instrumentação de SQL por requisição, ligada por SQL_INSTRUMENTATION.
+
+Cada consulta executada durante a requisição passa por um execute_wrapper que
+mede o tempo e guarda a "forma" da consulta (o SQL sem parâmetros, com as
+listas IN colapsadas). Ao final, a resposta ganha um cabeçalho Server-Timing
+e é emitido um log estruturado (JSON) com contagem, tempo total, duplicatas,
+a consulta mais lenta e as formas repetidas além do limite — o padrão de
+N+1 de SerializerMethodFields que consultam o banco por item.
+"""
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('sql_instrumentation')
+
+IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+NUMBER = re.compile(r'\b\d+\b')
+
+
+def fingerprint(sql):
+    """Forma da consulta: parâmetros fora, listas IN de qualquer tamanho iguais."""
+    return NUMBER.sub('?', IN_LIST.sub('IN (...)', sql))
+
+
+class QueryRecorder:
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.queries.append((sql, repr(params), duration, context['connection'].alias))
+
+    def summary(self, threshold):
+        shapes = Counter(fingerprint(sql) for sql, _, _, _ in self.queries)
+        exact = Counter((sql, params) for sql, params, _, _ in self.queries)
+        slowest = max(self.queries, key=lambda query: query[2], default=None)
+        return {
+            'queries': len(self.queries),
+            'db_ms': round(sum(query[2] for query in self.queries) * 1000, 2),
+            'duplicates': sum(count - 1 for count in exact.values() if count > 1),
+            'slowest': {'sql': slowest[0], 'ms': round(slowest[2] * 1000, 2), 'alias': slowest[3]} if slowest else None,
+            'n_plus_one': [
+                {'sql': shape, 'count': count} for shape, count in shapes.most_common() if count >= threshold
+            ],
+        }
+
+
+class SQLInstrumentationMiddleware:
+    """Registra as consultas de cada requisição e publica o resumo (ver o docstring do módulo)."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SQL_INSTRUMENTATION', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = getattr(settings, 'SQL_INSTRUMENTATION_N_PLUS_ONE_THRESHOLD', 5)
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+
+        summary = recorder.summary(self.threshold)
+        response['Server-Timing'] = self.server_timing(summary)
+        record = {'method': request.method, 'path': request.path, 'status': response.status_code, **summary}
+        level = logging.WARNING if summary['n_plus_one'] else logging.INFO
+        logger.log(level, json.dumps(record), extra={'sql_summary': record})
+        return response
+
+    def server_timing(self, summary):
+        metrics = [f'db;dur={summary["db_ms"]};desc="{summary["queries"]} queries"']
+        if summary['slowest']:
+            metrics.append(f'db-slowest;dur={summary["slowest"]["ms"]}')
+        if summary['n_plus_one']:
+            metrics.append(f'db-n-plus-one;desc="{len(summary["n_plus_one"])} suspect(s)"')
+        return ', '.join(metrics)
@@ -29,6 +29,11 @@ ALLOWED_HOSTS = os.environ.get(
 ).split(',')
 
 
+# Atrás do proxy TLS do Render: o esquema original vem em X-Forwarded-Proto, e
+# os links absolutos (paginação, mídia) saem com https://
+SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
+
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -58,6 +63,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "config.middleware.SQLInstrumentationMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -90,6 +96,29 @@ DATABASES = {
 }
 
 
+# Cache (LocMem por padrão; CACHE_BACKEND/CACHE_LOCATION permitem, por exemplo,
+# django.core.cache.backends.redis.RedisCache em produção). O LocMem é por
+# processo: com mais de um worker, os caches de perfis e de posts precisam de
+# um backend compartilhado (Redis, Memcached, DatabaseCache), senão ficam
+# desligados (ver config/caching.py).
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        "LOCATION": os.environ.get('CACHE_LOCATION', 'twitter-clone'),
+    }
+}
+
+# Workers do gunicorn (o gunicorn lê a mesma variável como padrão de --workers)
+WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', 1))
+
+# Cache de respostas de posts (ver posts/response_cache.py)
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', 300))
+# Carimbos de versão e cache de perfis (ver users/profile_cache.py)
+PROFILE_CACHE_ALIAS = 'default'
+PROFILE_CACHE_TIMEOUT = int(os.environ.get('PROFILE_CACHE_TIMEOUT', 3600))
+
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     { "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator", },
@@ -112,9 +141,6 @@ STATIC_URL = "/static/"
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles') # Render ou collectstatic irá coletar aqui
 STATICFILES_DIRS = [] # Opcional: para pastas estáticas que não estão em apps
 
-# NOVO: Armazenamento de arquivos estáticos para Whitenoise
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
-
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
@@ -128,6 +154,71 @@ REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 
+# Paginação por cursor das timelines (ver posts/pagination.py)
+TIMELINE_PAGE_SIZE = int(os.environ.get('TIMELINE_PAGE_SIZE', 20))
+TIMELINE_MAX_PAGE_SIZE = 100
+
+# Máximo de ids aceitos por POST /api/posts/state/
+POST_STATE_MAX_IDS = 300
+
+# Timeline "Seguindo" materializada (ver posts/timeline.py). Rodar
+# `trim_timelines` periodicamente (ex.: cron a cada 10 minutos)
+HOME_TIMELINE_MAX_LENGTH = int(os.environ.get('HOME_TIMELINE_MAX_LENGTH', 800))
+TIMELINE_FANOUT_BATCH_SIZE = 1000
+
+# Autores com pelo menos esse número de seguidores não fazem fan-out: seus posts
+# ficam em um ring buffer no cache e são mesclados na leitura (posts/feed_engine.py)
+TIMELINE_PULL_FOLLOWER_THRESHOLD = int(os.environ.get('TIMELINE_PULL_FOLLOWER_THRESHOLD', 10000))
+AUTHOR_BUFFER_SIZE = 200
+AUTHOR_BUFFER_TIMEOUT = 60 * 60 * 24
+
+# Lote do comando `reconcile_counters` (rodar periodicamente, ex.: cron a cada hora)
+COUNTER_RECONCILE_BATCH_SIZE = 1000
+
+# Contadores quentes (write-behind em shards, ver posts/sharded_counters.py).
+# Rodar `flush_counters` periodicamente (ex.: cron a cada minuto).
+HOT_COUNTER_THRESHOLD = int(os.environ.get('HOT_COUNTER_THRESHOLD', 1000))
+COUNTER_SHARDS = 16
+COUNTER_FLUSH_BATCH_SIZE = 500
+
+# Instrumentação de SQL por requisição (ver config/middleware.py): cabeçalho
+# Server-Timing e log JSON no logger "sql_instrumentation"
+SQL_INSTRUMENTATION = os.environ.get('SQL_INSTRUMENTATION', 'False') == 'True'
+SQL_INSTRUMENTATION_N_PLUS_ONE_THRESHOLD = 5
+
+# Sugestões de "quem seguir" (ver users/suggestions.py).
+# Rodar `compute_suggestions` periodicamente (ex.: cron diário).
+FOLLOW_SUGGESTIONS_TOP_K = int(os.environ.get('FOLLOW_SUGGESTIONS_TOP_K', 50))
+FOLLOW_SUGGESTIONS_BATCH_SIZE = 500
+FOLLOW_SUGGESTIONS_POPULAR_POOL = 200
+FOLLOW_SUGGESTIONS_ENGAGEMENT_DAYS = 7
+
+# Autocompletar de usuários (ver users/typeahead.py). Rodar
+# `rebuild_typeahead_index --ranks` periodicamente (ex.: cron a cada hora)
+TYPEAHEAD_MAX_RESULTS = 10
+
+# Trending topics (ver posts/trends.py). Manter `run_trends` rodando como
+# processo à parte; ele publica um snapshot a cada TRENDS_SNAPSHOT_INTERVAL s
+TRENDS_WINDOW_MINUTES = int(os.environ.get('TRENDS_WINDOW_MINUTES', 360))
+TRENDS_BUCKET_MINUTES = 10
+TRENDS_CAPACITY = 1000
+TRENDS_SIZE = 10
+TRENDS_SNAPSHOT_INTERVAL = int(os.environ.get('TRENDS_SNAPSHOT_INTERVAL', 60))
+# Cada leitura recomeça este tanto antes da anterior: cobre usos gravados em
+# transações que fizeram commit depois de outras mais novas
+TRENDS_CONSUME_OVERLAP_SECONDS = 60
+
+# Variantes das imagens de posts (ver posts/images.py): processos do pool;
+# 0 processa na própria requisição
+IMAGE_PROCESSING_WORKERS = int(os.environ.get('IMAGE_PROCESSING_WORKERS', 2))
+
+# Uploads em partes (ver posts/uploads.py); os arquivos em andamento ficam fora
+# do MEDIA_ROOT. Rodar `purge_uploads` periodicamente (ex.: cron a cada hora)
+CHUNKED_UPLOAD_DIR = os.environ.get('CHUNKED_UPLOAD_DIR', os.path.join(BASE_DIR, 'chunked_uploads'))
+CHUNKED_UPLOAD_MAX_SIZE = 20 * 1024 * 1024
+CHUNKED_UPLOAD_MAX_CHUNK_SIZE = 4 * 1024 * 1024
+CHUNKED_UPLOAD_EXPIRY_HOURS = 24
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=7), # OK para dev
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -155,4 +246,29 @@ CSRF_TRUSTED_ORIGINS = [
 # Você deve usar um serviço de armazenamento de objetos (como AWS S3, Google Cloud Storage)
 # Para um MVP no Render, pode haver um volume persistente, mas não é a prática mais escalável.
 MEDIA_URL = '/media/'
-MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
\ No newline at end of file
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Mídia endereçada por conteúdo e deduplicada (ver posts/storage.py); os bytes
+# ficam no MEDIA_ROOT ou, com MEDIA_OBJECT_STORE=s3, em um bucket compatível
+# com S3 (requer boto3). `collect_media` varre arquivos sem referências.
+# Estáticos comprimidos e com hash no nome, servidos pelo Whitenoise
+# (exige `collectstatic` antes de rodar com DEBUG=False)
+STORAGES = {
+    'default': {'BACKEND': 'posts.storage.ContentAddressedStorage'},
+    'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'},
+}
+MEDIA_OBJECT_STORE = os.environ.get('MEDIA_OBJECT_STORE', 'filesystem')
+MEDIA_S3_BUCKET = os.environ.get('MEDIA_S3_BUCKET', '')
+MEDIA_S3_ENDPOINT_URL = os.environ.get('MEDIA_S3_ENDPOINT_URL', '')
+# URL pública dos objetos (ex.: CDN na frente do bucket); padrão: MEDIA_URL
+MEDIA_OBJECT_BASE_URL = os.environ.get('MEDIA_OBJECT_BASE_URL', '')
+# Idade mínima de um objeto sem MediaBlob para `collect_media` apagá-lo
+MEDIA_ORPHAN_GRACE_HOURS = 24
+
+# Entrega de MEDIA_URL (ver posts/media.py): com o proxy configurado, os bytes
+# não passam pelo Python. 'x-accel-redirect' (nginx, location `internal` em
+# MEDIA_ACCEL_REDIRECT_PREFIX) ou 'x-sendfile'; vazio transmite pelo Django
+MEDIA_SENDFILE_BACKEND = os.environ.get('MEDIA_SENDFILE_BACKEND', '')
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get('MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+# Cache dos nomes antigos (post_images/…); os endereçados por conteúdo são imutáveis
+MEDIA_CACHE_MAX_AGE = 3600
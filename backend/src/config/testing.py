@@ -0,0 +1,26 @@
+# backend/src/config/testing.py
+"""
+Base dos testes que passam pelo cache.
+
+Os testes usam o mesmo backend do padrão (LocMem), não um DummyCache, para que
+os caminhos com cache (fragmentos de posts, perfis, carimbos de versão) sejam
+exercitados. Cada teste começa com os caches vazios: os ids se repetem entre
+os casos, e um fragmento do teste anterior vazaria para o seguinte. O
+override também garante que um CACHE_BACKEND do ambiente (ex.: um Redis
+compartilhado) nunca seja esvaziado pela suíte.
+"""
+from django.core.cache import caches
+from django.test import override_settings
+from rest_framework import test
+
+TEST_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests'}}
+
+
+@override_settings(CACHES=TEST_CACHES)
+class APITestCase(test.APITestCase):
+
+    def _pre_setup(self):
+        super()._pre_setup()
+        # Antes do setUp de cada teste, que muitas subclasses sobrescrevem sem super()
+        for cache in caches.all():
+            cache.clear()
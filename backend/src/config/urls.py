@@ -8,16 +8,18 @@ from rest_framework_simplejwt.views import (
     TokenRefreshView
 )
 from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
+from posts.media import serve_media
+from posts.views import TrendsView
 
 
 from django.conf import settings
-from django.conf.urls.static import static
 
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path('api/', include('users.urls')), # Isso inclui o seu 'login/' customizado
     path('api/posts/', include('posts.urls')), # ADICIONADO: Inclui as URLs do seu app posts
+    path('api/trends/', TrendsView.as_view(), name='trends'),
 
     # Apenas a URL para refresh do token é necessária
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
@@ -27,6 +29,9 @@ urlpatterns = [
 
 ]
 
-# Servir arquivos de mídia em desenvolvimento (NÃO USAR EM PRODUÇÃO)
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+# Arquivos de mídia, também em produção: com MEDIA_SENDFILE_BACKEND os bytes
+# saem do proxy (ver posts/media.py). Com MEDIA_URL absoluta (CDN), não há rota
+if settings.MEDIA_URL.startswith('/'):
+    urlpatterns += [
+        path(f'{settings.MEDIA_URL.lstrip("/")}<path:path>', serve_media, name='media'),
+    ]
\ No newline at end of file
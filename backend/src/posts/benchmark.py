@@ -0,0 +1,374 @@
+# backend/src/posts/benchmark.py
+"""
+Benchmark de latência dos endpoints (`benchmark_endpoints`).
+
+Dispara requisições contra as URLs reais (config/urls.py), em processo pelo
+Client de teste do Django ou contra um servidor local via HTTP, com N threads
+em paralelo. Cada cenário (timelines, perfil, busca, autocompletar, trends,
+follow, like, comentário) roda separado e reporta vazão, latências
+p50/p95/p99 e consultas por requisição. O resultado vai para um JSON que
+pode ser comparado com o de outro commit.
+
+Em processo, as consultas são contadas com um execute_wrapper; via HTTP, são
+lidas do cabeçalho Server-Timing (SQL_INSTRUMENTATION ligado no servidor).
+
+Os cenários de escrita desfazem o que fazem, fora da medição, para que a
+próxima execução meça a mesma base: like/follow escolhem um alvo ainda não
+curtido/seguido e desfazem logo depois; unlike/unfollow criam antes o estado
+que vão remover; os comentários (sem endpoint de remoção) são apagados pelo
+ORM ao fim do cenário, com o comments_count corrigido. O follow descarta a
+sugestão correspondente (FollowSuggestion), que só volta no próximo
+`compute_suggestions`.
+"""
+import json
+import logging
+import math
+import random
+import re
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from django.db import connections
+from django.db.models import F
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from users.models import Follow, User
+from . import response_cache
+from .models import Comment, Like, Post
+from .seed_graph import WORDS
+
+SERVER_TIMING_QUERIES = re.compile(r'db;[^,]*desc="(\d+) queries"')
+BENCHMARK_COMMENT = 'Comentário de benchmark.'
+
+
+@dataclass
+class Call:
+    url: str
+    data: dict = None
+    setup: tuple = ()  # (método, url) fora da medição, antes da chamada
+    undo: tuple = ()  # (método, url) fora da medição, depois: devolve a base ao estado anterior
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    build: object  # build(rng, dataset, viewer_id) -> Call
+    authenticated: bool = True
+    cleanup: object = None  # cleanup(dataset, started_at), ao fim do cenário
+    # Status >= 400 que o cenário espera e que não contam como erro
+    expected_statuses: tuple = ()
+
+
+def _post(dataset, rng):
+    return rng.choice(dataset['post_ids'])
+
+
+def _user(dataset, rng):
+    return rng.choice(dataset['usernames'])
+
+
+def _post_not_liked(dataset, rng, viewer_id):
+    liked = set(Like.objects.filter(user_id=viewer_id, post_id__in=dataset['post_ids']).values_list('post_id', flat=True))
+    candidates = [post_id for post_id in dataset['post_ids'] if post_id not in liked]
+    if not candidates:
+        raise ValueError(f'O viewer {viewer_id} já curtiu todos os posts da amostra.')
+    return rng.choice(candidates)
+
+
+def _user_not_followed(dataset, rng, viewer_id):
+    followed = set(Follow.objects.filter(
+        follower_id=viewer_id, following_id__in=dataset['user_ids']
+    ).values_list('following_id', flat=True))
+    candidates = [user_id for user_id in dataset['user_ids'] if user_id not in followed and user_id != viewer_id]
+    if not candidates:
+        raise ValueError(f'O viewer {viewer_id} já segue todos os usuários da amostra.')
+    return rng.choice(candidates)
+
+
+def _like(rng, ds, viewer_id):
+    url = reverse('post-like', args=[_post_not_liked(ds, rng, viewer_id)])
+    return Call(url, undo=(('DELETE', url),))
+
+
+def _unlike(rng, ds, viewer_id):
+    url = reverse('post-like', args=[_post_not_liked(ds, rng, viewer_id)])
+    return Call(url, setup=(('PUT', url),))
+
+
+def _follow(rng, ds, viewer_id):
+    user_id = _user_not_followed(ds, rng, viewer_id)
+    return Call(reverse('follow-user', args=[user_id]), undo=(('DELETE', reverse('unfollow-user', args=[user_id])),))
+
+
+def _unfollow(rng, ds, viewer_id):
+    user_id = _user_not_followed(ds, rng, viewer_id)
+    return Call(reverse('unfollow-user', args=[user_id]), setup=(('POST', reverse('follow-user', args=[user_id])),))
+
+
+def delete_benchmark_comments(dataset, since):
+    """Apaga os comentários do cenário `comment` e desconta-os do comments_count."""
+    comments = Comment.objects.filter(
+        author_id__in=dataset['viewer_ids'], content=BENCHMARK_COMMENT, created_at__gte=since
+    )
+    per_post = Counter(comments.values_list('post_id', flat=True))
+    comments.delete()
+    for post_id, count in per_post.items():
+        Post.objects.filter(pk=post_id).update(comments_count=F('comments_count') - count)
+        response_cache.invalidate_post(post_id)
+
+
+SCENARIOS = [
+    Scenario('timeline_global', 'GET', lambda rng, ds, viewer: Call(reverse('post-list-create')), authenticated=False),
+    Scenario('timeline_home', 'GET', lambda rng, ds, viewer: Call(reverse('post-following-list'))),
+    Scenario('timeline_user', 'GET', lambda rng, ds, viewer: Call(reverse('user-post-list', args=[_user(ds, rng)]))),
+    Scenario('profile', 'GET', lambda rng, ds, viewer: Call(reverse('user-detail', args=[_user(ds, rng)]))),
+    Scenario('me', 'GET', lambda rng, ds, viewer: Call(reverse('me'))),
+    Scenario('typeahead', 'GET', lambda rng, ds, viewer: Call(f"{reverse('user-typeahead')}?q={_user(ds, rng)[:3]}")),
+    Scenario('followers', 'GET', lambda rng, ds, viewer: Call(reverse('user-followers-list', args=[_user(ds, rng)]))),
+    Scenario('post_detail', 'GET', lambda rng, ds, viewer: Call(reverse('post-detail', args=[_post(ds, rng)]))),
+    Scenario('search', 'GET', lambda rng, ds, viewer: Call(f"{reverse('post-search')}?q={rng.choice(WORDS)}"), authenticated=False),
+    Scenario('trends', 'GET', lambda rng, ds, viewer: Call(reverse('trends')), authenticated=False),
+    Scenario('comments', 'GET', lambda rng, ds, viewer: Call(reverse('comment-list-create', args=[_post(ds, rng)]))),
+    Scenario('like', 'PUT', _like),
+    Scenario('unlike', 'DELETE', _unlike),
+    # Com dois threads no mesmo viewer, o mesmo alvo pode já estar seguido (409) ou não (404)
+    Scenario('follow', 'POST', _follow, expected_statuses=(409,)),
+    Scenario('unfollow', 'DELETE', _unfollow, expected_statuses=(404,)),
+    Scenario('comment', 'POST', lambda rng, ds, viewer: Call(
+        reverse('comment-list-create', args=[_post(ds, rng)]), {'content': BENCHMARK_COMMENT}
+    ), cleanup=delete_benchmark_comments),
+]
+
+
+def load_dataset(rng, viewers, sample_size):
+    """Amostra (determinística pela seed) de usuários, posts e viewers com tokens JWT."""
+    user_ids = list(User.objects.order_by('id').values_list('id', flat=True))
+    if len(user_ids) < 2 or not Post.objects.exists():
+        raise ValueError('Base sem dados suficientes; rode `seed_social_graph` antes.')
+    sample_ids = rng.sample(user_ids, min(sample_size, len(user_ids)))
+    usernames = list(User.objects.filter(id__in=sample_ids).order_by('id').values_list('username', flat=True))
+
+    # Posts sorteados por faixa de id, sem ORDER BY RANDOM()
+    max_post = Post.objects.order_by('-id').values_list('id', flat=True).first()
+    post_ids = set()
+    for start in rng.sample(range(1, max_post + 1), min(sample_size, max_post)):
+        post_id = Post.objects.filter(id__gte=start).order_by('id').values_list('id', flat=True).first()
+        if post_id:
+            post_ids.add(post_id)
+
+    # Viewers com follows, para que a timeline "Seguindo" tenha conteúdo
+    followers = list(Follow.objects.order_by().values_list('follower_id', flat=True).distinct()[:viewers * 10])
+    viewer_ids = rng.sample(followers, min(viewers, len(followers))) or rng.sample(user_ids, min(viewers, len(user_ids)))
+    viewers = list(User.objects.filter(id__in=viewer_ids).order_by('id'))
+    return {
+        'user_ids': sample_ids,
+        'usernames': usernames,
+        'post_ids': sorted(post_ids),
+        'viewer_ids': [user.id for user in viewers],
+        'tokens': [str(RefreshToken.for_user(user).access_token) for user in viewers],
+    }
+
+
+# --- Transportes ---
+
+class InProcessTransport:
+    """Client de teste do Django: mesmo processo, consultas contadas por thread."""
+    name = 'in-process'
+
+    def __init__(self):
+        self.local = threading.local()
+
+    def _client(self):
+        if not hasattr(self.local, 'client'):
+            self.local.client = Client(HTTP_HOST='localhost')
+        return self.local.client
+
+    def request(self, method, url, data, token):
+        counter = [0]
+
+        def count(execute, sql, params, many, context):
+            counter[0] += 1
+            return execute(sql, params, many, context)
+
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+        start = time.perf_counter()
+        with connections['default'].execute_wrapper(count):
+            response = getattr(self._client(), method.lower())(
+                url, data=json.dumps(data) if data else None, content_type='application/json', **headers
+            )
+        return time.perf_counter() - start, response.status_code, counter[0]
+
+
+class HTTPTransport:
+    """Servidor local via HTTP; consultas lidas do Server-Timing, se houver."""
+    name = 'http'
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, method, url, data, token):
+        body = json.dumps(data).encode() if data else None
+        request = urllib.request.Request(self.base_url + url, data=body, method=method)
+        request.add_header('Content-Type', 'application/json')
+        if token:
+            request.add_header('Authorization', f'Bearer {token}')
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                status, timing = response.status, response.headers.get('Server-Timing', '')
+        except urllib.error.HTTPError as error:
+            status, timing = error.code, error.headers.get('Server-Timing', '')
+        elapsed = time.perf_counter() - start
+        match = SERVER_TIMING_QUERIES.search(timing)
+        return elapsed, status, int(match.group(1)) if match else None
+
+
+# --- Execução e relatório ---
+
+def percentile(sorted_values, fraction):
+    """Percentil por posto mais próximo."""
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, math.ceil(fraction * len(sorted_values)) - 1)]
+
+
+def _round(value):
+    return round(value, 2) if value is not None else None
+
+
+def summarize(samples, wall_time, expected_statuses=()):
+    """Resumo das amostras (latência, status, consultas); sem amostras, as latências ficam None."""
+    latencies = sorted(sample[0] * 1000 for sample in samples)
+    queries = [sample[2] for sample in samples if sample[2] is not None]
+    errors = sum(1 for sample in samples if sample[1] >= 400 and sample[1] not in expected_statuses)
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'throughput_rps': round(len(samples) / wall_time, 2) if wall_time and samples else None,
+        'latency_ms': {
+            'p50': _round(percentile(latencies, 0.50)),
+            'p95': _round(percentile(latencies, 0.95)),
+            'p99': _round(percentile(latencies, 0.99)),
+            'mean': _round(sum(latencies) / len(latencies) if latencies else None),
+            'max': _round(latencies[-1] if latencies else None),
+        },
+        'queries': {
+            'mean': round(sum(queries) / len(queries), 2) if queries else None,
+            'max': max(queries) if queries else None,
+        },
+    }
+
+
+def run_scenario(scenario, transport, dataset, requests, concurrency, seed):
+    """
+    Roda `requests` chamadas do cenário em `concurrency` threads; retorna o resumo.
+    Só a chamada do cenário é medida; o preparo e o desfazer de cada uma rodam
+    na mesma thread, antes e depois dela.
+    """
+    rng = random.Random(f'{seed}:{scenario.name}')
+    calls = []
+    for index in range(requests):
+        viewer = index % len(dataset['tokens'])
+        call = scenario.build(rng, dataset, dataset['viewer_ids'][viewer])
+        token = dataset['tokens'][viewer] if scenario.authenticated else None
+        calls.append((call, token))
+
+    def perform(call, token):
+        for method, url in call.setup:
+            transport.request(method, url, None, token)
+        try:
+            return transport.request(scenario.method, call.url, call.data, token)
+        finally:
+            for method, url in call.undo:
+                transport.request(method, url, None, token)
+
+    def worker(chunk):
+        try:
+            return [perform(*call) for call in chunk]
+        finally:
+            # Cada thread abriu a própria conexão com o banco
+            connections.close_all()
+
+    # Com preparo/desfazer, a vazão dos cenários de escrita conta também essas chamadas
+    started_at = timezone.now()
+    start = time.perf_counter()
+    try:
+        if concurrency == 1:
+            samples = [perform(*call) for call in calls]
+        else:
+            chunks = [calls[index::concurrency] for index in range(concurrency)]
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                samples = [sample for chunk_samples in pool.map(worker, chunks) for sample in chunk_samples]
+        wall_time = time.perf_counter() - start
+    finally:
+        if scenario.cleanup:
+            scenario.cleanup(dataset, started_at)
+    return summarize(samples, wall_time, scenario.expected_statuses)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(transport, scenario_names=None, requests=200, concurrency=4, viewers=20, seed=42, warmup=10):
+    rng = random.Random(seed)
+    dataset = load_dataset(rng, viewers, sample_size=200)
+    scenarios = [scenario for scenario in SCENARIOS if not scenario_names or scenario.name in scenario_names]
+
+    results = {}
+    # 404/409 são esperados (ex.: unfollow de quem não é seguido); não poluem a saída
+    request_logger = logging.getLogger('django.request')
+    level = request_logger.level
+    request_logger.setLevel(logging.ERROR)
+    try:
+        for scenario in scenarios:
+            if warmup:
+                run_scenario(scenario, transport, dataset, warmup, 1, f'{seed}:warmup')
+            results[scenario.name] = run_scenario(scenario, transport, dataset, requests, concurrency, seed)
+    finally:
+        request_logger.setLevel(level)
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': timezone.now().isoformat(),
+            'transport': transport.name,
+            'requests': requests,
+            'concurrency': concurrency,
+            'seed': seed,
+            'dataset': {
+                'users': User.objects.count(),
+                'posts': Post.objects.count(),
+                'follows': Follow.objects.count(),
+            },
+        },
+        'endpoints': results,
+    }
+
+
+def compare(current, baseline):
+    """Variação de p95 e de consultas médias por endpoint em relação a `baseline`."""
+    rows = []
+    for name, result in current['endpoints'].items():
+        before = baseline.get('endpoints', {}).get(name)
+        if not before:
+            continue
+        p95, old_p95 = result['latency_ms']['p95'], before['latency_ms']['p95']
+        change = (p95 - old_p95) / old_p95 * 100 if old_p95 and p95 is not None else None
+        rows.append((name, old_p95, p95, change, before['queries']['mean'], result['queries']['mean']))
+    return rows
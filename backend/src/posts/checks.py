@@ -0,0 +1,21 @@
+# backend/src/posts/checks.py
+from django.conf import settings
+from django.core import checks
+
+from config.caching import check_shared_cache
+
+
+@checks.register(checks.Tags.caches)
+def check_response_cache(app_configs, **kwargs):
+    return check_shared_cache(
+        getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default'), 'RESPONSE_CACHE_ALIAS',
+        'o cache de fragmentos e páginas de posts',
+    )
+
+
+@checks.register(checks.Tags.caches)
+def check_author_buffer_cache(app_configs, **kwargs):
+    return check_shared_cache(
+        getattr(settings, 'AUTHOR_BUFFER_CACHE', 'default'), 'AUTHOR_BUFFER_CACHE',
+        'o buffer de posts recentes dos autores "pull" do feed "Seguindo"',
+    )
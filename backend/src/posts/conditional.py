@@ -0,0 +1,61 @@
+# backend/src/posts/conditional.py
+"""
+Validadores de GET condicional (ETag / Last-Modified) para o feed "Seguindo".
+
+A página pedida é resolvida só até os ids (timeline materializada + buffers),
+e os contadores, datas e o like do viewer vêm de uma única consulta indexada
+por id. Nada é serializado; se o cliente já tem a página, a resposta é 304.
+Numa resposta 200, a view reaproveita a página resolvida aqui
+(`request._home_feed_page`) em vez de consultar o feed de novo.
+
+Só há ETag: o Last-Modified seria o maior instante dos posts da página, que
+volta no tempo quando o post mais recente é apagado, e um If-Modified-Since
+responderia 304 para uma página que mudou. Sem cache compartilhado entre os
+workers (users.versioning.is_enabled), não há validadores.
+"""
+from django.db.models import Exists, OuterRef
+
+from users.conditional import make_etag
+from users.versioning import get_profile_versions, is_enabled
+from .feed_engine import HomeFeed
+from .models import Like, Post
+from .pagination import MergedTimelinePagination
+from .sharded_counters import POST_LIKES
+
+
+def home_feed_validators(request):
+    cached = getattr(request, '_home_feed_validators', None)
+    if cached is not None:
+        return cached
+
+    if not is_enabled():
+        cached = request._home_feed_validators = (None, None)
+        return cached
+
+    viewer = request.user
+    paginator = MergedTimelinePagination()
+    entries = paginator.paginate_queryset(HomeFeed(viewer), request)
+    request._home_feed_page = (paginator, entries)
+    post_ids = [entry.post_id for entry in entries]
+    posts = (
+        Post.objects.filter(id__in=post_ids)
+        .only('id', 'user_id', 'likes_count', 'comments_count', 'reposts_count', 'created_at', 'updated_at')
+        .annotate(liked=Exists(Like.objects.filter(user=viewer, post_id=OuterRef('pk'))))
+        .order_by()
+        .in_bulk()
+    )
+    # Na ordem da página, sem pedir ao banco uma ordenação que o índice por id não cobre
+    posts = [posts[post_id] for post_id in post_ids if post_id in posts]
+    pending = POST_LIKES.pending_for(posts)
+    versions = get_profile_versions({post.user_id for post in posts} | {viewer.pk})
+
+    etag = make_etag(
+        'home', viewer.pk, versions[viewer.pk], paginator.has_older, paginator.has_newer,
+        [
+            (post.pk, post.likes_count + pending.get(post.pk, 0), post.comments_count,
+             post.reposts_count, post.updated_at, post.liked, versions[post.user_id])
+            for post in posts
+        ],
+    )
+    cached = request._home_feed_validators = (etag, None)
+    return cached
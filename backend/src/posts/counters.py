@@ -0,0 +1,125 @@
+# backend/src/posts/counters.py
+"""
+Reconciliação dos contadores desnormalizados (likes_count, comments_count,
+followers_count, following_count).
+
+Os contadores são recalculados em lotes por faixa de id, com uma consulta
+agregada (GROUP BY) por contador e lote, e só as linhas divergentes são
+regravadas. Cada lote é uma transação curta, sem travar a tabela inteira.
+Incrementos concorrentes que caem no meio de um lote podem deixar uma
+divergência residual, corrigida na execução seguinte.
+
+Nos contadores com shards (posts/sharded_counters.py), a coluna deve valer a
+contagem menos o que ainda está pendente nos shards, que o próximo flush
+soma. Os shards do lote são travados e descontados dentro da transação: um
+incremento que caia depois do flush_all inicial não é contado duas vezes.
+
+Depois do commit de cada lote, os caches que guardam os contadores são
+invalidados para as linhas corrigidas: o fragmento do post
+(posts/response_cache.py) e a versão do perfil (users/versioning.py).
+Sem isso, o valor corrigido só apareceria quando o cache expirasse.
+"""
+from collections import defaultdict
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from users.models import Follow, User
+from users.versioning import bump_profile_version
+from . import response_cache
+from .models import Comment, CounterShard, Like, Post
+from .sharded_counters import SHARDED_COUNTERS
+
+POST_COUNTERS = {
+    'likes_count': (Like, 'post_id'),
+    'comments_count': (Comment, 'post_id'),
+}
+
+USER_COUNTERS = {
+    'followers_count': (Follow, 'following_id'),
+    'following_count': (Follow, 'follower_id'),
+}
+
+
+def get_batch_size():
+    return getattr(settings, 'COUNTER_RECONCILE_BATCH_SIZE', 1000)
+
+
+def invalidate_posts(post_ids):
+    for post_id in post_ids:
+        response_cache.invalidate_post(post_id)
+
+
+def invalidate_profiles(user_ids):
+    if user_ids:
+        bump_profile_version(*user_ids)
+
+
+def pending_shards(model, field, ids):
+    """Deltas pendentes nos shards de `model.field` para `ids` ({id: delta}), com os shards travados."""
+    counter = next((c for c in SHARDED_COUNTERS if c.model is model and c.field == field), None)
+    if counter is None:
+        return {}
+    pending = defaultdict(int)
+    # Sem GROUP BY: o Postgres não aceita FOR UPDATE em consultas agregadas
+    shards = CounterShard.objects.select_for_update().filter(counter=counter.name, object_id__in=ids)
+    for object_id, delta in shards.values_list('object_id', 'delta'):
+        pending[object_id] += delta
+    return pending
+
+
+def reconcile_counters(model, counters, batch_size=None, on_repaired=None):
+    """
+    Recalcula `counters` ({campo: (modelo de origem, fk)}) de `model`; retorna
+    quantas linhas foram corrigidas. `on_repaired(ids)` roda depois do commit
+    de cada lote com os ids corrigidos.
+    """
+    batch_size = batch_size or get_batch_size()
+    repaired = 0
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            rows = list(model.objects.filter(pk__gt=last_pk).order_by('pk').only(*counters)[:batch_size])
+            if not rows:
+                break
+            ids = [row.pk for row in rows]
+            actual = {
+                field: dict(
+                    source.objects.filter(**{f'{fk}__in': ids})
+                    .order_by()
+                    .values(fk)
+                    .annotate(total=Count('pk'))
+                    .values_list(fk, 'total')
+                )
+                for field, (source, fk) in counters.items()
+            }
+            pending = {field: pending_shards(model, field, ids) for field in counters}
+
+            drifted = []
+            for row in rows:
+                changed = False
+                for field in counters:
+                    value = actual[field].get(row.pk, 0) - pending[field].get(row.pk, 0)
+                    if getattr(row, field) != value:
+                        setattr(row, field, value)
+                        changed = True
+                if changed:
+                    drifted.append(row)
+            if drifted:
+                model.objects.bulk_update(drifted, list(counters))
+                if on_repaired:
+                    transaction.on_commit(partial(on_repaired, [row.pk for row in drifted]))
+
+        repaired += len(drifted)
+        last_pk = ids[-1]
+    return repaired
+
+
+def reconcile_post_counters(batch_size=None):
+    return reconcile_counters(Post, POST_COUNTERS, batch_size, on_repaired=invalidate_posts)
+
+
+def reconcile_user_counters(batch_size=None):
+    return reconcile_counters(User, USER_COUNTERS, batch_size, on_repaired=invalidate_profiles)
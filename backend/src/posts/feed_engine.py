@@ -0,0 +1,208 @@
+# backend/src/posts/feed_engine.py
+"""
+Leitura "pull" da timeline "Seguindo" para autores com muitos seguidores.
+
+Autores com followers_count >= TIMELINE_PULL_FOLLOWER_THRESHOLD não passam pelo
+fan-out na escrita (ver posts/timeline.py). Em vez disso, cada autor tem um
+ring buffer com os ids dos seus posts recentes no cache do Django, e o feed de
+quem os segue é montado na leitura com um k-way merge (heap) sobre esses
+buffers e a timeline materializada. O banco só é consultado para páginas mais
+profundas do que os buffers cobrem.
+
+O buffer é guardado sob um carimbo de versão do autor, trocado no commit de
+cada post novo ou apagado: quem leu o banco antes da troca grava sob o carimbo
+velho, que ninguém mais lê, e nunca sobrescreve um buffer mais novo. Como os
+carimbos de perfil (users/versioning.py), isso só vale com um cache
+compartilhado entre os workers; sem ele (`is_enabled`), os buffers são lidos
+do banco a cada requisição.
+"""
+import heapq
+import time
+from itertools import islice
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+from django.utils.functional import cached_property
+
+from config.caching import is_shared
+from users.models import User
+from .models import Post, TimelineEntry
+from .timeline import get_pull_threshold
+
+
+def get_alias():
+    return getattr(settings, 'AUTHOR_BUFFER_CACHE', 'default')
+
+
+class AuthorPostBuffer:
+    """Ring buffer de (created_at, post_id) por autor, do mais novo ao mais velho."""
+    key_prefix = 'timeline:author:'
+    version_prefix = 'timeline:author-version:'
+
+    def __init__(self, cache_alias=None, size=None, timeout=None):
+        self.cache_alias = cache_alias or get_alias()
+        self.cache = caches[self.cache_alias]
+        self.size = size or getattr(settings, 'AUTHOR_BUFFER_SIZE', 200)
+        self.timeout = timeout or getattr(settings, 'AUTHOR_BUFFER_TIMEOUT', 60 * 60 * 24)
+
+    def is_enabled(self):
+        return is_shared(self.cache_alias)
+
+    def key(self, author_id, version):
+        return f'{self.key_prefix}{author_id}:{version}'
+
+    def version_key(self, author_id):
+        return f'{self.version_prefix}{author_id}'
+
+    def get_versions(self, author_ids):
+        """{id: versão}; autores sem carimbo recebem um novo (o instante atual)."""
+        keys = {self.version_key(author_id): author_id for author_id in author_ids}
+        versions = {keys[key]: version for key, version in self.cache.get_many(list(keys)).items()}
+        for key, author_id in keys.items():
+            if author_id not in versions:
+                candidate = time.time_ns()
+                self.cache.add(key, candidate, self.timeout)
+                versions[author_id] = self.cache.get(key) or candidate
+        return versions
+
+    def invalidate(self, author_id):
+        """Troca o carimbo do autor; o buffer é recarregado do banco na próxima leitura."""
+        if self.is_enabled():
+            self.cache.set(self.version_key(author_id), time.time_ns(), self.timeout)
+
+    def push(self, post):
+        # Um get -> set aqui perderia um dos posts de dois commits simultâneos
+        self.invalidate(post.user_id)
+
+    def discard(self, author_id):
+        self.invalidate(author_id)
+
+    def get_many(self, author_ids):
+        if not self.is_enabled():
+            return self.load(author_ids)
+        versions = self.get_versions(author_ids)
+        keys = {self.key(author_id, versions[author_id]): author_id for author_id in author_ids}
+        buffers = {keys[key]: buffer for key, buffer in self.cache.get_many(list(keys)).items()}
+        missing = [author_id for author_id in author_ids if author_id not in buffers]
+        if missing:
+            loaded = self.load(missing)
+            self.cache.set_many(
+                {self.key(author_id, versions[author_id]): loaded[author_id] for author_id in missing}, self.timeout
+            )
+            buffers.update(loaded)
+        return buffers
+
+    def load(self, author_ids):
+        """Carrega os `size` posts mais recentes de cada autor em uma única consulta."""
+        rows = (
+            Post.objects.filter(user_id__in=author_ids)
+            .annotate(position=Window(
+                RowNumber(),
+                partition_by=[F('user_id')],
+                order_by=[F('created_at').desc(), F('id').desc()],
+            ))
+            .filter(position__lte=self.size)
+            .values_list('user_id', 'created_at', 'id')
+        )
+        buffers = {author_id: [] for author_id in author_ids}
+        for author_id, created_at, post_id in rows:
+            buffers[author_id].append((created_at, post_id))
+        for buffer in buffers.values():
+            buffer.sort(reverse=True)
+        return buffers
+
+
+def merge_buffers(buffers, cursor, limit, size, newer=False):
+    """
+    K-way merge dos buffers a partir de `cursor`.
+
+    Retorna None quando algum buffer cheio pode estar escondendo itens da página
+    pedida (os posts dele anteriores ao buffer só existem no banco).
+    """
+    if newer:
+        streams = [[item for item in reversed(buffer) if item > cursor] for buffer in buffers]
+    else:
+        streams = [[item for item in buffer if cursor is None or item < cursor] for buffer in buffers]
+    merged = list(islice(heapq.merge(*streams, reverse=not newer), limit))
+
+    for buffer in buffers:
+        if len(buffer) < size:
+            continue  # o buffer contém todo o histórico do autor
+        oldest = buffer[-1]
+        if newer:
+            if oldest > cursor:
+                return None
+        elif len(merged) < limit or oldest > merged[-1]:
+            return None
+    return merged
+
+
+class HomeFeed:
+    """Feed "Seguindo" combinando a timeline materializada com os autores "pull"."""
+
+    def __init__(self, user, buffer=None):
+        self.user = user
+        self.buffer = buffer or AuthorPostBuffer()
+
+    @cached_property
+    def pull_author_ids(self):
+        # Só na primeira página pedida: a view pode reaproveitar uma já resolvida
+        threshold = get_pull_threshold()
+        if threshold is None:
+            return []
+        return list(
+            User.objects.filter(followers_set__follower=self.user, followers_count__gte=threshold)
+            .values_list('id', flat=True)
+        )
+
+    def older(self, cursor, limit):
+        return self._page(cursor, limit, newer=False)
+
+    def newer(self, cursor, limit):
+        return self._page(cursor, limit, newer=True)
+
+    def _page(self, cursor, limit, newer):
+        pushed = [(entry.created_at, entry.post_id) for entry in self._materialized(cursor, limit, newer)]
+        pulled = self._pulled(cursor, limit, newer)
+
+        keys, seen = [], set()
+        for created_at, post_id in heapq.merge(pushed, pulled, reverse=not newer):
+            if post_id in seen:
+                continue  # autor que cruzou o limite ainda tem entradas materializadas
+            seen.add(post_id)
+            keys.append((created_at, post_id))
+            if len(keys) == limit:
+                break
+        return [TimelineEntry(owner=self.user, post_id=post_id, created_at=created_at) for created_at, post_id in keys]
+
+    def _materialized(self, cursor, limit, newer):
+        queryset = TimelineEntry.objects.filter(owner=self.user)
+        if newer:
+            timestamp, pk = cursor
+            queryset = queryset.filter(Q(created_at__gt=timestamp) | Q(created_at=timestamp, post_id__gt=pk))
+            return list(queryset.order_by('created_at', 'post_id')[:limit])
+        if cursor:
+            timestamp, pk = cursor
+            queryset = queryset.filter(Q(created_at__lt=timestamp) | Q(created_at=timestamp, post_id__lt=pk))
+        return list(queryset.order_by('-created_at', '-post_id')[:limit])
+
+    def _pulled(self, cursor, limit, newer):
+        if not self.pull_author_ids:
+            return []
+        buffers = self.buffer.get_many(self.pull_author_ids)
+        merged = merge_buffers(list(buffers.values()), cursor, limit, self.buffer.size, newer=newer)
+        if merged is not None:
+            return merged
+
+        # Página profunda: recorre ao índice (user, created_at, id) de Post.
+        queryset = Post.objects.filter(user_id__in=self.pull_author_ids)
+        if newer:
+            timestamp, pk = cursor
+            queryset = queryset.filter(Q(created_at__gt=timestamp) | Q(created_at=timestamp, id__gt=pk))
+            return list(queryset.order_by('created_at', 'id').values_list('created_at', 'id')[:limit])
+        if cursor:
+            timestamp, pk = cursor
+            queryset = queryset.filter(Q(created_at__lt=timestamp) | Q(created_at=timestamp, id__lt=pk))
+        return list(queryset.order_by('-created_at', '-id').values_list('created_at', 'id')[:limit])
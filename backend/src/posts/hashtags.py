@@ -0,0 +1,42 @@
+# backend/src/posts/hashtags.py
+"""
+Hashtags extraídas de Post.text_content na escrita (signal de Post) para a
+tabela PostHashtag, lida pelo feed de cada hashtag e pelo motor de trending
+(posts/trends.py).
+"""
+import re
+
+from .models import Hashtag, PostHashtag
+
+HASHTAG = re.compile(r'(?<![\w#])#(\w+)', re.UNICODE)
+MAX_LENGTH = Hashtag._meta.get_field('name').max_length
+
+
+def extract_hashtags(text):
+    """Hashtags de `text`, em minúsculas e sem repetição, na ordem em que aparecem."""
+    names = []
+    for match in HASHTAG.findall(text or ''):
+        name = match.lower()
+        # "#1" não é hashtag; nomes longos demais são ignorados
+        if name.isdigit() or len(name) > MAX_LENGTH or name in names:
+            continue
+        names.append(name)
+    return names
+
+
+def tag_post(post, created=True):
+    """Grava os usos de hashtag de `post`; em uma edição, remove os que saíram do texto."""
+    names = extract_hashtags(post.text_content)
+    if not created:
+        PostHashtag.objects.filter(post=post).exclude(hashtag__name__in=names).delete()
+    if not names:
+        return names
+    Hashtag.objects.bulk_create([Hashtag(name=name) for name in names], ignore_conflicts=True)
+    PostHashtag.objects.bulk_create(
+        [
+            PostHashtag(post=post, hashtag=hashtag, created_at=post.created_at)
+            for hashtag in Hashtag.objects.filter(name__in=names)
+        ],
+        ignore_conflicts=True,
+    )
+    return names
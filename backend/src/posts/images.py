@@ -0,0 +1,187 @@
+# backend/src/posts/images.py
+"""
+Variantes das imagens de posts, geradas fora da thread da requisição.
+
+Depois que o post com imagem é gravado (on_commit), o arquivo original é
+processado em um pool de processos (IMAGE_PROCESSING_WORKERS; 0 processa na
+hora, útil em testes e em desenvolvimento):
+
+  * uma variante por tamanho de VARIANTS (lado maior, sem ampliar), com a
+    orientação do EXIF aplicada e os metadados (EXIF, GPS, ICC) descartados;
+  * cada uma em WebP e em JPEG, para clientes sem WebP;
+  * um placeholder borrado de poucas centenas de bytes, em data URI, para
+    desenhar antes do download.
+
+O processo filho só lê o original e codifica as variantes; a thread que
+recebe o resultado as grava no storage (posts/storage.py, que conta
+referências no banco), guarda os nomes em Post.image_variants e invalida o
+fragmento do post em cache. O PostSerializer expõe as URLs (`image_variants`)
+para que o cliente baixe só o tamanho que vai desenhar. O original continua
+em Post.image.
+"""
+import base64
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageFilter, ImageOps, features
+
+from . import response_cache
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+# Lado maior (px) de cada variante
+VARIANTS = {
+    'thumbnail': 160,
+    'timeline': 680,
+    'full': 2048,
+}
+WEBP_QUALITY = 80
+JPEG_QUALITY = 85
+PLACEHOLDER_SIZE = 16
+PLACEHOLDER_BLUR = 1.5
+
+_pool = None
+
+
+def get_workers():
+    return getattr(settings, 'IMAGE_PROCESSING_WORKERS', 2)
+
+
+def get_storage():
+    return Post._meta.get_field('image').storage
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        # fork: os filhos herdam o Django já configurado (settings e storage);
+        # o cliente S3 é criado por processo (S3ObjectStore.client)
+        _pool = ProcessPoolExecutor(max_workers=get_workers(), mp_context=multiprocessing.get_context('fork'))
+    return _pool
+
+
+# --- Processamento (roda no processo filho) ---
+
+def _encode(image, fmt, **options):
+    buffer = BytesIO()
+    # Sem o argumento exif, o Pillow não grava metadados no arquivo novo
+    image.save(buffer, fmt, **options)
+    return buffer.getvalue()
+
+
+def _flatten(image):
+    """JPEG não tem transparência: compõe sobre fundo branco."""
+    if image.mode != 'RGBA':
+        return image
+    background = Image.new('RGB', image.size, 'white')
+    background.paste(image, mask=image.getchannel('A'))
+    return background
+
+
+def _placeholder(image):
+    tiny = _flatten(image.copy())
+    tiny.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+    tiny = tiny.filter(ImageFilter.GaussianBlur(PLACEHOLDER_BLUR))
+    data = _encode(tiny, 'JPEG', quality=40)
+    return 'data:image/jpeg;base64,' + base64.b64encode(data).decode()
+
+
+def render_variants(source_name):
+    """
+    Lê `source_name` do storage e devolve as variantes codificadas (bytes),
+    sem gravar nada: o storage conta referências no banco, e isso fica com o
+    processo da requisição (store_variants).
+    """
+    with get_storage().open(source_name, 'rb') as source:
+        with Image.open(source) as original:
+            image = ImageOps.exif_transpose(original)
+            has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+            image = image.convert('RGBA' if has_alpha else 'RGB')
+
+    result = {'placeholder': _placeholder(image), 'variants': {}}
+    for name, size in VARIANTS.items():
+        variant = image.copy()
+        variant.thumbnail((size, size), Image.Resampling.LANCZOS)
+        files = {'jpeg': _encode(_flatten(variant), 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)}
+        if features.check('webp'):
+            files['webp'] = _encode(variant, 'WEBP', quality=WEBP_QUALITY, method=4)
+        result['variants'][name] = {'width': variant.width, 'height': variant.height, 'files': files}
+    return result
+
+
+# --- Agendamento (processo da requisição) ---
+
+def store_variants(source_name, rendered):
+    """
+    Grava os arquivos de render_variants como
+    `<diretório>/variants/<nome>_<variante>.<formato>` (o storage endereçado
+    por conteúdo guarda só a extensão). Retorna o que vai para
+    Post.image_variants.
+    """
+    storage = get_storage()
+    directory, filename = os.path.split(source_name)
+    stem = os.path.splitext(filename)[0]
+    result = {'placeholder': rendered['placeholder'], 'variants': {}}
+    for name, variant in rendered['variants'].items():
+        entry = {'width': variant['width'], 'height': variant['height']}
+        for fmt, data in variant['files'].items():
+            extension = 'jpg' if fmt == 'jpeg' else fmt
+            entry[fmt] = storage.save(f'{directory}/variants/{stem}_{name}.{extension}', ContentFile(data))
+        result['variants'][name] = entry
+    return result
+
+
+def apply_variants(post_id, variants):
+    # updated_at entra no ETag do feed: sem ele, quem validou a página antes do
+    # fim do render receberia 304 e ficaria com image_variants nulo
+    updated = Post.objects.filter(pk=post_id).update(image_variants=variants, updated_at=timezone.now())
+    if not updated:
+        # O post foi apagado durante o render: ninguém mais referencia as variantes
+        delete_variants(variants)
+    response_cache.invalidate_post(post_id)
+
+
+def _on_rendered(post_id, source_name, future):
+    # Roda na thread de resultados do pool, com a própria conexão com o banco
+    try:
+        apply_variants(post_id, store_variants(source_name, future.result()))
+    except Exception:
+        logger.exception('Falha ao gerar as variantes da imagem do post %s', post_id)
+    finally:
+        connections.close_all()
+
+
+def process_post_image(post):
+    """Gera as variantes de `post.image` no pool (ou na hora, sem workers); devolve o Future."""
+    if not post.image:
+        return None
+    if get_workers() <= 0:
+        apply_variants(post.pk, store_variants(post.image.name, render_variants(post.image.name)))
+        return None
+    future = get_pool().submit(render_variants, post.image.name)
+    future.add_done_callback(partial(_on_rendered, post.pk, post.image.name))
+    return future
+
+
+def schedule_post_image(post):
+    """Processa a imagem só depois do commit, quando o arquivo e a linha já existem."""
+    if post.image:
+        transaction.on_commit(partial(process_post_image, post))
+
+
+def delete_variants(variants):
+    storage = get_storage()
+    for entry in (variants or {}).get('variants', {}).values():
+        for fmt in ('webp', 'jpeg'):
+            if entry.get(fmt):
+                storage.delete(entry[fmt])
+
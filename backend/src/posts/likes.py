@@ -0,0 +1,95 @@
+# backend/src/posts/likes.py
+"""
+Like/unlike idempotentes em uma única transação.
+
+`set_like` grava o estado pedido (curtido ou não) em vez de alternar, então
+repetir a mesma requisição não muda nada. No PostgreSQL e no SQLite (>= 3.35)
+a inserção usa INSERT ... ON CONFLICT DO NOTHING RETURNING e o contador é
+atualizado com UPDATE ... RETURNING: duas instruções por chamada.
+"""
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from .models import Like, Post
+from .sharded_counters import POST_LIKES
+
+
+def supports_returning():
+    if connection.vendor == 'postgresql':
+        return True
+    if connection.vendor == 'sqlite':
+        return connection.Database.sqlite_version_info >= (3, 35, 0)
+    return False
+
+
+def _insert_like(user_id, post_id):
+    """Insere o like se o post existir e ainda não houver like; retorna se inseriu."""
+    if not supports_returning():
+        if not Post.objects.filter(pk=post_id).exists():
+            return False
+        try:
+            with transaction.atomic():
+                _, created = Like.objects.get_or_create(user_id=user_id, post_id=post_id)
+        except IntegrityError:
+            return False
+        return created
+
+    qn = connection.ops.quote_name
+    like_table, post_table = qn(Like._meta.db_table), qn(Post._meta.db_table)
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {like_table} (user_id, post_id, created_at) '
+            f'SELECT %s, %s, %s WHERE EXISTS (SELECT 1 FROM {post_table} WHERE id = %s) '
+            f'ON CONFLICT (user_id, post_id) DO NOTHING RETURNING id',
+            [user_id, post_id, now, post_id],
+        )
+        return cursor.fetchone() is not None
+
+
+def _apply_delta(post_id, delta):
+    """Aplica `delta` a likes_count e retorna o valor visível, ou None se o post não existir."""
+    if delta and supports_returning():
+        qn = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            # Caminho comum (contador frio): a própria atualização devolve o novo valor
+            cursor.execute(
+                f'UPDATE {qn(Post._meta.db_table)} SET likes_count = likes_count + %s, updated_at = %s '
+                f'WHERE id = %s AND likes_count < %s AND likes_count + %s >= 0 RETURNING likes_count',
+                [delta, connection.ops.adapt_datetimefield_value(timezone.now()), post_id, POST_LIKES.threshold, delta],
+            )
+            row = cursor.fetchone()
+        if row is not None:
+            return row[0]
+
+    post = Post.objects.filter(pk=post_id).only('likes_count').first()
+    if post is None:
+        return None
+    if delta and (POST_LIKES.is_hot(post.likes_count) or not supports_returning()):
+        POST_LIKES.add(post_id, delta, current_value=post.likes_count)
+        post.refresh_from_db(fields=['likes_count'])
+    return POST_LIKES.current_value(post)
+
+
+def toggle_like(user, post_id):
+    """
+    Alterna o like (POST legado): lê o estado e grava o oposto com set_like,
+    na mesma transação. Não é idempotente; os clientes usam PUT/DELETE.
+    """
+    with transaction.atomic():
+        liked = not Like.objects.filter(user=user, post_id=post_id).exists()
+        return set_like(user, post_id, liked)
+
+
+def set_like(user, post_id, liked):
+    """Grava o estado do like e retorna (likes_count, liked), ou None se o post não existir."""
+    with transaction.atomic():
+        if liked:
+            delta = 1 if _insert_like(user.pk, post_id) else 0
+        else:
+            deleted, _ = Like.objects.filter(user=user, post_id=post_id).delete()
+            delta = -1 if deleted else 0
+        likes_count = _apply_delta(post_id, delta)
+    if likes_count is None:
+        return None
+    return likes_count, liked
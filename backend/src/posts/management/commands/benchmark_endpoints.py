@@ -0,0 +1,73 @@
+# backend/src/posts/management/commands/benchmark_endpoints.py
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.benchmark import SCENARIOS, HTTPTransport, InProcessTransport, compare, run_benchmark
+
+
+def na(value):
+    """Valor para a tabela; sem amostras (ex.: --requests 0), 'n/a'."""
+    return 'n/a' if value is None else value
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede latência (p50/p95/p99), vazão e consultas por endpoint sobre a base atual. '
+        'Os cenários de escrita (like, unlike, follow, unfollow, comment) desfazem cada escrita '
+        'fora da medição, deixando a base como estava para a próxima execução.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('scenarios', nargs='*', help=f'Cenários a rodar (padrão: todos). Opções: '
+                            f'{", ".join(scenario.name for scenario in SCENARIOS)}.')
+        parser.add_argument('--requests', type=int, default=200, help='Requisições por cenário.')
+        parser.add_argument('--concurrency', type=int, default=4, help='Threads em paralelo.')
+        parser.add_argument('--viewers', type=int, default=20, help='Usuários autenticados sorteados.')
+        parser.add_argument('--warmup', type=int, default=10, help='Requisições descartadas por cenário.')
+        parser.add_argument('--seed', type=int, default=42, help='Seed do sorteio de URLs e usuários.')
+        parser.add_argument('--base-url', help='Servidor local (ex.: http://127.0.0.1:8000); padrão: em processo.')
+        parser.add_argument('--output', help='Arquivo JSON com os resultados.')
+        parser.add_argument('--compare', help='JSON de uma execução anterior para comparar.')
+
+    def handle(self, *args, **options):
+        unknown = set(options['scenarios']) - {scenario.name for scenario in SCENARIOS}
+        if unknown:
+            raise CommandError(f'Cenários desconhecidos: {", ".join(sorted(unknown))}')
+
+        transport = HTTPTransport(options['base_url']) if options['base_url'] else InProcessTransport()
+        try:
+            results = run_benchmark(
+                transport,
+                scenario_names=options['scenarios'],
+                requests=options['requests'],
+                concurrency=max(1, options['concurrency']),
+                viewers=options['viewers'],
+                seed=options['seed'],
+                warmup=options['warmup'],
+            )
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        self.stdout.write(f'{"endpoint":<16}{"req/s":>9}{"p50":>9}{"p95":>9}{"p99":>9}{"queries":>9}{"erros":>7}')
+        for name, result in results['endpoints'].items():
+            latency = {key: na(value) for key, value in result['latency_ms'].items()}
+            self.stdout.write(
+                f'{name:<16}{na(result["throughput_rps"]):>9}{latency["p50"]:>9}{latency["p95"]:>9}'
+                f'{latency["p99"]:>9}{na(result["queries"]["mean"]):>9}{result["errors"]:>7}'
+            )
+
+        if options['compare']:
+            with open(options['compare']) as baseline_file:
+                baseline = json.load(baseline_file)
+            self.stdout.write(f'\nComparado a {baseline["meta"].get("commit") or options["compare"]} (p95 ms, consultas):')
+            for name, old_p95, p95, change, old_queries, queries in compare(results, baseline):
+                delta = f'{change:+.1f}%' if change is not None else '-'
+                self.stdout.write(
+                    f'{name:<16}{na(old_p95):>9} -> {na(p95):<9}{delta:>9}   {na(old_queries)} -> {na(queries)}'
+                )
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Resultados gravados em {options["output"]}.'))
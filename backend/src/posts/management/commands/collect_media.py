@@ -0,0 +1,18 @@
+# backend/src/posts/management/commands/collect_media.py
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.storage import ContentAddressedStorage
+
+
+class Command(BaseCommand):
+    help = (
+        'Apaga do storage de mídia os arquivos sem referências (MediaBlob com refcount 0) '
+        'e os órfãos sem MediaBlob mais antigos que MEDIA_ORPHAN_GRACE_HOURS.'
+    )
+
+    def handle(self, *args, **options):
+        if not isinstance(default_storage, ContentAddressedStorage):
+            raise CommandError('O storage padrão não é o ContentAddressedStorage (ver STORAGES).')
+        total = default_storage.collect()
+        self.stdout.write(self.style.SUCCESS(f'{total} arquivo(s) apagado(s).'))
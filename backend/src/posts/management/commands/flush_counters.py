@@ -0,0 +1,15 @@
+# backend/src/posts/management/commands/flush_counters.py
+from django.core.management.base import BaseCommand
+
+from posts.sharded_counters import flush_all
+
+
+class Command(BaseCommand):
+    help = 'Consolida os shards dos contadores quentes nas colunas de Post e User.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='Shards por transação.')
+
+    def handle(self, *args, **options):
+        flushed = flush_all(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{flushed} contador(es) consolidado(s).'))
@@ -0,0 +1,15 @@
+# backend/src/posts/management/commands/purge_uploads.py
+from django.core.management.base import BaseCommand
+
+from posts.uploads import purge_expired_uploads
+
+
+class Command(BaseCommand):
+    help = 'Apaga uploads em partes abandonados (sem atividade há CHUNKED_UPLOAD_EXPIRY_HOURS horas).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=None, help='Inatividade mínima, em horas.')
+
+    def handle(self, *args, **options):
+        total = purge_expired_uploads(options['hours'])
+        self.stdout.write(self.style.SUCCESS(f'{total} upload(s) apagado(s).'))
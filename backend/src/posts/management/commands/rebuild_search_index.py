@@ -0,0 +1,12 @@
+# backend/src/posts/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand
+
+from posts.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o índice de busca de posts (FTS5 no SQLite; no PostgreSQL a coluna gerada já está em dia).'
+
+    def handle(self, *args, **options):
+        total = rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(f'{total} post(s) indexado(s).'))
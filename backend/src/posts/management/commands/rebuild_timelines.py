@@ -0,0 +1,25 @@
+# backend/src/posts/management/commands/rebuild_timelines.py
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from posts.timeline import rebuild_timeline
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói as timelines "Seguindo" materializadas a partir da tabela de follows.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('usernames', nargs='*', help='Limita a reconstrução a estes usuários.')
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(following_set__isnull=False).distinct()
+        if options['usernames']:
+            users = User.objects.filter(username__in=options['usernames'])
+
+        total = 0
+        for user_id in users.order_by('id').values_list('id', flat=True).iterator():
+            rebuild_timeline(user_id)
+            total += 1
+        self.stdout.write(self.style.SUCCESS(f'{total} timeline(s) reconstruída(s).'))
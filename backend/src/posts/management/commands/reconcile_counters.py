@@ -0,0 +1,25 @@
+# backend/src/posts/management/commands/reconcile_counters.py
+from django.core.management.base import BaseCommand
+
+from posts.counters import reconcile_post_counters, reconcile_user_counters
+from posts.sharded_counters import flush_all
+
+
+class Command(BaseCommand):
+    help = 'Recalcula os contadores desnormalizados de posts e usuários e corrige divergências.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='Linhas por lote.')
+        parser.add_argument('--only', choices=['posts', 'users'], help='Reconciliar apenas um dos modelos.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        # Consolida os shards antes, senão o valor recalculado seria somado de novo no próximo flush
+        flush_all()
+        if options['only'] != 'users':
+            repaired = reconcile_post_counters(batch_size)
+            self.stdout.write(f'Posts corrigidos: {repaired}')
+        if options['only'] != 'posts':
+            repaired = reconcile_user_counters(batch_size)
+            self.stdout.write(f'Usuários corrigidos: {repaired}')
+        self.stdout.write(self.style.SUCCESS('Contadores reconciliados.'))
@@ -0,0 +1,15 @@
+# backend/src/posts/management/commands/run_trends.py
+from django.core.management.base import BaseCommand
+
+from posts.trends import run_trends
+
+
+class Command(BaseCommand):
+    help = 'Mantém o motor de trending em memória e publica um snapshot das hashtags em alta a cada intervalo.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=None, help='Segundos entre snapshots (padrão: TRENDS_SNAPSHOT_INTERVAL).')
+        parser.add_argument('--once', action='store_true', help='Reconstrói a janela, publica um snapshot e sai.')
+
+    def handle(self, *args, **options):
+        run_trends(options['interval'], options['once'], log=self.stdout.write)
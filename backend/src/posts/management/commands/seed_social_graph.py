@@ -0,0 +1,55 @@
+# backend/src/posts/management/commands/seed_social_graph.py
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts.seed_graph import seed_social_graph
+
+
+class Command(BaseCommand):
+    help = 'Gera um grafo social sintético (usuários, follows, posts, likes e comentários) para testes de carga.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help='Quantidade de usuários.')
+        parser.add_argument('--follows-per-user', type=float, default=30, help='Média de follows por usuário.')
+        parser.add_argument('--posts-per-user', type=float, default=10, help='Média de posts por usuário.')
+        parser.add_argument('--likes-per-post', type=float, default=5, help='Média de likes por post (antes do peso do autor).')
+        parser.add_argument('--comments-per-post', type=float, default=1, help='Média de comentários por post.')
+        parser.add_argument('--alpha', type=float, default=2.1, help='Expoente da lei de potência dos seguidores (> 1).')
+        parser.add_argument('--days', type=int, default=30, help='Janela de tempo das datas geradas.')
+        parser.add_argument('--end', help='Data final da janela (ISO 8601; sem fuso, vale o TIME_ZONE); padrão: agora.')
+        parser.add_argument('--seed', type=int, default=42, help='Seed; mesma seed e --chunk-size geram o mesmo grafo.')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Usuários por bloco de trabalho.')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Linhas por bulk_create.')
+        parser.add_argument('--workers', type=int, default=1, help='Processos em paralelo (PostgreSQL).')
+
+    def handle(self, *args, **options):
+        if options['users'] < 2:
+            raise CommandError('São necessários pelo menos 2 usuários.')
+        if options['alpha'] <= 1:
+            raise CommandError('--alpha deve ser maior que 1.')
+        end = parse_datetime(options['end']) if options['end'] else None
+        if options['end'] and end is None:
+            raise CommandError('--end inválido.')
+        if end is not None and timezone.is_naive(end):
+            end = timezone.make_aware(end)
+
+        totals = seed_social_graph(
+            workers=options['workers'],
+            log=self.stdout.write,
+            seed=options['seed'],
+            users=options['users'],
+            follows_per_user=options['follows_per_user'],
+            posts_per_user=options['posts_per_user'],
+            likes_per_post=options['likes_per_post'],
+            comments_per_post=options['comments_per_post'],
+            alpha=options['alpha'],
+            days=options['days'],
+            end=end,
+            chunk_size=options['chunk_size'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            'Grafo gerado: ' + ', '.join(f'{name}={count}' for name, count in totals.items())
+            + '. Rode `rebuild_timelines` para materializar as timelines "Seguindo".'
+        ))
@@ -0,0 +1,15 @@
+# backend/src/posts/management/commands/trim_timelines.py
+from django.core.management.base import BaseCommand
+
+from posts.timeline import trim_all_timelines
+
+
+class Command(BaseCommand):
+    help = 'Descarta as entradas das timelines "Seguindo" além de HOME_TIMELINE_MAX_LENGTH.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='Timelines por consulta.')
+
+    def handle(self, *args, **options):
+        trimmed = trim_all_timelines(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{trimmed} timeline(s) aparada(s).'))
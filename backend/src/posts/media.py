@@ -0,0 +1,180 @@
+# backend/src/posts/media.py
+"""
+Entrega dos arquivos de MEDIA_URL.
+
+A view só decide a resposta (existência, validadores, cache, intervalo); os
+bytes, em produção, saem do proxy da frente (MEDIA_SENDFILE_BACKEND):
+
+  * 'x-accel-redirect' (nginx): a resposta leva só os cabeçalhos e
+    `X-Accel-Redirect: <MEDIA_ACCEL_REDIRECT_PREFIX><nome>`, uma location
+    `internal` do nginx que aponta para o MEDIA_ROOT ou para o bucket;
+  * 'x-sendfile' (Apache mod_xsendfile, lighttpd): `X-Sendfile` com o caminho
+    absoluto, só com o object store em disco.
+
+Sem proxy (desenvolvimento, testes), o arquivo é transmitido em blocos, com
+suporte a Range de um intervalo (206/416) e If-Range.
+
+Arquivos endereçados por conteúdo (cas/…, ver posts/storage.py) nunca mudam:
+o ETag forte é o próprio hash, sem tocar no disco, e o Cache-Control é
+`immutable` por um ano. Nomes antigos (post_images/…) têm ETag de tamanho e
+data de modificação e cache curto (MEDIA_CACHE_MAX_AGE).
+"""
+import io
+import mimetypes
+import posixpath
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import http_date, parse_etags
+from django.views.decorators.http import require_safe
+
+from .storage import IMMUTABLE_CACHE_CONTROL, is_content_key
+
+BLOCK_SIZE = 64 * 1024
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def get_sendfile_backend():
+    return getattr(settings, 'MEDIA_SENDFILE_BACKEND', '') or None
+
+
+def clean_name(path):
+    """Nome no storage a partir do caminho da URL; caminhos fora do MEDIA_ROOT viram 404."""
+    name = posixpath.normpath(path).lstrip('/')
+    if not name or name != path or name.startswith('..') or '\\' in name:
+        raise Http404('Arquivo não encontrado.')
+    return name
+
+
+def media_etag(name, size=None, modified=None):
+    if is_content_key(name):
+        return '"%s"' % posixpath.splitext(posixpath.basename(name))[0]
+    return '"%x-%x"' % (int(modified.timestamp() * 1_000_000), size)
+
+
+def cache_control(name):
+    if is_content_key(name):
+        return IMMUTABLE_CACHE_CONTROL
+    return f'public, max-age={getattr(settings, "MEDIA_CACHE_MAX_AGE", 3600)}'
+
+
+def parse_range(header, size):
+    """
+    (início, fim) inclusivo do cabeçalho Range, None para ignorá-lo (sintaxe
+    inválida ou vários intervalos, que o RFC 9110 permite responder com 200)
+    ou ValueError se o intervalo não cabe no arquivo (416).
+    """
+    match = RANGE.match(header.replace(' ', ''))
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not size:
+        raise ValueError(header)
+    if not first:
+        # Sufixo: os últimos N bytes
+        length = int(last)
+        if not length:
+            raise ValueError(header)
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or (last and int(last) < start):
+        raise ValueError(header)
+    return start, end
+
+
+def _stream_range(source, start, length):
+    try:
+        try:
+            source.seek(start)
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            # Corpo de objeto remoto sem seek: descarta até o início
+            while start > 0:
+                skipped = len(source.read(min(BLOCK_SIZE, start)))
+                if not skipped:
+                    return
+                start -= skipped
+        while length:
+            chunk = source.read(min(BLOCK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        source.close()
+
+
+def _offload_header(name):
+    """Cabeçalho que entrega `name` pelo proxy, ou None para transmitir daqui."""
+    backend = get_sendfile_backend()
+    if backend == 'x-accel-redirect':
+        return 'X-Accel-Redirect', getattr(settings, 'MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/') + name
+    if backend == 'x-sendfile':
+        try:
+            return 'X-Sendfile', default_storage.path(name)
+        except NotImplementedError:
+            # Object store remoto: não há caminho local para o proxy ler
+            return None
+    return None
+
+
+@require_safe
+def serve_media(request, path):
+    name = clean_name(path)
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    offload = _offload_header(name)
+
+    size = modified = None
+    # Com o nginx, um arquivo endereçado por conteúdo é respondido sem nenhuma E/S
+    if not (offload and offload[0] == 'X-Accel-Redirect' and is_content_key(name)):
+        try:
+            size = default_storage.size(name)
+            modified = default_storage.get_modified_time(name)
+        except (FileNotFoundError, SuspiciousFileOperation):
+            raise Http404('Arquivo não encontrado.')
+    etag = media_etag(name, size, modified)
+    headers = {'ETag': etag, 'Cache-Control': cache_control(name), 'Accept-Ranges': 'bytes'}
+    if modified is not None:
+        headers['Last-Modified'] = http_date(modified.timestamp())
+
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match and (if_none_match.strip() == '*' or etag in parse_etags(if_none_match)):
+        return HttpResponseNotModified(headers=headers)
+
+    if offload:
+        # O proxy trata Range e lê os bytes; o corpo daqui é vazio
+        return HttpResponse(content_type=content_type, headers={**headers, offload[0]: offload[1]})
+
+    byte_range = None
+    range_header = request.headers.get('Range')
+    if_range = request.headers.get('If-Range')
+    # If-Range só vale com ETag forte igual ao atual; senão o arquivo vai inteiro
+    if range_header and (not if_range or if_range.strip() == etag):
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            return HttpResponse(status=416, headers={**headers, 'Content-Range': f'bytes */{size}'})
+
+    if request.method == 'HEAD':
+        start, end = byte_range or (0, size - 1)
+        response = HttpResponse(status=206 if byte_range else 200, content_type=content_type, headers=headers)
+        if byte_range:
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = end - start + 1
+        return response
+
+    source = default_storage.open(name)
+    if byte_range is None:
+        response = FileResponse(source, content_type=content_type, headers=headers)
+        response['Content-Length'] = size
+        return response
+    start, end = byte_range
+    response = StreamingHttpResponse(
+        _stream_range(source, start, end - start + 1), status=206, content_type=content_type, headers=headers
+    )
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = end - start + 1
+    return response
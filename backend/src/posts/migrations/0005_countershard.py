@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0004_timelineentry"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CounterShard",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("counter", models.CharField(max_length=64)),
+                ("object_id", models.BigIntegerField()),
+                ("shard", models.PositiveSmallIntegerField()),
+                ("delta", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "unique_together": {("counter", "object_id", "shard")},
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# backend/src/posts/migrations/0007_post_search_index.py
+"""
+Índice invertido de Post.text_content para a busca (posts/search.py).
+
+Fica fora do estado dos modelos: no PostgreSQL é uma coluna gerada com índice
+GIN, no SQLite uma tabela virtual FTS5 mantida pelos signals de Post (triggers
+se perderiam quando o Django recria a tabela em migrações de SQLite).
+"""
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute(
+            "ALTER TABLE posts_post ADD COLUMN search_vector tsvector GENERATED ALWAYS AS "
+            "(to_tsvector('portuguese', coalesce(text_content, ''))) STORED"
+        )
+        schema_editor.execute('CREATE INDEX post_search_vector_idx ON posts_post USING GIN (search_vector)')
+    elif connection.vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE posts_post_fts USING fts5(text_content, tokenize='unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute('INSERT INTO posts_post_fts (rowid, text_content) SELECT id, text_content FROM posts_post')
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute('ALTER TABLE posts_post DROP COLUMN search_vector')
+    elif connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE posts_post_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0006_comment_post_created_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,107 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def tag_existing_posts(apps, schema_editor):
+    from posts.hashtags import extract_hashtags
+
+    Post = apps.get_model("posts", "Post")
+    Hashtag = apps.get_model("posts", "Hashtag")
+    PostHashtag = apps.get_model("posts", "PostHashtag")
+    posts = Post.objects.filter(text_content__contains="#").order_by().only("id", "text_content", "created_at")
+    for post in posts.iterator():
+        names = extract_hashtags(post.text_content)
+        Hashtag.objects.bulk_create([Hashtag(name=name) for name in names], ignore_conflicts=True)
+        PostHashtag.objects.bulk_create(
+            [
+                PostHashtag(post_id=post.pk, hashtag=hashtag, created_at=post.created_at)
+                for hashtag in Hashtag.objects.filter(name__in=names)
+            ],
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0007_post_search_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Hashtag",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="TrendSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                ("window_start", models.DateTimeField()),
+                ("items", models.JSONField(default=list)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="PostHashtag",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField()),
+                (
+                    "hashtag",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="post_links",
+                        to="posts.hashtag",
+                    ),
+                ),
+                (
+                    "post",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="hashtag_links",
+                        to="posts.post",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["hashtag", "-created_at", "-post"],
+                        name="posthashtag_tag_created_idx",
+                    ),
+                    models.Index(fields=["created_at"], name="posthashtag_created_idx"),
+                ],
+                "unique_together": {("post", "hashtag")},
+            },
+        ),
+        migrations.RunPython(tag_existing_posts, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,5 @@
+import uuid
+
 from django.db import models
 from django.conf import settings 
 
@@ -10,6 +12,8 @@ class Post(models.Model):
     
     text_content = models.TextField(max_length=280, blank=True)
     image = models.ImageField(upload_to='post_images/', blank=True, null=True)
+    # Variantes redimensionadas e placeholder da imagem (ver posts/images.py); vazio até o processamento
+    image_variants = models.JSONField(default=dict, blank=True)
     likes_count = models.PositiveIntegerField(default=0)
     reposts_count = models.PositiveIntegerField(default=0)
     comments_count = models.PositiveIntegerField(default=0) 
@@ -18,6 +22,12 @@ class Post(models.Model):
 
     class Meta:
         ordering = ['-created_at'] 
+        indexes = [
+            # Chaves da paginação por cursor (created_at, id) das timelines
+            models.Index(fields=['-created_at', '-id'], name='post_created_id_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='post_user_created_id_idx'),
+        ]
+
     def __str__(self):
 
         return f"Post by {self.user.username} at {self.created_at.strftime('%Y-%m-%d %H:%M')}"
@@ -53,6 +63,130 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['created_at'] 
+        indexes = [
+            # Comentários de um post em ordem cronológica
+            models.Index(fields=['post', 'created_at', 'id'], name='comment_post_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Comment by {self.author.username} on Post {self.post.id}"
+
+
+class TimelineEntry(models.Model):
+    """
+    Timeline "Seguindo" materializada (fan-out na escrita): uma linha por post
+    de quem o dono segue. created_at é copiado do post para que a leitura seja
+    uma única varredura de intervalo em (owner, created_at, post).
+    """
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='home_timeline'
+    )
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='timeline_entries')
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('owner', 'post')
+        ordering = ['-created_at', '-post']
+        indexes = [
+            models.Index(fields=['owner', '-created_at', '-post'], name='timeline_owner_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Post {self.post_id} in timeline of user {self.owner_id}"
+
+
+class CounterShard(models.Model):
+    """
+    Incrementos pendentes (write-behind) de um contador quente, espalhados em
+    N linhas para que likes/follows simultâneos não disputem a mesma linha.
+    Ver posts/sharded_counters.py.
+    """
+    counter = models.CharField(max_length=64)
+    object_id = models.BigIntegerField()
+    shard = models.PositiveSmallIntegerField()
+    delta = models.BigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('counter', 'object_id', 'shard')
+
+    def __str__(self):
+        return f"{self.counter}[{self.object_id}]#{self.shard}: {self.delta:+d}"
+
+
+class Hashtag(models.Model):
+    """Hashtag normalizada (minúsculas), extraída dos posts na escrita (ver posts/hashtags.py)."""
+    name = models.CharField(max_length=100, unique=True)
+
+    def __str__(self):
+        return f"#{self.name}"
+
+
+class PostHashtag(models.Model):
+    """
+    Uso de uma hashtag por um post. created_at é copiado do post para que o
+    feed de uma hashtag seja uma varredura de intervalo em (hashtag, created_at,
+    post) e para que o motor de trending leia os usos como um log.
+    """
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='hashtag_links')
+    hashtag = models.ForeignKey(Hashtag, on_delete=models.CASCADE, related_name='post_links')
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('post', 'hashtag')
+        indexes = [
+            models.Index(fields=['hashtag', '-created_at', '-post'], name='posthashtag_tag_created_idx'),
+            models.Index(fields=['created_at'], name='posthashtag_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.hashtag_id} in post {self.post_id}"
+
+
+class TrendSnapshot(models.Model):
+    """Ranking de hashtags publicado pelo motor de trending (ver posts/trends.py)."""
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    window_start = models.DateTimeField()
+    items = models.JSONField(default=list)  # [{"hashtag": ..., "posts_count": ...}, ...]
+
+    def __str__(self):
+        return f"Trends at {self.created_at:%Y-%m-%d %H:%M}"
+
+
+class MediaUpload(models.Model):
+    """
+    Upload de imagem em partes (ver posts/uploads.py). Os bytes recebidos
+    ficam em um arquivo temporário fora do MEDIA_ROOT até o post usar o upload.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='media_uploads')
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)  # bytes já gravados, em sequência
+    # Preenchidos quando o cabeçalho da imagem é validado
+    image_format = models.CharField(max_length=10, blank=True)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Upload {self.id} ({self.offset}/{self.size} bytes)"
+
+
+class MediaBlob(models.Model):
+    """
+    Arquivo do storage endereçado por conteúdo (ver posts/storage.py): cada
+    nome gravado que aponta para ele conta uma referência, e o arquivo só é
+    apagado quando a última é liberada.
+    """
+    key = models.CharField(max_length=255, primary_key=True)
+    size = models.PositiveBigIntegerField()
+    refcount = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
-        return f"Comment by {self.author.username} on Post {self.post.id}"
\ No newline at end of file
+        return f"{self.key} ({self.refcount} ref.)"
@@ -0,0 +1,199 @@
+# backend/src/posts/pagination.py
+import base64
+import binascii
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginação por cursor opaco sobre a chave (created_at, id).
+
+    `?after=<cursor>` avança para itens mais antigos e `?before=<cursor>` volta
+    para os mais recentes. Cada página é uma varredura de intervalo no índice,
+    então a página N custa o mesmo que a primeira.
+    """
+    after_query_param = 'after'
+    before_query_param = 'before'
+    page_size_query_param = 'page_size'
+    timestamp_field = 'created_at'
+    tiebreak_field = 'pk'
+    invalid_cursor_message = 'Cursor inválido.'
+
+    def get_page_size(self, request):
+        default_size = getattr(settings, 'TIMELINE_PAGE_SIZE', 20)
+        max_size = getattr(settings, 'TIMELINE_MAX_PAGE_SIZE', 100)
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return default_size
+        return max(1, min(size, max_size))
+
+    # --- Cursores ---
+
+    def get_cursor_key(self, item):
+        return getattr(item, self.timestamp_field), getattr(item, self.tiebreak_field)
+
+    def encode_cursor(self, item):
+        timestamp, pk = self.get_cursor_key(item)
+        raw = f'{timestamp.isoformat()}|{pk}'.encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, encoded):
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            raw = base64.urlsafe_b64decode(padded.encode()).decode()
+            timestamp, pk = raw.split('|')
+            timestamp = parse_datetime(timestamp)
+            pk = int(pk)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if timestamp is None:
+            raise NotFound(self.invalid_cursor_message)
+        return timestamp, pk
+
+    def older_than(self, timestamp, pk):
+        field, tiebreak = self.timestamp_field, self.tiebreak_field
+        return Q(**{f'{field}__lt': timestamp}) | Q(**{field: timestamp, f'{tiebreak}__lt': pk})
+
+    def newer_than(self, timestamp, pk):
+        field, tiebreak = self.timestamp_field, self.tiebreak_field
+        return Q(**{f'{field}__gt': timestamp}) | Q(**{field: timestamp, f'{tiebreak}__gt': pk})
+
+    # --- Paginação ---
+
+    def fetch_older(self, queryset, cursor, limit):
+        """Itens mais antigos que `cursor` (ou os mais recentes, sem cursor), do mais novo ao mais velho."""
+        field, tiebreak = self.timestamp_field, self.tiebreak_field
+        if cursor:
+            queryset = queryset.filter(self.older_than(*cursor))
+        return list(queryset.order_by(f'-{field}', f'-{tiebreak}')[:limit])
+
+    def fetch_newer(self, queryset, cursor, limit):
+        """Itens mais recentes que `cursor`, do mais velho ao mais novo."""
+        field, tiebreak = self.timestamp_field, self.tiebreak_field
+        queryset = queryset.filter(self.newer_than(*cursor))
+        return list(queryset.order_by(field, tiebreak)[:limit])
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        after = request.query_params.get(self.after_query_param)
+        before = request.query_params.get(self.before_query_param)
+
+        if before:
+            rows = self.fetch_newer(queryset, self.decode_cursor(before), self.page_size + 1)
+            self.has_newer = len(rows) > self.page_size
+            self.has_older = True
+            rows = rows[:self.page_size][::-1]
+        else:
+            cursor = self.decode_cursor(after) if after else None
+            rows = self.fetch_older(queryset, cursor, self.page_size + 1)
+            self.has_older = len(rows) > self.page_size
+            self.has_newer = bool(after)
+            rows = rows[:self.page_size]
+
+        self.page = rows
+        return rows
+
+    def get_next_link(self):
+        if not (self.has_older and self.page):
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), self.before_query_param)
+        return replace_query_param(url, self.after_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_previous_link(self):
+        if not (self.has_newer and self.page):
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), self.after_query_param)
+        return replace_query_param(url, self.before_query_param, self.encode_cursor(self.page[0]))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        cursor_schema = {'type': 'string'}
+        return [
+            {'name': self.after_query_param, 'required': False, 'in': 'query',
+             'description': 'Cursor para itens mais antigos.', 'schema': cursor_schema},
+            {'name': self.before_query_param, 'required': False, 'in': 'query',
+             'description': 'Cursor para itens mais recentes.', 'schema': cursor_schema},
+            {'name': self.page_size_query_param, 'required': False, 'in': 'query',
+             'description': 'Quantidade de itens por página.', 'schema': {'type': 'integer'}},
+        ]
+
+
+class HomeTimelinePagination(KeysetPagination):
+    """
+    Pagina as linhas de TimelineEntry pela mesma chave (created_at, id do post),
+    então os cursores são intercambiáveis com os das outras timelines.
+    """
+    tiebreak_field = 'post_id'
+
+
+class MergedTimelinePagination(HomeTimelinePagination):
+    """
+    Pagina um HomeFeed (posts/feed_engine.py) em vez de um queryset: o feed
+    mescla a timeline materializada com os buffers dos autores "pull".
+    """
+
+    def fetch_older(self, feed, cursor, limit):
+        return feed.older(cursor, limit)
+
+    def fetch_newer(self, feed, cursor, limit):
+        return feed.newer(cursor, limit)
+
+
+class SearchPagination(KeysetPagination):
+    """
+    Pagina um PostSearch (posts/search.py) pela chave (faixa de relevância,
+    created_at, id): a faixa depende só do texto do post, então a chave de
+    cada post é fixa e o cursor continua estável.
+    """
+
+    def get_cursor_key(self, item):
+        return item.tier, item.created_at, item.pk
+
+    def encode_cursor(self, item):
+        tier, timestamp, pk = self.get_cursor_key(item)
+        raw = f'{tier}|{timestamp.isoformat()}|{pk}'.encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, encoded):
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            raw = base64.urlsafe_b64decode(padded.encode()).decode()
+            tier, timestamp, pk = raw.split('|')
+            tier, timestamp, pk = int(tier), parse_datetime(timestamp), int(pk)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if timestamp is None:
+            raise NotFound(self.invalid_cursor_message)
+        return tier, timestamp, pk
+
+    def fetch_older(self, search, cursor, limit):
+        return search.older(cursor, limit)
+
+    def fetch_newer(self, search, cursor, limit):
+        return search.newer(cursor, limit)
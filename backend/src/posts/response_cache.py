@@ -0,0 +1,190 @@
+# backend/src/posts/response_cache.py
+"""
+Cache das respostas de posts sobre o framework de cache do Django.
+
+Guardamos apenas o que não depende do viewer:
+  * o fragmento serializado de cada post (PostFragmentSerializer), por id;
+  * a lista de ids (e links relativos, completados com o Host de cada
+    requisição) de cada página de timeline pública, sob uma versão por
+    timeline.
+
+O fragmento guarda só o id do autor e caminhos de mídia sem esquema e host
+(`image`, `image_variants`), completados com o Host de cada requisição como
+os links de paginação; na resposta, ele recebe o perfil do
+cache versionado de perfis (users/profile_cache.py) e os campos do viewer
+(is_liked_by_viewer, is_reposted_by_viewer, user.is_followed_by_viewer)
+resolvidos em lote. Assim, editar um perfil não exige invalidar os posts. As
+views de posts invalidam os fragmentos em likes/comentários/remoções e trocam
+a versão das timelines quando um post é criado ou removido.
+
+Invalidar e trocar versões só funciona se todos os workers usam o mesmo
+cache (ver config/caching.py); com LocMem e WEB_CONCURRENCY > 1 nada é
+guardado e cada resposta é montada do banco.
+"""
+import hashlib
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+from django.conf import settings
+from django.core.cache import caches
+
+from config.caching import is_shared
+
+from users.serializers import ViewerFollowState, get_user_fragments
+from .models import Post
+from .serializers import PostFragmentSerializer, get_viewer_post_state
+
+FRAGMENT_KEY = 'post:fragment:v3:{}'  # v3: URLs de mídia relativas
+VERSION_KEY = 'timeline:version:{}'
+PAGE_KEY = 'timeline:page:{}:{}:{}'
+
+
+def get_alias():
+    return getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')
+
+
+def get_cache():
+    return caches[get_alias()]
+
+
+def is_enabled():
+    return is_shared(get_alias())
+
+
+def get_timeout():
+    return getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+
+
+# --- Fragmentos de post ---
+
+def get_post_fragments(post_ids, request, posts=None, context=None):
+    """{id: fragmento} dos posts existentes; os ausentes do cache são serializados e guardados."""
+    context = {'request': request} if context is None else context
+    cache = get_cache()
+    enabled = is_enabled()
+    keys = {FRAGMENT_KEY.format(post_id): post_id for post_id in post_ids}
+    fragments = {keys[key]: fragment for key, fragment in cache.get_many(list(keys)).items()} if enabled else {}
+
+    missing = [post_id for post_id in post_ids if post_id not in fragments]
+    if missing:
+        loaded = {post.pk: post for post in posts or [] if post.pk in missing}
+        still_missing = [post_id for post_id in missing if post_id not in loaded]
+        if still_missing:
+            loaded.update(Post.objects.select_related('user').order_by().in_bulk(still_missing))
+        # Os autores já carregados alimentam o cache de perfis sem outra consulta
+        get_user_fragments(context, users=[post.user for post in loaded.values()])
+        # Sem request, as URLs de mídia saem relativas: o fragmento serve a qualquer Host
+        serializer = PostFragmentSerializer(list(loaded.values()), many=True, context=dict(context, request=None))
+        fresh = {fragment['id']: fragment for fragment in serializer.data}
+        if enabled:
+            cache.set_many(
+                {FRAGMENT_KEY.format(post_id): fragment for post_id, fragment in fresh.items()}, get_timeout()
+            )
+        fragments.update(fresh)
+    return fragments
+
+
+def invalidate_post(post_id):
+    get_cache().delete(FRAGMENT_KEY.format(post_id))
+
+
+def with_viewer_state(fragments, request, context=None):
+    """Copia os fragmentos acrescentando o perfil do autor e os campos do viewer."""
+    context = {'request': request} if context is None else context
+    profiles = get_user_fragments(context, user_ids={fragment['user'] for fragment in fragments})
+    fragments = [fragment for fragment in fragments if fragment['user'] in profiles]
+    viewer = request.user
+    if viewer.is_authenticated:
+        post_state = get_viewer_post_state(viewer, [fragment['id'] for fragment in fragments])
+        follow_state = ViewerFollowState.for_request(request)
+        follow_state.prime({fragment['user'] for fragment in fragments})
+    else:
+        post_state = {'liked_post_ids': set(), 'reposted_post_ids': set()}
+        follow_state = None
+
+    payloads = []
+    for fragment in fragments:
+        payload = with_absolute_media(request, fragment)
+        payload['user'] = dict(profiles[fragment['user']])
+        payload['user']['is_followed_by_viewer'] = bool(
+            follow_state and follow_state.is_following(fragment['user'])
+        )
+        payload['is_liked_by_viewer'] = fragment['id'] in post_state['liked_post_ids']
+        payload['is_reposted_by_viewer'] = fragment['id'] in post_state['reposted_post_ids']
+        payloads.append(payload)
+    return payloads
+
+
+def with_absolute_media(request, fragment):
+    """Cópia do fragmento com `image` e as URLs de `image_variants` completadas pela requisição."""
+    payload = dict(fragment)
+    payload['image'] = absolute_link(request, fragment['image'])
+    if fragment['image_variants']:
+        payload['image_variants'] = {
+            name: {
+                key: absolute_link(request, value) if key in ('webp', 'jpeg') else value
+                for key, value in entry.items()
+            } if isinstance(entry, dict) else entry
+            for name, entry in fragment['image_variants'].items()
+        }
+    return payload
+
+
+def render_posts(post_ids, request, posts=None):
+    """Payloads completos dos posts, na ordem de `post_ids`, ignorando os que não existem."""
+    context = {'request': request}
+    fragments = get_post_fragments(post_ids, request, posts, context)
+    return with_viewer_state([fragments[post_id] for post_id in post_ids if post_id in fragments], request, context)
+
+
+# --- Páginas de timeline ---
+
+def get_timeline_version(name):
+    cache = get_cache()
+    key = VERSION_KEY.format(name)
+    version = cache.get(key)
+    if version is None:
+        # Uma versão nova (e não 1) evita reaproveitar páginas antigas se a chave for despejada
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_timeline(*names):
+    get_cache().set_many({VERSION_KEY.format(name): time.time_ns() for name in names}, None)
+
+
+def _page_key(name, request):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return PAGE_KEY.format(name, get_timeline_version(name), path)
+
+
+def relative_link(url):
+    """Link de paginação sem esquema e host, para a página em cache servir a qualquer Host."""
+    if url is None:
+        return None
+    parts = urlsplit(url)
+    return urlunsplit(('', '', parts.path, parts.query, ''))
+
+
+def absolute_link(request, link):
+    return request.build_absolute_uri(link) if link else None
+
+
+def get_cached_page(name, request):
+    if not is_enabled():
+        return None
+    return get_cache().get(_page_key(name, request))
+
+
+def set_cached_page(name, request, page):
+    if is_enabled():
+        get_cache().set(_page_key(name, request), page, get_timeout())
+
+
+def global_timeline():
+    return 'global'
+
+
+def user_timeline(username):
+    return f'user:{username}'
@@ -0,0 +1,155 @@
+# backend/src/posts/search.py
+"""
+Busca textual em Post.text_content sobre um índice invertido do próprio banco.
+
+  * PostgreSQL: coluna gerada `search_vector` (tsvector) com índice GIN,
+    mantida pelo próprio banco (migração 0007).
+  * SQLite: tabela virtual FTS5 `posts_post_fts` (rowid = id do post),
+    atualizada pelos signals de Post e reconstruída por `rebuild_search_index`
+    depois de cargas com bulk_create.
+
+A última palavra também casa como prefixo nos dois bancos (busca enquanto se
+digita). O resultado é ordenado por faixas de relevância e, dentro de cada
+faixa, do mais novo para o mais velho:
+
+  2. as palavras aparecem juntas e na ordem da busca (frase);
+  1. todas as palavras aparecem inteiras, em qualquer ordem;
+  0. a última só casa como prefixo.
+
+As faixas dependem só do texto do post, não de estatísticas do índice (o
+bm25 do FTS5 muda a cada post indexado), então a chave (faixa, created_at,
+id) de um post é fixa e a paginação por cursor não pula nem repete
+resultados.
+"""
+import re
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Post
+
+FTS_TABLE = 'posts_post_fts'
+TEXT_CONFIG = 'portuguese'  # o mesmo da coluna gerada na migração 0007
+TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+def uses_fts5():
+    return connection.vendor == 'sqlite'
+
+
+def search_terms(query):
+    """Palavras da busca, sem a sintaxe de consulta do banco (aspas, operadores)."""
+    return TOKEN.findall(query.lower())[:16]
+
+
+# --- Manutenção do índice (SQLite) ---
+
+def index_post(post):
+    if not uses_fts5():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post.pk])
+        cursor.execute(f'INSERT INTO {FTS_TABLE} (rowid, text_content) VALUES (%s, %s)', [post.pk, post.text_content])
+
+
+def unindex_post(post_id):
+    if not uses_fts5():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post_id])
+
+
+def rebuild_search_index():
+    """Reindexa todos os posts (SQLite); no PostgreSQL a coluna gerada já está em dia."""
+    if not uses_fts5():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(f'INSERT INTO {FTS_TABLE} (rowid, text_content) SELECT id, text_content FROM {Post._meta.db_table}')
+    return Post.objects.count()
+
+
+# --- Consulta ---
+
+def _match_sql(terms):
+    """Subconsulta (id, tier, created_at) dos posts que contêm todos os termos."""
+    post_table = Post._meta.db_table
+    if uses_fts5():
+        # Termos entre aspas, sem operadores do usuário
+        quoted = ' '.join(f'"{term}"' for term in terms)
+        phrase = '"%s"' % ' '.join(terms)
+        in_fts = f'p.id IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)'
+        sql = (
+            f'SELECT p.id AS id, ({in_fts}) + ({in_fts}) AS tier, p.created_at AS created_at '
+            f'FROM {FTS_TABLE} JOIN {post_table} p ON p.id = {FTS_TABLE}.rowid '
+            f'WHERE {FTS_TABLE} MATCH %s'
+        )
+        return sql, [quoted, phrase, quoted + '*']
+    # to_tsquery com os termos entre aspas (só \w, sem operadores do usuário)
+    quoted = [f"'{term}'" for term in terms]
+    tsquery = 'to_tsquery(%s::regconfig, %s)'
+    sql = (
+        f'SELECT p.id AS id, (p.search_vector @@ {tsquery})::int + (p.search_vector @@ {tsquery})::int AS tier, '
+        f'p.created_at AS created_at '
+        f'FROM {post_table} p WHERE p.search_vector @@ {tsquery}'
+    )
+    return sql, [
+        TEXT_CONFIG, ' & '.join(quoted),
+        TEXT_CONFIG, ' <-> '.join(quoted),
+        TEXT_CONFIG, ' & '.join(quoted) + ':*',
+    ]
+
+
+def _to_datetime(value):
+    # O SQLite devolve o texto gravado (UTC, sem fuso) no SQL cru
+    if isinstance(value, str):
+        value = parse_datetime(value)
+    if settings.USE_TZ and timezone.is_naive(value):
+        value = timezone.make_aware(value, dt_timezone.utc)
+    return value
+
+
+class PostSearch:
+    """
+    Resultado de uma busca, paginável pelo SearchPagination como o HomeFeed é
+    pelo MergedTimelinePagination: older/newer devolvem itens com .tier,
+    .created_at e .pk.
+    """
+
+    def __init__(self, query):
+        self.terms = search_terms(query)
+
+    def _fetch(self, cursor, limit, newer):
+        if not self.terms:
+            return []
+        match_sql, params = _match_sql(self.terms)
+        where, order = '', 'tier DESC, created_at DESC, id DESC'
+        if cursor:
+            tier, created_at, pk = cursor
+            op = '>' if newer else '<'
+            where = f'WHERE (tier, created_at, id) {op} (%s, %s, %s)'
+            params += [tier, connection.ops.adapt_datetimefield_value(created_at), pk]
+        if newer:
+            order = 'tier ASC, created_at ASC, id ASC'
+        sql = f'SELECT id, tier, created_at FROM ({match_sql}) matches {where} ORDER BY {order} LIMIT %s'
+        with connection.cursor() as db_cursor:
+            db_cursor.execute(sql, params + [limit])
+            return [SearchHit(pk, tier, _to_datetime(created_at)) for pk, tier, created_at in db_cursor.fetchall()]
+
+    def older(self, cursor, limit):
+        return self._fetch(cursor, limit, newer=False)
+
+    def newer(self, cursor, limit):
+        return self._fetch(cursor, limit, newer=True)
+
+
+class SearchHit:
+    __slots__ = ('pk', 'tier', 'created_at')
+
+    def __init__(self, pk, tier, created_at):
+        self.pk = pk
+        self.tier = tier
+        self.created_at = created_at
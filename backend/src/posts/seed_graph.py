@@ -0,0 +1,303 @@
+# backend/src/posts/seed_graph.py
+"""
+Gerador de grafo social sintético para testes de carga (`seed_social_graph`).
+
+O volume é gerado em blocos de usuários, cada um com o seu próprio gerador
+aleatório derivado de (seed, etapa, bloco). Assim o resultado só depende da
+seed e do tamanho do bloco, não da ordem de execução nem do número de
+processos, e os benchmarks são comparáveis entre execuções.
+
+  * Seguidores seguem uma lei de potência: cada usuário recebe um peso de
+    popularidade Pareto e os alvos dos follows são sorteados por esse peso.
+  * Posts chegam em rajadas: cada usuário tem alguns picos de atividade e os
+    posts se concentram em torno deles.
+  * Likes e comentários por post crescem com a popularidade do autor.
+
+As linhas são gravadas com bulk_create em lotes limitados, com ids explícitos
+para usuários e posts (as outras etapas referenciam esses ids sem consultar o
+banco). likes_count e comments_count são calculados na geração; os contadores
+de follow são reconciliados no final (posts/counters.py), assim como os índices
+de busca (posts/search.py, users/typeahead.py). As datas ficam nos `days` dias
+anteriores a `end` (por padrão, o momento da execução).
+"""
+import math
+import multiprocessing
+import random
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, connections
+from django.db.models import Max
+from django.utils import timezone
+
+from users.models import Follow, User
+from users.typeahead import rebuild_typeahead_index
+from .counters import reconcile_user_counters
+from .models import Comment, Like, Post
+from .search import rebuild_search_index
+
+WORDS = (
+    'hoje amanhã café código deploy bug feature time jogo música filme livro praia chuva sol '
+    'trabalho reunião ideia projeto teste produção cache banco fila timeline post'
+).split()
+
+# Parâmetros de forma das distribuições
+ACTIVITY_SHAPE = 1.5  # forma da Pareto de atividade (posts por usuário)
+BURST_SIZE = 10  # posts por pico de atividade, em média
+BURST_SPREAD = 1800  # segundos médios entre posts de uma rajada
+REACTION_DELAY = 3600  # segundos médios entre o post e um like/comentário
+MAX_POSTS_FACTOR = 50  # ninguém posta mais que 50x a média
+
+
+@dataclass
+class SeedPlan:
+    seed: int
+    users: int
+    follows_per_user: float
+    posts_per_user: float
+    likes_per_post: float
+    comments_per_post: float
+    alpha: float
+    days: int
+    chunk_size: int
+    batch_size: int
+    end: object = None
+    user_base: int = 0
+    post_base: int = 0
+    now: object = None
+    password: str = ''
+    weights: list = field(default_factory=list)
+    cum_weights: list = field(default_factory=list)
+    post_counts: list = field(default_factory=list)
+    post_offsets: list = field(default_factory=list)
+
+    def rng(self, stage, chunk):
+        return random.Random(f'{self.seed}:{stage}:{chunk}')
+
+    def chunks(self):
+        return range(math.ceil(self.users / self.chunk_size))
+
+    def chunk_users(self, chunk):
+        return range(chunk * self.chunk_size, min((chunk + 1) * self.chunk_size, self.users))
+
+
+# Preenchido antes de criar o pool: com fork, os processos filhos herdam o plano
+_plan = None
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Desliga auto_now/auto_now_add para gravar as datas geradas."""
+    fields = [
+        model_field for model in models for model_field in model._meta.concrete_fields
+        if getattr(model_field, 'auto_now', False) or getattr(model_field, 'auto_now_add', False)
+    ]
+    saved = [(model_field, model_field.auto_now, model_field.auto_now_add) for model_field in fields]
+    for model_field in fields:
+        model_field.auto_now = model_field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for model_field, auto_now, auto_now_add in saved:
+            model_field.auto_now, model_field.auto_now_add = auto_now, auto_now_add
+
+
+class BatchWriter:
+    """Buffers por modelo, gravados em ordem (pais antes de filhos) quando algum enche."""
+
+    def __init__(self, batch_size, *models):
+        self.batch_size = batch_size
+        self.buffers = {model: [] for model in models}
+        self.written = {model: 0 for model in models}
+
+    def add(self, obj):
+        self.buffers[type(obj)].append(obj)
+        if len(self.buffers[type(obj)]) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        for model, rows in self.buffers.items():
+            if rows:
+                model.objects.bulk_create(rows, batch_size=self.batch_size)
+                self.written[model] += len(rows)
+                rows.clear()
+
+
+# --- Planejamento (processo principal) ---
+
+def build_plan(**options):
+    plan = SeedPlan(**options)
+    plan.user_base = (User.objects.aggregate(max_id=Max('id'))['max_id'] or 0) + 1
+    plan.post_base = (Post.objects.aggregate(max_id=Max('id'))['max_id'] or 0) + 1
+    plan.now = plan.end or timezone.now()
+    # Um único hash para todos: calcular milhões de PBKDF2 dominaria o tempo de geração
+    plan.password = make_password('password123')
+
+    weight_rng = plan.rng('weights', 0)
+    plan.weights = [weight_rng.paretovariate(plan.alpha - 1) for _ in range(plan.users)]
+    plan.cum_weights = list(accumulate(plan.weights))
+
+    mean_weight = plan.cum_weights[-1] / plan.users if plan.users else 1
+    max_posts = int(plan.posts_per_user * MAX_POSTS_FACTOR)
+    activity = []
+    for chunk in plan.chunks():
+        rng = plan.rng('activity', chunk)
+        for index in plan.chunk_users(chunk):
+            # Quem é popular também tende a postar mais
+            boost = min(math.sqrt(plan.weights[index] / mean_weight), 3)
+            activity.append((rng.paretovariate(ACTIVITY_SHAPE) * boost, rng.random()))
+    # Normaliza para que a média fique em posts_per_user
+    scale = plan.posts_per_user * plan.users / (sum(value for value, _ in activity) or 1)
+    plan.post_counts = [min(max_posts, int(value * scale + jitter)) for value, jitter in activity]
+    plan.post_offsets = [0] + list(accumulate(plan.post_counts))
+    return plan
+
+
+# --- Etapas (um bloco de usuários por chamada; podem rodar em processos separados) ---
+
+def _random_time(rng, plan):
+    return plan.now - timedelta(seconds=rng.uniform(0, plan.days * 86400))
+
+
+def _text(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def seed_users(chunk):
+    plan = _plan
+    rng = plan.rng('users', chunk)
+    writer = BatchWriter(plan.batch_size, User)
+    with explicit_timestamps(User):
+        for index in plan.chunk_users(chunk):
+            user_id = plan.user_base + index
+            joined = _random_time(rng, plan)
+            writer.add(User(
+                id=user_id,
+                username=f'seed{user_id}',
+                email=f'seed{user_id}@example.com',
+                password=plan.password,
+                display_name=f'Seed {user_id}',
+                bio=_text(rng, rng.randint(1, 12)) if rng.random() < 0.6 else '',
+                created_at=joined,
+                date_joined=joined,
+            ))
+        writer.flush()
+    return writer.written[User]
+
+
+def seed_follows(chunk):
+    plan = _plan
+    rng = plan.rng('follows', chunk)
+    population = range(plan.users)
+    writer = BatchWriter(plan.batch_size, Follow)
+    with explicit_timestamps(Follow):
+        for index in plan.chunk_users(chunk):
+            degree = min(plan.users - 1, _sample_count(rng, plan.follows_per_user))
+            targets = set(rng.choices(population, cum_weights=plan.cum_weights, k=degree)) - {index}
+            for target in sorted(targets):
+                writer.add(Follow(
+                    follower_id=plan.user_base + index,
+                    following_id=plan.user_base + target,
+                    created_at=_random_time(rng, plan),
+                ))
+        writer.flush()
+    return writer.written[Follow]
+
+
+def _burst_times(rng, plan, count):
+    centers = [_random_time(rng, plan) for _ in range(max(1, round(count / BURST_SIZE)))]
+    times = [rng.choice(centers) + timedelta(seconds=rng.expovariate(1 / BURST_SPREAD)) for _ in range(count)]
+    return sorted(min(moment, plan.now) for moment in times)
+
+
+def seed_posts(chunk):
+    plan = _plan
+    rng = plan.rng('posts', chunk)
+    mean_weight = plan.cum_weights[-1] / plan.users
+    writer = BatchWriter(plan.batch_size, Post, Like, Comment)
+    with explicit_timestamps(Post, Like, Comment):
+        for index in plan.chunk_users(chunk):
+            author_id = plan.user_base + index
+            popularity = 1 + math.log1p(plan.weights[index] / mean_weight)
+            post_id = plan.post_base + plan.post_offsets[index]
+            for created_at in _burst_times(rng, plan, plan.post_counts[index]):
+                likers = _reactors(rng, plan, plan.likes_per_post * popularity)
+                commenters = [rng.randrange(plan.users) for _ in range(_sample_count(rng, plan.comments_per_post))]
+                writer.add(Post(
+                    id=post_id, user_id=author_id, text_content=_text(rng, rng.randint(3, 30)),
+                    likes_count=len(likers), comments_count=len(commenters),
+                    created_at=created_at, updated_at=created_at,
+                ))
+                for liker in likers:
+                    writer.add(Like(user_id=plan.user_base + liker, post_id=post_id, created_at=_reaction_time(rng, plan, created_at)))
+                for commenter in commenters:
+                    writer.add(Comment(
+                        post_id=post_id, author_id=plan.user_base + commenter,
+                        content=_text(rng, rng.randint(2, 20)), created_at=_reaction_time(rng, plan, created_at),
+                    ))
+                post_id += 1
+        writer.flush()
+    return writer.written[Post], writer.written[Like], writer.written[Comment]
+
+
+def _sample_count(rng, mean):
+    return int(rng.expovariate(1 / mean)) if mean > 0 else 0
+
+
+def _reactors(rng, plan, mean):
+    return rng.sample(range(plan.users), min(plan.users, _sample_count(rng, mean)))
+
+
+def _reaction_time(rng, plan, created_at):
+    return min(plan.now, created_at + timedelta(seconds=rng.expovariate(1 / REACTION_DELAY)))
+
+
+# --- Execução ---
+
+def _run_stage(stage, plan, workers):
+    chunks = list(plan.chunks())
+    if workers <= 1:
+        return [stage(chunk) for chunk in chunks]
+    # Os filhos abrem as próprias conexões; a herdada não pode ser compartilhada
+    connections.close_all()
+    with multiprocessing.get_context('fork').Pool(workers) as pool:
+        return pool.map(stage, chunks)
+
+
+def reset_sequences():
+    """Acerta as sequências de id depois de inserir ids explícitos (PostgreSQL)."""
+    statements = connection.ops.sequence_reset_sql(no_style(), [User, Post])
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def seed_social_graph(workers=1, log=None, **options):
+    """Gera o grafo; `options` são os campos de SeedPlan. Retorna {modelo: linhas}."""
+    global _plan
+    log = log or (lambda message: None)
+    if connection.vendor == 'sqlite' and workers > 1:
+        log('SQLite não aceita escritas concorrentes; usando um único processo.')
+        workers = 1
+
+    _plan = plan = build_plan(**options)
+    log(f'{plan.users} usuários, {plan.post_offsets[-1]} posts planejados.')
+    totals = {'users': sum(_run_stage(seed_users, plan, workers))}
+    log(f'Usuários: {totals["users"]}')
+    totals['follows'] = sum(_run_stage(seed_follows, plan, workers))
+    log(f'Follows: {totals["follows"]}')
+    post_totals = _run_stage(seed_posts, plan, workers)
+    totals['posts'], totals['likes'], totals['comments'] = (sum(column) for column in zip(*post_totals)) if post_totals else (0, 0, 0)
+    log(f'Posts: {totals["posts"]}, likes: {totals["likes"]}, comentários: {totals["comments"]}')
+
+    reset_sequences()
+    reconcile_user_counters()
+    # bulk_create não dispara os signals que mantêm os índices de busca
+    rebuild_search_index()
+    rebuild_typeahead_index()
+    _plan = None
+    return totals
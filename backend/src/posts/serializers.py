@@ -1,44 +1,149 @@
+from django.conf import settings
+from django.db import transaction
 from rest_framework import serializers
-from .models import Post, Comment, Like
-from users.serializers import UserSerializer 
+from .models import MediaUpload, Post, Comment, Like
+from .sharded_counters import POST_LIKES
+from .uploads import claim_upload, open_upload
+from users.serializers import UserSerializer, prime_profile_fragments, prime_viewer_follow_state
 
 class PostCreateSerializer(serializers.ModelSerializer):
+    # Imagem enviada antes em partes (posts/uploads.py), no lugar de `image`
+    upload_id = serializers.UUIDField(write_only=True, required=False)
+
     class Meta:
         model = Post
-        fields = ['text_content', 'image'] 
+        fields = ['text_content', 'image', 'upload_id'] 
 
     def validate(self, data):
-        if not data.get('text_content') and not data.get('image'):
+        upload_id = data.pop('upload_id', None)
+        if upload_id:
+            if data.get('image'):
+                raise serializers.ValidationError("Envie a imagem ou o upload_id, não os dois.")
+            upload = MediaUpload.objects.filter(
+                pk=upload_id, user=self.context['request'].user, completed_at__isnull=False
+            ).first()
+            if upload is None:
+                raise serializers.ValidationError({'upload_id': 'Upload não encontrado ou não finalizado.'})
+            data['upload'] = upload
+        if not data.get('text_content') and not data.get('image') and not data.get('upload'):
             raise serializers.ValidationError("A postagem deve ter conteúdo de texto ou uma imagem.")
         return data
 
+    def create(self, validated_data):
+        upload = validated_data.pop('upload', None)
+        if upload is None:
+            return super().create(validated_data)
+        with transaction.atomic():
+            if not claim_upload(upload):
+                raise serializers.ValidationError({'upload_id': 'Upload já usado em outro post.'})
+            # O storage copia o arquivo temporário em partes para post_images/
+            with open_upload(upload) as image:
+                return super().create({**validated_data, 'image': image})
+
+class MediaUploadCreateSerializer(serializers.Serializer):
+    filename = serializers.CharField(max_length=255)
+    size = serializers.IntegerField(min_value=1)
+
+
+class MediaUploadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = MediaUpload
+        fields = ['id', 'filename', 'size', 'offset', 'image_format', 'width', 'height', 'completed_at']
+        read_only_fields = fields
+
 class LikeSerializer(serializers.Serializer):
     post_id = serializers.IntegerField(read_only=True) 
     user_id = serializers.IntegerField(read_only=True) 
 
 
+class PostStateRequestSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=getattr(settings, 'POST_STATE_MAX_IDS', 300),
+    )
+
+
+class CommentListSerializer(serializers.ListSerializer):
+
+    def to_representation(self, data):
+        comments = list(data.all() if hasattr(data, 'all') else data)
+        prime_viewer_follow_state(self.context, {comment.author_id for comment in comments})
+        prime_profile_fragments(self.context, [comment.author for comment in comments])
+        return super().to_representation(comments)
+
+
 class CommentSerializer(serializers.ModelSerializer):
     author = UserSerializer(read_only=True) 
     class Meta:
         model = Comment
         fields = ['id', 'post', 'author', 'content', 'created_at']
         read_only_fields = ['id', 'post', 'author', 'created_at'] 
+        list_serializer_class = CommentListSerializer
 
 class CommentCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ['content'] 
 
-class PostSerializer(serializers.ModelSerializer):
+def get_viewer_post_state(viewer, post_ids):
+    """Ids, entre `post_ids`, que o viewer curtiu/repostou — uma consulta por relação."""
+    # order_by() descarta o Meta.ordering de Like, que forçaria uma ordenação sem uso
+    liked = Like.objects.filter(user=viewer, post_id__in=post_ids).order_by().values_list('post_id', flat=True)
+    return {
+        'liked_post_ids': set(liked),
+        'reposted_post_ids': set(),  # ainda não existe modelo de repost
+    }
+
+
+class ViewerStateListSerializer(serializers.ListSerializer):
+    """
+    Resolve o estado do viewer para todos os posts da página de uma vez e o
+    deixa no contexto, evitando uma consulta por post nos SerializerMethodFields.
+    """
+
+    def to_representation(self, data):
+        posts = list(data.all() if hasattr(data, 'all') else data)
+        request = self.context.get('request')
+        if request and request.user.is_authenticated:
+            self.context['viewer_post_state'] = get_viewer_post_state(request.user, [post.pk for post in posts])
+        prime_viewer_follow_state(self.context, {post.user_id for post in posts})
+        prime_profile_fragments(self.context, [post.user for post in posts])
+        POST_LIKES.pending_for(posts, self.context.setdefault('pending_counters', {}))
+        return super().to_representation(posts)
+
+
+class ViewerStateMixin:
+    """is_liked_by_viewer / is_reposted_by_viewer lidos do lote quando disponível."""
+
+    def _viewer_flag(self, obj, state_key, fallback):
+        request = self.context.get('request')
+        if not (request and request.user.is_authenticated):
+            return False
+        state = self.context.get('viewer_post_state')
+        if state is not None:
+            return obj.pk in state[state_key]
+        return fallback(request.user)
+
+    def get_is_liked_by_viewer(self, obj):
+        return self._viewer_flag(
+            obj, 'liked_post_ids', lambda viewer: obj.likes_received.filter(user=viewer).exists()
+        )
+
+    def get_is_reposted_by_viewer(self, obj):
+        return self._viewer_flag(obj, 'reposted_post_ids', lambda viewer: False)
+
+
+class PostSerializer(ViewerStateMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
+    image_variants = serializers.SerializerMethodField()
     is_liked_by_viewer = serializers.SerializerMethodField()
     is_reposted_by_viewer = serializers.SerializerMethodField()
-    comments_count = serializers.IntegerField(source='comments.count', read_only=True) 
     
     class Meta:
         model = Post
         fields = [
-            'id', 'user', 'text_content', 'image',
+            'id', 'user', 'text_content', 'image', 'image_variants',
             'likes_count', 'reposts_count', 'comments_count',
             'created_at', 'updated_at',
             'is_liked_by_viewer', 'is_reposted_by_viewer'
@@ -47,16 +152,40 @@ class PostSerializer(serializers.ModelSerializer):
             'id', 'user', 'likes_count', 'reposts_count', 
             'comments_count', 'created_at', 'updated_at', 'is_liked_by_viewer', 'is_reposted_by_viewer'
         ]
+        list_serializer_class = ViewerStateListSerializer
 
-    def get_is_liked_by_viewer(self, obj):
+    def get_image_variants(self, obj):
+        """URLs por tamanho (thumbnail, timeline, full) em WebP e JPEG; None até o processamento."""
+        if not obj.image_variants:
+            return None
+        storage = obj.image.storage
         request = self.context.get('request')
-        if request and request.user.is_authenticated:
+        build = request.build_absolute_uri if request else (lambda url: url)
+        data = {'placeholder': obj.image_variants.get('placeholder')}
+        for name, entry in obj.image_variants.get('variants', {}).items():
+            data[name] = {
+                key: build(storage.url(value)) if key in ('webp', 'jpeg') else value
+                for key, value in entry.items()
+            }
+        return data
 
-            return obj.likes_received.filter(user=request.user).exists()
-        return False
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data['likes_count'] = POST_LIKES.current_value(instance, self.context)
+        return data
 
-    def get_is_reposted_by_viewer(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            pass 
-        return False
\ No newline at end of file
+
+class PostFragmentSerializer(PostSerializer):
+    """
+    Parte do PostSerializer que não depende do viewer (ver posts/response_cache.py);
+    os campos *_by_viewer e o perfil do autor (do cache de perfis, pelo id em
+    `user`) são mesclados depois, em lote.
+    """
+    user = serializers.PrimaryKeyRelatedField(read_only=True)
+    is_liked_by_viewer = None
+    is_reposted_by_viewer = None
+
+    class Meta(PostSerializer.Meta):
+        fields = [field for field in PostSerializer.Meta.fields if not field.endswith('_by_viewer')]
+        read_only_fields = [field for field in PostSerializer.Meta.read_only_fields if not field.endswith('_by_viewer')]
+        list_serializer_class = serializers.ListSerializer
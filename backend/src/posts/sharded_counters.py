@@ -0,0 +1,126 @@
+# backend/src/posts/sharded_counters.py
+"""
+Contadores quentes com escrita adiada (write-behind) em shards.
+
+Enquanto um contador está abaixo de HOT_COUNTER_THRESHOLD, likes e follows
+continuam atualizando a coluna diretamente. Acima disso, cada incremento vai
+para uma de COUNTER_SHARDS linhas de CounterShard escolhida ao acaso, e o
+comando `flush_counters` consolida periodicamente os shards na coluna
+(Post.likes_count, User.followers_count). As leituras somam a coluna aos
+shards pendentes, só para os objetos quentes.
+"""
+import random
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from users.models import User
+from .models import CounterShard, Post
+
+
+class ShardedCounter:
+
+    def __init__(self, model, field, touch_field=None):
+        self.model = model
+        self.field = field
+        self.touch_field = touch_field  # ex.: updated_at, para validadores de GET condicional
+        self.name = f'{model._meta.label_lower}.{field}'
+
+    @property
+    def threshold(self):
+        return getattr(settings, 'HOT_COUNTER_THRESHOLD', 1000)
+
+    @property
+    def shards(self):
+        return getattr(settings, 'COUNTER_SHARDS', 16)
+
+    def is_hot(self, value):
+        return value >= self.threshold
+
+    def add(self, object_id, amount, current_value):
+        """Soma `amount` ao contador; `current_value` é o valor já carregado do objeto."""
+        if not self.is_hot(current_value):
+            rows = self.model.objects.filter(pk=object_id)
+            if amount < 0:
+                # Evita decrementar abaixo de zero quando o contador já divergiu
+                rows = rows.filter(**{f'{self.field}__gte': -amount})
+            rows.update(**self._touch({self.field: F(self.field) + amount}))
+            return
+
+        shard = random.randrange(self.shards)
+        shard_rows = CounterShard.objects.filter(counter=self.name, object_id=object_id, shard=shard)
+        if not shard_rows.update(delta=F('delta') + amount):
+            CounterShard.objects.bulk_create(
+                [CounterShard(counter=self.name, object_id=object_id, shard=shard)], ignore_conflicts=True
+            )
+            shard_rows.update(delta=F('delta') + amount)
+
+    def _touch(self, updates):
+        if self.touch_field:
+            updates[self.touch_field] = timezone.now()
+        return updates
+
+    def pending_for(self, instances, memo=None):
+        """Deltas ainda não consolidados dos objetos quentes entre `instances` ({id: delta})."""
+        hot_ids = {obj.pk for obj in instances if self.is_hot(getattr(obj, self.field))}
+        memo = {} if memo is None else memo.setdefault(self.name, {})
+        missing = hot_ids - memo.keys()
+        if missing:
+            memo.update(dict.fromkeys(missing, 0))
+            memo.update(
+                CounterShard.objects.filter(counter=self.name, object_id__in=missing)
+                .values('object_id')
+                .annotate(total=Sum('delta'))
+                .values_list('object_id', 'total')
+            )
+        return {pk: memo[pk] for pk in hot_ids}
+
+    def current_value(self, instance, context=None):
+        """Valor da coluna mais os shards pendentes; `context` memoriza a consulta por resposta."""
+        memo = context.setdefault('pending_counters', {}) if context is not None else None
+        return getattr(instance, self.field) + self.pending_for([instance], memo).get(instance.pk, 0)
+
+    def flush(self, batch_size=None):
+        """Consolida os shards na coluna; retorna quantos objetos foram atualizados."""
+        batch_size = batch_size or getattr(settings, 'COUNTER_FLUSH_BATCH_SIZE', 500)
+        flushed = 0
+        position = Q()
+        while True:
+            with transaction.atomic():
+                # Uma única passada em ordem de (object_id, shard), mesmo sob escrita contínua
+                shards = list(
+                    CounterShard.objects.select_for_update()
+                    .filter(position, counter=self.name)
+                    .exclude(delta=0)
+                    .order_by('object_id', 'shard')[:batch_size]
+                )
+                if not shards:
+                    break
+                last = shards[-1]
+                position = Q(object_id__gt=last.object_id) | Q(object_id=last.object_id, shard__gt=last.shard)
+                totals = defaultdict(int)
+                for shard in shards:
+                    totals[shard.object_id] += shard.delta
+                for object_id, total in totals.items():
+                    self.model.objects.filter(pk=object_id).update(
+                        **self._touch({self.field: Greatest(F(self.field) + total, 0)})
+                    )
+                # Subtrai o que foi lido (em vez de zerar) para não perder incrementos concorrentes
+                for shard in shards:
+                    CounterShard.objects.filter(pk=shard.pk).update(delta=F('delta') - shard.delta)
+            flushed += len(totals)
+        return flushed
+
+
+POST_LIKES = ShardedCounter(Post, 'likes_count', touch_field='updated_at')
+USER_FOLLOWERS = ShardedCounter(User, 'followers_count')
+
+SHARDED_COUNTERS = [POST_LIKES, USER_FOLLOWERS]
+
+
+def flush_all(batch_size=None):
+    return sum(counter.flush(batch_size) for counter in SHARDED_COUNTERS)
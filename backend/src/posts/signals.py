@@ -0,0 +1,92 @@
+# backend/src/posts/signals.py
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from users.models import Follow
+from . import hashtags, images, response_cache, search, timeline
+from .feed_engine import AuthorPostBuffer
+from .models import Post
+
+
+@receiver(post_save, sender=Post)
+def fan_out_new_post(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        timeline.fan_out_post(instance)
+        # O buffer fica no cache, fora da transação: só recebe o post se ele for commitado
+        transaction.on_commit(partial(AuthorPostBuffer().push, instance))
+
+
+@receiver(post_save, sender=Post)
+def bump_cached_timelines_on_create(sender, instance, created, raw=False, **kwargs):
+    # Também para posts criados fora da API (admin, shell): as páginas em cache mudam
+    if created and not raw:
+        _bump_timelines_on_commit(instance)
+
+
+@receiver(post_save, sender=Post)
+def index_post_text(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    # Saves de contadores (update_fields sem o texto) não mexem no índice de busca
+    if not raw and (created or update_fields is None or 'text_content' in update_fields):
+        search.index_post(instance)
+
+
+@receiver(post_save, sender=Post)
+def tag_post_hashtags(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if not raw and (created or update_fields is None or 'text_content' in update_fields):
+        hashtags.tag_post(instance, created)
+
+
+@receiver(post_delete, sender=Post)
+def discard_author_buffer(sender, instance, **kwargs):
+    # Como no push: uma leitura antes do commit reabasteceria o buffer com o post apagado
+    transaction.on_commit(partial(AuthorPostBuffer().discard, instance.user_id))
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_cached_post(sender, instance, **kwargs):
+    transaction.on_commit(partial(response_cache.invalidate_post, instance.pk))
+    _bump_timelines_on_commit(instance)
+
+
+def _bump_timelines_on_commit(post):
+    # Depois do commit: trocada antes, a versão nova poderia guardar uma página
+    # lida sem o post (ainda não commitado) por RESPONSE_CACHE_TIMEOUT
+    names = (response_cache.global_timeline(), response_cache.user_timeline(post.user.username))
+    transaction.on_commit(partial(response_cache.bump_timeline, *names))
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post_text(sender, instance, **kwargs):
+    search.unindex_post(instance.pk)
+
+
+@receiver(pre_delete, sender=Post)
+def reload_image_variants(sender, instance, **kwargs):
+    # apply_variants pode ter gravado variantes depois que `instance` foi carregado;
+    # com a linha travada até o commit, um apply_variants posterior não acha o post
+    # e libera as próprias variantes
+    current = Post.objects.select_for_update().filter(pk=instance.pk).values_list('image_variants', flat=True)
+    instance.image_variants = next(iter(current), instance.image_variants)
+
+
+@receiver(post_delete, sender=Post)
+def release_post_image(sender, instance, **kwargs):
+    # No storage endereçado por conteúdo, delete libera uma referência; nomes
+    # antigos são apagados depois do commit (ver posts/storage.py)
+    images.delete_variants(instance.image_variants)
+    if instance.image:
+        instance.image.delete(save=False)
+
+
+@receiver(post_save, sender=Follow)
+def backfill_timeline_on_follow(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and not timeline.is_pull_author(instance.following):
+        timeline.backfill_timeline(instance.follower_id, instance.following_id)
+
+
+@receiver(post_delete, sender=Follow)
+def purge_timeline_on_unfollow(sender, instance, **kwargs):
+    timeline.remove_author_from_timeline(instance.follower_id, instance.following_id)
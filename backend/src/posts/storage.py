@@ -0,0 +1,332 @@
+# backend/src/posts/storage.py
+"""
+Storage de mídia endereçado por conteúdo, com deduplicação.
+
+O nome de um arquivo gravado é o SHA-256 do conteúdo, em diretórios
+fatiados pelos primeiros caracteres do hash:
+
+    cas/ab/cd/abcdef…0123.jpg
+
+Enviar de novo o mesmo meme não grava nenhum byte: só conta mais uma
+referência em MediaBlob. Como o conteúdo de um nome nunca muda, as URLs podem
+ser cacheadas para sempre (ver posts/media.py).
+
+`delete(name)` libera uma referência em vez de apagar; quando a última sai
+(ex.: signal de Post apagado), o arquivo é coletado depois do commit, sob
+lock da linha, então um upload simultâneo do mesmo conteúdo nunca perde o
+arquivo. `collect_media` varre o que sobrar com zero referências e também
+os objetos sem linha em MediaBlob: o objeto é gravado antes da linha, e se a
+transação de quem salvou desfaz a linha, ele fica órfão no object store. Só
+são varridos os mais antigos que MEDIA_ORPHAN_GRACE_HOURS, para não pegar um
+upload cuja transação ainda está aberta.
+
+Os bytes ficam em um object store com a interface mínima de um bucket S3
+(put/open/exists/size/modified_time/delete por chave, e keys para listar):
+
+  * FileSystemObjectStore: diretório local (MEDIA_ROOT), o stand-in usado em
+    desenvolvimento e nos testes;
+  * S3ObjectStore: qualquer serviço compatível com S3 (AWS, MinIO, R2) via
+    boto3, que é dependência opcional.
+
+Nomes antigos (post_images/…, de antes deste storage) continuam legíveis e
+são apagados diretamente, como antes.
+"""
+import hashlib
+import os
+import re
+import tempfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+from functools import partial
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files import File
+from django.core.files.storage import Storage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils._os import safe_join
+from django.utils.deconstruct import deconstructible
+from django.utils.encoding import filepath_to_uri
+
+from .models import MediaBlob
+
+PREFIX = 'cas'
+CONTENT_KEY = re.compile(rf'^{PREFIX}/[0-9a-f]{{2}}/[0-9a-f]{{2}}/[0-9a-f]{{64}}(\.\w+)?$')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+ORPHAN_SWEEP_BATCH_SIZE = 1000
+
+
+def is_content_key(name):
+    return bool(CONTENT_KEY.match(name or ''))
+
+
+def content_key(digest, name):
+    extension = os.path.splitext(name)[1].lower()[:10]
+    return f'{PREFIX}/{digest[:2]}/{digest[2:4]}/{digest}{extension}'
+
+
+# --- Object stores ---
+
+class FileSystemObjectStore:
+    """Object store em um diretório local; chaves são caminhos relativos a `root` (padrão: MEDIA_ROOT)."""
+
+    def __init__(self, root=None):
+        self._root = root
+
+    @property
+    def root(self):
+        return self._root or settings.MEDIA_ROOT
+
+    def path(self, key):
+        return safe_join(self.root, key)
+
+    def exists(self, key):
+        return os.path.exists(self.path(key))
+
+    def size(self, key):
+        return os.path.getsize(self.path(key))
+
+    def modified_time(self, key):
+        return datetime.fromtimestamp(os.path.getmtime(self.path(key)), tz=dt_timezone.utc)
+
+    def open(self, key):
+        return File(open(self.path(key), 'rb'))
+
+    def put(self, key, content, content_type=None):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Grava ao lado e renomeia: quem lê nunca vê um arquivo pela metade
+        descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as target:
+                for chunk in content.chunks():
+                    target.write(chunk)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    def delete(self, key):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def keys(self, prefix):
+        """(chave, data de modificação) de cada arquivo sob `prefix`."""
+        for directory, _, names in os.walk(self.path(prefix)):
+            for name in names:
+                key = os.path.relpath(os.path.join(directory, name), self.root).replace(os.sep, '/')
+                yield key, self.modified_time(key)
+
+
+class S3ObjectStore:
+    """
+    Bucket S3 (ou compatível) via boto3; `client` permite injetar um cliente já
+    configurado. O cliente criado aqui é por processo: um filho de fork (o pool
+    de posts/images.py) não reaproveita as conexões keep-alive do pai.
+    """
+    not_found_codes = {'404', 'NoSuchKey', 'NotFound'}
+
+    def __init__(self, bucket, client=None, **client_options):
+        self.bucket = bucket
+        self._client = client
+        self._client_pid = None  # processo que criou o cliente; None para um cliente injetado
+        self.client_options = client_options
+
+    @property
+    def client(self):
+        if self._client is None or (self._client_pid is not None and self._client_pid != os.getpid()):
+            try:
+                import boto3
+            except ImportError:
+                raise ImproperlyConfigured('MEDIA_OBJECT_STORE="s3" requer o pacote boto3.')
+            self._client = boto3.client('s3', **self.client_options)
+            self._client_pid = os.getpid()
+        return self._client
+
+    def _is_not_found(self, error):
+        return str(getattr(error, 'response', {}).get('Error', {}).get('Code')) in self.not_found_codes
+
+    def _head(self, key):
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=key)
+        except Exception as error:
+            if self._is_not_found(error):
+                return None
+            raise
+
+    def _stat(self, key):
+        head = self._head(key)
+        if head is None:
+            raise FileNotFoundError(key)
+        return head
+
+    def exists(self, key):
+        return self._head(key) is not None
+
+    def size(self, key):
+        return self._stat(key)['ContentLength']
+
+    def modified_time(self, key):
+        return self._stat(key)['LastModified']
+
+    def open(self, key):
+        return File(self.client.get_object(Bucket=self.bucket, Key=key)['Body'])
+
+    def put(self, key, content, content_type=None):
+        extra = {'CacheControl': IMMUTABLE_CACHE_CONTROL}
+        if content_type:
+            extra['ContentType'] = content_type
+        content.seek(0)
+        # upload_fileobj envia em partes (multipart) sem carregar o arquivo em memória
+        self.client.upload_fileobj(content, self.bucket, key, ExtraArgs=extra)
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def keys(self, prefix):
+        """(chave, data de modificação) de cada objeto sob `prefix`."""
+        for page in self.client.get_paginator('list_objects_v2').paginate(Bucket=self.bucket, Prefix=f'{prefix}/'):
+            for item in page.get('Contents', []):
+                yield item['Key'], item['LastModified']
+
+
+def get_object_store():
+    if getattr(settings, 'MEDIA_OBJECT_STORE', 'filesystem') == 's3':
+        options = {'endpoint_url': getattr(settings, 'MEDIA_S3_ENDPOINT_URL', None) or None}
+        return S3ObjectStore(settings.MEDIA_S3_BUCKET, **options)
+    return FileSystemObjectStore()
+
+
+# --- Storage ---
+
+@deconstructible
+class ContentAddressedStorage(Storage):
+
+    def __init__(self, object_store=None, base_url=None):
+        self._object_store = object_store
+        self._base_url = base_url
+
+    @property
+    def object_store(self):
+        if self._object_store is None:
+            self._object_store = get_object_store()
+        return self._object_store
+
+    @property
+    def base_url(self):
+        return self._base_url or getattr(settings, 'MEDIA_OBJECT_BASE_URL', None) or settings.MEDIA_URL
+
+    # --- Leitura ---
+
+    def _open(self, name, mode='rb'):
+        return self.object_store.open(name)
+
+    def exists(self, name):
+        return self.object_store.exists(name)
+
+    def size(self, name):
+        return self.object_store.size(name)
+
+    def get_modified_time(self, name):
+        return self.object_store.modified_time(name)
+
+    def path(self, name):
+        if not isinstance(self.object_store, FileSystemObjectStore):
+            return super().path(name)
+        return self.object_store.path(name)
+
+    def url(self, name):
+        return self.base_url + filepath_to_uri(name)
+
+    # --- Escrita ---
+
+    def get_available_name(self, name, max_length=None):
+        # O nome final sai do conteúdo em _save; não há colisão a evitar
+        return name
+
+    def _save(self, name, content):
+        digest = hashlib.sha256()
+        size = 0
+        for chunk in content.chunks():
+            digest.update(chunk)
+            size += len(chunk)
+        key = content_key(digest.hexdigest(), name)
+
+        if self._acquire(key):
+            return key
+        # Sem linha, o objeto é gravado de novo mesmo que exista: um órfão antigo
+        # ganha data nova e sai do alcance de sweep_orphans até a linha existir
+        self.object_store.put(key, content, getattr(content, 'content_type', None))
+        try:
+            with transaction.atomic():
+                MediaBlob.objects.create(key=key, size=size, refcount=1)
+        except IntegrityError:
+            # Outro upload do mesmo conteúdo criou a linha primeiro
+            self._acquire(key)
+        return key
+
+    def _acquire(self, key):
+        return MediaBlob.objects.filter(key=key).update(refcount=F('refcount') + 1, updated_at=timezone.now())
+
+    def delete(self, name):
+        """Libera uma referência; o arquivo é coletado quando não sobra nenhuma."""
+        if not is_content_key(name):
+            # Nome antigo, sem contagem: sai só se a transação que o apagou confirmar
+            transaction.on_commit(partial(self.object_store.delete, name))
+            return
+        MediaBlob.objects.filter(key=name, refcount__gt=0).update(
+            refcount=F('refcount') - 1, updated_at=timezone.now()
+        )
+        transaction.on_commit(partial(self.collect, [name]))
+
+    def collect(self, keys=None):
+        """
+        Apaga os arquivos sem referências (de `keys` ou todos, incluindo os
+        órfãos de sweep_orphans); retorna quantos.
+        """
+        candidates = MediaBlob.objects.filter(refcount=0)
+        if keys is not None:
+            candidates = candidates.filter(key__in=keys)
+        collected = 0
+        for key in list(candidates.values_list('key', flat=True)):
+            with transaction.atomic():
+                # O lock segura um _save concorrente do mesmo conteúdo até o arquivo sair
+                blob = MediaBlob.objects.select_for_update().filter(key=key, refcount=0).first()
+                if blob is None:
+                    continue
+                self.object_store.delete(key)
+                blob.delete()
+            collected += 1
+        if keys is None:
+            collected += self.sweep_orphans()
+        return collected
+
+    def sweep_orphans(self, grace_hours=None):
+        """Apaga os objetos sem linha em MediaBlob gravados há mais de `grace_hours`; retorna quantos."""
+        grace_hours = grace_hours if grace_hours is not None else getattr(settings, 'MEDIA_ORPHAN_GRACE_HOURS', 24)
+        cutoff = timezone.now() - timedelta(hours=grace_hours)
+        swept = 0
+        batch = []
+
+        def sweep(batch):
+            known = set(MediaBlob.objects.filter(key__in=batch).values_list('key', flat=True))
+            orphans = [key for key in batch if key not in known]
+            for key in orphans:
+                # Relido na hora: um _save simultâneo regrava o objeto antes de criar a linha
+                if self.object_store.modified_time(key) < cutoff:
+                    self.object_store.delete(key)
+            return len(orphans)
+
+        for key, modified in self.object_store.keys(PREFIX):
+            # Arquivos .tmp de um put em andamento não são chaves de conteúdo
+            if is_content_key(key) and modified < cutoff:
+                batch.append(key)
+            if len(batch) >= ORPHAN_SWEEP_BATCH_SIZE:
+                swept += sweep(batch)
+                batch = []
+        if batch:
+            swept += sweep(batch)
+        return swept
@@ -1,19 +1,39 @@
 # backend/src/posts/tests.py
+import json
 import os # Importar os para manipulação de caminhos
 import shutil # Importar shutil para remover diretório
 import tempfile # Importar tempfile para criar diretórios temporários
+import warnings
+from datetime import datetime, timedelta, timezone as dt_timezone
 
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.exceptions import ValidationError
+from config.testing import APITestCase
 from django.core.files.uploadedfile import SimpleUploadedFile # ADICIONAR ESTE IMPORT
 from users.models import Follow
-from posts.models import Post, Like
+from posts.models import Post, Like, Comment, CounterShard, TimelineEntry, Hashtag, PostHashtag, TrendSnapshot, MediaUpload, MediaBlob
+from posts import response_cache
+from posts.feed_engine import AuthorPostBuffer
+from posts.benchmark import summarize
+from posts.counters import reconcile_post_counters
+from posts.hashtags import extract_hashtags
+from posts.serializers import PostCreateSerializer
+from posts.images import apply_variants, get_pool, render_variants, store_variants
+from posts.storage import ContentAddressedStorage, FileSystemObjectStore, S3ObjectStore
+from posts.trends import SpaceSaving, TrendingEngine, TrendsWorker, latest_snapshot
+from posts.uploads import UploadOffsetConflict, append_chunk, upload_path
 
 # Para criar imagem em memória nos testes
 from PIL import Image
-from io import BytesIO
+from io import BytesIO, StringIO
 
 User = get_user_model()
 
@@ -91,7 +111,7 @@ class PostCreationAndListingTests(APITestCase, TemporaryMediaRootMixin):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(Post.objects.count(), 4)
         self.assertIsNotNone(response.data['image'])
-        self.assertIn('http://testserver/media/post_images/', response.data['image'])
+        self.assertIn('http://testserver/media/cas/', response.data['image'])
 
     def test_create_post_unauthenticated(self):
         data = {'text_content': 'This post should fail.'}
@@ -112,12 +132,13 @@ class PostCreationAndListingTests(APITestCase, TemporaryMediaRootMixin):
         self.client.force_authenticate(user=self.user)
         response = self.client.get(self.post_list_create_url, format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 3)
-        self.assertEqual(response.data[0]['id'], self.post3.id) 
-        self.assertEqual(response.data[1]['id'], self.post2.id)
-        self.assertEqual(response.data[2]['id'], self.post1.id)
+        results = response.data['results']
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0]['id'], self.post3.id) 
+        self.assertEqual(results[1]['id'], self.post2.id)
+        self.assertEqual(results[2]['id'], self.post1.id)
         
-        for post_data in response.data:
+        for post_data in results:
             if post_data['id'] == self.post1.id:
                 self.assertTrue(post_data['is_liked_by_viewer'])
             elif post_data['id'] == self.post2.id:
@@ -126,8 +147,8 @@ class PostCreationAndListingTests(APITestCase, TemporaryMediaRootMixin):
     def test_list_all_posts_unauthenticated(self):
         response = self.client.get(self.post_list_create_url, format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 3)
-        for post_data in response.data:
+        self.assertEqual(len(response.data['results']), 3)
+        for post_data in response.data['results']:
             self.assertFalse(post_data['is_liked_by_viewer'])
 
     def test_list_following_posts_authenticated(self):
@@ -137,10 +158,11 @@ class PostCreationAndListingTests(APITestCase, TemporaryMediaRootMixin):
         response = self.client.get(self.following_posts_url, format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         
-        self.assertEqual(len(response.data), 2) 
-        self.assertEqual(response.data[0]['user']['username'], self.user.username)
-        self.assertEqual(response.data[1]['user']['username'], self.user.username)
-        self.assertEqual(response.data[0]['id'], self.post3.id)
+        results = response.data['results']
+        self.assertEqual(len(results), 2) 
+        self.assertEqual(results[0]['user']['username'], self.user.username)
+        self.assertEqual(results[1]['user']['username'], self.user.username)
+        self.assertEqual(results[0]['id'], self.post3.id)
 
     def test_list_following_posts_unauthenticated(self):
         response = self.client.get(self.following_posts_url, format='json')
@@ -150,7 +172,1074 @@ class PostCreationAndListingTests(APITestCase, TemporaryMediaRootMixin):
         self.client.force_authenticate(user=self.user)
         response = self.client.get(self.following_posts_url, format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 0)
+        self.assertEqual(len(response.data['results']), 0)
+
+class PostCursorPaginationTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='pager', email='pager@example.com', password='password123', display_name='Pager User'
+        )
+        self.posts = [Post.objects.create(user=self.user, text_content=f"Post {i}") for i in range(5)]
+        self.post_list_create_url = reverse('post-list-create')
+        self.user_posts_url = reverse('user-post-list', kwargs={'username': self.user.username})
+
+    def test_walk_forward_and_back_with_cursors(self):
+        response = self.client.get(self.post_list_create_url, {'page_size': 2}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([p['id'] for p in response.data['results']], [self.posts[4].id, self.posts[3].id])
+        self.assertIsNone(response.data['previous'])
+        self.assertIsNotNone(response.data['next'])
+
+        response = self.client.get(response.data['next'], format='json')
+        self.assertEqual([p['id'] for p in response.data['results']], [self.posts[2].id, self.posts[1].id])
+
+        last_page = self.client.get(response.data['next'], format='json')
+        self.assertEqual([p['id'] for p in last_page.data['results']], [self.posts[0].id])
+        self.assertIsNone(last_page.data['next'])
+
+        response = self.client.get(response.data['previous'], format='json')
+        self.assertEqual([p['id'] for p in response.data['results']], [self.posts[4].id, self.posts[3].id])
+        self.assertIsNone(response.data['previous'])
+
+    def test_same_timestamp_is_ordered_by_id(self):
+        Post.objects.update(created_at=self.posts[0].created_at)
+        response = self.client.get(self.user_posts_url, {'page_size': 3}, format='json')
+        first_ids = [p['id'] for p in response.data['results']]
+        response = self.client.get(response.data['next'], format='json')
+        second_ids = [p['id'] for p in response.data['results']]
+        self.assertEqual(first_ids + second_ids, [p.id for p in reversed(self.posts)])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.post_list_create_url, {'after': 'not-a-cursor'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+class HomeTimelineFanOutTests(APITestCase):
+
+    def setUp(self):
+        self.author = User.objects.create_user(
+            username='author', email='author@example.com', password='password123', display_name='Author'
+        )
+        self.reader = User.objects.create_user(
+            username='reader', email='reader@example.com', password='password123', display_name='Reader'
+        )
+        self.old_post = Post.objects.create(user=self.author, text_content="Before the follow.")
+        self.following_posts_url = reverse('post-following-list')
+        self.post_list_create_url = reverse('post-list-create')
+        self.follow_url = reverse('follow-user', kwargs={'id': self.author.id})
+        self.unfollow_url = reverse('unfollow-user', kwargs={'id': self.author.id})
+
+    def _timeline_ids(self):
+        self.client.force_authenticate(user=self.reader)
+        response = self.client.get(self.following_posts_url, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [p['id'] for p in response.data['results']]
+
+    def test_follow_backfills_and_new_posts_fan_out(self):
+        self.client.force_authenticate(user=self.reader)
+        self.client.post(self.follow_url, format='json')
+        self.assertEqual(self._timeline_ids(), [self.old_post.id])
+
+        self.client.force_authenticate(user=self.author)
+        response = self.client.post(self.post_list_create_url, {'text_content': 'Fresh post.'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self._timeline_ids(), [response.data['id'], self.old_post.id])
+
+    def test_unfollow_and_post_deletion_trim_timeline(self):
+        self.client.force_authenticate(user=self.reader)
+        self.client.post(self.follow_url, format='json')
+        new_post = Post.objects.create(user=self.author, text_content="Second.")
+        self.assertEqual(TimelineEntry.objects.filter(owner=self.reader).count(), 2)
+
+        new_post.delete()
+        self.assertEqual(self._timeline_ids(), [self.old_post.id])
+
+        self.client.force_authenticate(user=self.reader)
+        self.client.delete(self.unfollow_url, format='json')
+        self.assertEqual(self._timeline_ids(), [])
+
+    @override_settings(HOME_TIMELINE_MAX_LENGTH=2)
+    def test_timeline_is_bounded(self):
+        Follow.objects.create(follower=self.reader, following=self.author)
+        newest = [Post.objects.create(user=self.author, text_content=f"Post {i}") for i in range(3)]
+        # O fan-out não apara; o comando periódico sim
+        self.assertEqual(TimelineEntry.objects.filter(owner=self.reader).count(), 4)
+        call_command('trim_timelines', stdout=StringIO())
+        self.assertEqual(self._timeline_ids(), [newest[2].id, newest[1].id])
+
+@override_settings(TIMELINE_PULL_FOLLOWER_THRESHOLD=2, AUTHOR_BUFFER_SIZE=3)
+class PullTimelineMergeTests(APITestCase):
+
+    def setUp(self):
+        self.reader = User.objects.create_user(
+            username='reader', email='reader@example.com', password='password123', display_name='Reader'
+        )
+        self.celebrity = User.objects.create_user(
+            username='celebrity', email='celebrity@example.com', password='password123',
+            display_name='Celebrity', followers_count=2
+        )
+        self.friend = User.objects.create_user(
+            username='friend', email='friend@example.com', password='password123', display_name='Friend'
+        )
+        Follow.objects.create(follower=self.reader, following=self.celebrity)
+        Follow.objects.create(follower=self.reader, following=self.friend)
+        self.following_posts_url = reverse('post-following-list')
+
+    def _walk(self, page_size):
+        self.client.force_authenticate(user=self.reader)
+        response = self.client.get(self.following_posts_url, {'page_size': page_size}, format='json')
+        ids = [p['id'] for p in response.data['results']]
+        while response.data['next']:
+            response = self.client.get(response.data['next'], format='json')
+            ids += [p['id'] for p in response.data['results']]
+        return ids
+
+    def test_celebrity_posts_skip_fan_out_but_are_merged(self):
+        posts = []
+        for i in range(3):
+            posts.append(Post.objects.create(user=self.friend, text_content=f"Friend {i}"))
+            posts.append(Post.objects.create(user=self.celebrity, text_content=f"Celebrity {i}"))
+        self.assertFalse(TimelineEntry.objects.filter(post__user=self.celebrity).exists())
+        self.assertEqual(self._walk(page_size=4), [p.id for p in reversed(posts)])
+
+    def test_author_buffer_receives_the_post_only_after_commit(self):
+        Post.objects.create(user=self.celebrity, text_content="Buffered")
+        buffer = AuthorPostBuffer()
+        buffer.get_many([self.celebrity.id])
+        with self.captureOnCommitCallbacks() as callbacks:
+            pending = Post.objects.create(user=self.celebrity, text_content="Pending")
+            self.assertNotIn(pending.id, [pk for _, pk in buffer.get_many([self.celebrity.id])[self.celebrity.id]])
+        for callback in callbacks:
+            callback()
+        self.assertIn(pending.id, [pk for _, pk in buffer.get_many([self.celebrity.id])[self.celebrity.id]])
+
+    def test_author_buffer_is_discarded_only_after_commit(self):
+        post = Post.objects.create(user=self.celebrity, text_content="Doomed")
+        post_id = post.pk
+        buffer = AuthorPostBuffer()
+        buffer.get_many([self.celebrity.id])
+        with self.captureOnCommitCallbacks() as callbacks:
+            post.delete()
+        # Um rollback aqui deixaria o buffer intacto
+        self.assertIn(post_id, [pk for _, pk in buffer.get_many([self.celebrity.id])[self.celebrity.id]])
+        for callback in callbacks:
+            callback()
+        self.assertNotIn(post_id, [pk for _, pk in buffer.get_many([self.celebrity.id])[self.celebrity.id]])
+
+    @override_settings(WEB_CONCURRENCY=4)
+    def test_buffer_is_read_from_the_database_when_the_cache_is_per_worker(self):
+        buffer = AuthorPostBuffer()
+        self.assertEqual(buffer.get_many([self.celebrity.id])[self.celebrity.id], [])
+        # Sem commit callbacks: outro worker teria criado o post
+        post = Post.objects.create(user=self.celebrity, text_content="Elsewhere")
+        self.assertEqual([pk for _, pk in buffer.get_many([self.celebrity.id])[self.celebrity.id]], [post.pk])
+
+    def test_deep_pages_fall_back_to_database(self):
+        posts = [Post.objects.create(user=self.celebrity, text_content=f"Post {i}") for i in range(7)]
+        self.assertEqual(self._walk(page_size=2), [p.id for p in reversed(posts)])
+
+class ViewerStateBatchingTests(APITestCase):
+
+    def setUp(self):
+        self.viewer = User.objects.create_user(
+            username='viewer', email='viewer@example.com', password='password123', display_name='Viewer'
+        )
+        self.posts = [Post.objects.create(user=self.viewer, text_content=f"Post {i}") for i in range(6)]
+        Like.objects.create(user=self.viewer, post=self.posts[1])
+        Like.objects.create(user=self.viewer, post=self.posts[4])
+        self.post_list_create_url = reverse('post-list-create')
+
+    def test_likes_resolved_in_a_single_query(self):
+        self.client.force_authenticate(user=self.viewer)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.post_list_create_url, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        like_queries = [q['sql'] for q in queries.captured_queries if 'posts_like' in q['sql']]
+        self.assertEqual(len(like_queries), 1)
+        liked = {p['id'] for p in response.data['results'] if p['is_liked_by_viewer']}
+        self.assertEqual(liked, {self.posts[1].id, self.posts[4].id})
+
+class CounterReconciliationTests(APITestCase):
+
+    def setUp(self):
+        self.author = User.objects.create_user(
+            username='author', email='author@example.com', password='password123', display_name='Author'
+        )
+        self.fan = User.objects.create_user(
+            username='fan', email='fan@example.com', password='password123', display_name='Fan'
+        )
+        self.posts = [Post.objects.create(user=self.author, text_content=f"Post {i}") for i in range(3)]
+
+    def test_serializer_reads_stored_comments_count(self):
+        Post.objects.filter(pk=self.posts[0].pk).update(comments_count=7)
+        response = self.client.get(reverse('post-detail', kwargs={'pk': self.posts[0].pk}), format='json')
+        self.assertEqual(response.data['comments_count'], 7)
+
+    def test_reconcile_repairs_drifted_counters(self):
+        Like.objects.create(user=self.fan, post=self.posts[0])
+        Comment.objects.create(post=self.posts[1], author=self.fan, content="Nice")
+        Follow.objects.create(follower=self.fan, following=self.author)
+        Post.objects.filter(pk=self.posts[2].pk).update(likes_count=5)
+
+        call_command('reconcile_counters', batch_size=2, stdout=StringIO())
+
+        likes = dict(Post.objects.values_list('pk', 'likes_count'))
+        comments = dict(Post.objects.values_list('pk', 'comments_count'))
+        self.assertEqual([likes[p.pk] for p in self.posts], [1, 0, 0])
+        self.assertEqual([comments[p.pk] for p in self.posts], [0, 1, 0])
+        self.author.refresh_from_db()
+        self.fan.refresh_from_db()
+        self.assertEqual((self.author.followers_count, self.fan.following_count), (1, 1))
+
+    def test_reconcile_invalidates_cached_post_and_profile(self):
+        Post.objects.filter(pk=self.posts[0].pk).update(likes_count=5)
+        User.objects.filter(pk=self.author.pk).update(followers_count=9)
+        post_url = reverse('post-detail', kwargs={'pk': self.posts[0].pk})
+        profile_url = reverse('user-detail', kwargs={'username': self.author.username})
+        self.assertEqual(self.client.get(post_url).data['likes_count'], 5)
+        self.assertEqual(self.client.get(profile_url).data['followers_count'], 9)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('reconcile_counters', stdout=StringIO())
+
+        self.assertEqual(self.client.get(post_url).data['likes_count'], 0)
+        self.assertEqual(self.client.get(profile_url).data['followers_count'], 0)
+
+    def test_unlike_never_goes_negative(self):
+        Like.objects.create(user=self.fan, post=self.posts[0])
+        self.client.force_authenticate(user=self.fan)
+        response = self.client.post(reverse('post-like', kwargs={'post_id': self.posts[0].pk}), format='json')
+        self.assertEqual(response.data['status'], 'unliked')
+        self.posts[0].refresh_from_db()
+        self.assertEqual(self.posts[0].likes_count, 0)
+
+@override_settings(HOT_COUNTER_THRESHOLD=10, COUNTER_SHARDS=4)
+class ShardedCounterTests(APITestCase):
+
+    def setUp(self):
+        self.author = User.objects.create_user(
+            username='author', email='author@example.com', password='password123', display_name='Author'
+        )
+        self.hot_post = Post.objects.create(user=self.author, text_content="Viral", likes_count=10)
+        self.fans = [
+            User.objects.create_user(
+                username=f'fan{i}', email=f'fan{i}@example.com', password='password123', display_name=f'Fan {i}'
+            )
+            for i in range(3)
+        ]
+        self.post_like_url = reverse('post-like', kwargs={'post_id': self.hot_post.id})
+        self.post_detail_url = reverse('post-detail', kwargs={'pk': self.hot_post.id})
+
+    def test_hot_post_likes_are_buffered_then_flushed(self):
+        for fan in self.fans:
+            self.client.force_authenticate(user=fan)
+            self.client.post(self.post_like_url, format='json')
+
+        self.hot_post.refresh_from_db()
+        self.assertEqual(self.hot_post.likes_count, 10)
+        self.assertTrue(CounterShard.objects.exists())
+        response = self.client.get(self.post_detail_url, format='json')
+        self.assertEqual(response.data['likes_count'], 13)
+
+        call_command('flush_counters', stdout=StringIO())
+        self.hot_post.refresh_from_db()
+        self.assertEqual(self.hot_post.likes_count, 13)
+        self.assertFalse(CounterShard.objects.exclude(delta=0).exists())
+        response = self.client.get(self.post_detail_url, format='json')
+        self.assertEqual(response.data['likes_count'], 13)
+
+    def test_reconcile_discounts_pending_shards(self):
+        # Likes que chegam depois do flush inicial do reconcile ficam nos shards
+        for fan in self.fans:
+            self.client.force_authenticate(user=fan)
+            self.client.put(self.post_like_url, format='json')
+
+        reconcile_post_counters()
+        self.hot_post.refresh_from_db()
+        self.assertEqual(self.hot_post.likes_count, 0)
+        call_command('flush_counters', stdout=StringIO())
+        self.hot_post.refresh_from_db()
+        self.assertEqual(self.hot_post.likes_count, 3)
+
+class PostStateTests(APITestCase):
+
+    def setUp(self):
+        self.viewer = User.objects.create_user(
+            username='viewer', email='viewer@example.com', password='password123', display_name='Viewer'
+        )
+        self.posts = [Post.objects.create(user=self.viewer, text_content=f"Post {i}") for i in range(3)]
+        Like.objects.create(user=self.viewer, post=self.posts[2])
+        Post.objects.filter(pk=self.posts[2].pk).update(likes_count=1, comments_count=4)
+        self.state_url = reverse('post-state')
+
+    def test_bulk_state_in_two_queries(self):
+        self.client.force_authenticate(user=self.viewer)
+        ids = [self.posts[2].id, 9999, self.posts[0].id]
+        with self.assertNumQueries(2):
+            response = self.client.post(self.state_url, {'ids': ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in response.data['results']], [self.posts[2].id, self.posts[0].id])
+        self.assertEqual(response.data['missing'], [9999])
+        first = response.data['results'][0]
+        self.assertEqual((first['likes_count'], first['comments_count']), (1, 4))
+        self.assertTrue(first['is_liked_by_viewer'])
+        self.assertFalse(response.data['results'][1]['is_liked_by_viewer'])
+
+    def test_rejects_invalid_payloads(self):
+        response = self.client.post(self.state_url, {'ids': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(self.state_url, {'ids': [1, 2, 3] * 200}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+class ResponseCacheTests(APITestCase):
+
+    def setUp(self):
+        self.author = User.objects.create_user(
+            username='author', email='author@example.com', password='password123', display_name='Author'
+        )
+        self.viewer = User.objects.create_user(
+            username='viewer', email='viewer@example.com', password='password123', display_name='Viewer'
+        )
+        self.post = Post.objects.create(user=self.author, text_content="Cached post.")
+        self.post_detail_url = reverse('post-detail', kwargs={'pk': self.post.id})
+        self.user_posts_url = reverse('user-post-list', kwargs={'username': self.author.username})
+
+    def test_detail_is_served_from_cache_with_viewer_fields(self):
+        self.client.get(self.post_detail_url, format='json')
+        Like.objects.create(user=self.viewer, post=self.post)
+        Post.objects.filter(pk=self.post.pk).update(text_content="Changed behind the cache.")
+
+        self.client.force_authenticate(user=self.viewer)
+        with self.assertNumQueries(2):
+            response = self.client.get(self.post_detail_url, format='json')
+        self.assertEqual(response.data['text_content'], "Cached post.")
+        self.assertTrue(response.data['is_liked_by_viewer'])
+        self.assertFalse(response.data['user']['is_followed_by_viewer'])
+
+    @override_settings(WEB_CONCURRENCY=4)
+    def test_process_local_cache_is_bypassed_with_several_workers(self):
+        self.client.get(self.post_detail_url, format='json')
+        self.client.get(self.user_posts_url, format='json')
+        Post.objects.filter(pk=self.post.pk).update(text_content="Seen by every worker.")
+
+        self.assertEqual(self.client.get(self.post_detail_url, format='json').data['text_content'], "Seen by every worker.")
+        self.assertEqual(
+            self.client.get(self.user_posts_url, format='json').data['results'][0]['text_content'],
+            "Seen by every worker.",
+        )
+
+    def test_like_and_comment_invalidate_the_fragment(self):
+        self.client.get(self.post_detail_url, format='json')
+        self.client.force_authenticate(user=self.viewer)
+
+        self.client.put(reverse('post-like', kwargs={'post_id': self.post.id}), format='json')
+        self.assertEqual(self.client.get(self.post_detail_url, format='json').data['likes_count'], 1)
+
+        self.client.post(
+            reverse('comment-list-create', kwargs={'post_id': self.post.id}), {'content': 'Hi'}, format='json'
+        )
+        self.assertEqual(self.client.get(self.post_detail_url, format='json').data['comments_count'], 1)
+
+    def test_create_and_delete_bump_the_timeline_pages(self):
+        self.assertEqual(len(self.client.get(self.user_posts_url, format='json').data['results']), 1)
+        with self.assertNumQueries(0):
+            self.client.get(self.user_posts_url, format='json')
+
+        self.client.force_authenticate(user=self.author)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('post-list-create'), {'text_content': 'New one.'}, format='json')
+        self.client.force_authenticate(user=None)
+        self.assertEqual(len(self.client.get(self.user_posts_url, format='json').data['results']), 2)
+
+        self.client.force_authenticate(user=self.author)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse('post-detail', kwargs={'pk': response.data['id']}), format='json')
+        self.client.force_authenticate(user=None)
+        self.assertEqual(len(self.client.get(self.user_posts_url, format='json').data['results']), 1)
+        self.assertEqual(self.client.get(
+            reverse('post-detail', kwargs={'pk': response.data['id']}), format='json'
+        ).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cached_page_links_follow_the_request_host_and_scheme(self):
+        Post.objects.create(user=self.author, text_content="Second.")
+        internal = self.client.get(self.user_posts_url, {'page_size': 1}, HTTP_HOST='localhost')
+        self.assertTrue(internal.data['next'].startswith('http://localhost/'))
+
+        public = self.client.get(
+            self.user_posts_url, {'page_size': 1}, HTTP_HOST='127.0.0.1', HTTP_X_FORWARDED_PROTO='https'
+        )
+        self.assertTrue(public.data['next'].startswith('https://127.0.0.1/'))
+        self.assertEqual(public.data['next'].split('/', 3)[3], internal.data['next'].split('/', 3)[3])
+
+    def test_timeline_version_changes_only_after_commit(self):
+        name = response_cache.user_timeline(self.author.username)
+        version = response_cache.get_timeline_version(name)
+        with self.captureOnCommitCallbacks() as callbacks:
+            Post.objects.create(user=self.author, text_content="Not committed yet.")
+            # Um leitor agora não vê o post; a versão antiga não deixa a página dele valer depois
+            self.assertEqual(response_cache.get_timeline_version(name), version)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(response_cache.get_timeline_version(name), version)
+
+class HomeFeedConditionalGetTests(APITestCase):
+
+    def setUp(self):
+        self.author = User.objects.create_user(
+            username='author', email='author@example.com', password='password123', display_name='Author'
+        )
+        self.reader = User.objects.create_user(
+            username='reader', email='reader@example.com', password='password123', display_name='Reader'
+        )
+        Follow.objects.create(follower=self.reader, following=self.author)
+        self.post = Post.objects.create(user=self.author, text_content="Polled post.")
+        self.following_posts_url = reverse('post-following-list')
+
+    def test_unchanged_feed_answers_304_and_likes_invalidate(self):
+        self.client.force_authenticate(user=self.reader)
+        etag = self.client.get(self.following_posts_url, format='json')['ETag']
+
+        response = self.client.get(self.following_posts_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.put(reverse('post-like', kwargs={'post_id': self.post.id}), format='json')
+        response = self.client.get(self.following_posts_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['results'][0]['is_liked_by_viewer'])
+
+        Post.objects.create(user=self.author, text_content="Newer.")
+        response = self.client.get(self.following_posts_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_deleting_the_newest_post_changes_the_etag_and_sends_no_last_modified(self):
+        self.client.force_authenticate(user=self.reader)
+        newest = Post.objects.create(user=self.author, text_content="Newest.")
+        response = self.client.get(self.following_posts_url, format='json')
+        self.assertFalse(response.has_header('Last-Modified'))
+
+        self.client.force_authenticate(user=self.author)
+        self.client.delete(reverse('post-detail', kwargs={'pk': newest.id}))
+        self.client.force_authenticate(user=self.reader)
+        response = self.client.get(self.following_posts_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([post['id'] for post in response.data['results']], [self.post.id])
+
+    def test_full_response_reuses_the_page_resolved_for_the_etag(self):
+        self.client.force_authenticate(user=self.reader)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.following_posts_url, format='json')
+        timeline_reads = [query for query in queries if 'posts_timelineentry' in query['sql']]
+        self.assertEqual(len(timeline_reads), 1)
+
+    @override_settings(WEB_CONCURRENCY=4)
+    def test_no_validators_without_a_shared_cache(self):
+        self.client.force_authenticate(user=self.reader)
+        response = self.client.get(self.following_posts_url, format='json')
+        self.assertFalse(response.has_header('ETag'))
+        self.assertEqual(len(response.data['results']), 1)
+
+class PostSearchTests(APITestCase):
+
+    def setUp(self):
+        self.author = User.objects.create_user(
+            username='author', email='author@example.com', password='password123', display_name='Author'
+        )
+        self.search_url = reverse('post-search')
+
+    def search(self, query, **params):
+        response = self.client.get(self.search_url, {'q': query, **params}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_matches_all_terms_ignoring_accents_with_prefix_on_last(self):
+        match = Post.objects.create(user=self.author, text_content='Café com código novo.')
+        Post.objects.create(user=self.author, text_content='Só café hoje.')
+
+        ids = [post['id'] for post in self.search('cafe codig').data['results']]
+        self.assertEqual(ids, [match.id])
+        self.assertEqual(self.search('"café" OR').data['results'], [])
+
+    def test_empty_query_is_rejected(self):
+        response = self.client.get(self.search_url, {'q': ' !? '}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_ranks_by_relevance_tier_then_recency(self):
+        phrase = Post.objects.create(user=self.author, text_content='Fim do deploy noturno.')
+        scattered = Post.objects.create(user=self.author, text_content='O noturno terminou, deploy feito.')
+        older_prefix = Post.objects.create(user=self.author, text_content='Deploy de novo, noturnos de sempre.')
+        newer_prefix = Post.objects.create(user=self.author, text_content='Mais um deploy, turnos noturnos.')
+        Post.objects.filter(pk=phrase.pk).update(created_at=timezone.now() - timedelta(days=30))
+
+        ids = [post['id'] for post in self.search('deploy noturno').data['results']]
+        self.assertEqual(ids, [phrase.id, scattered.id, newer_prefix.id, older_prefix.id])
+
+    def test_cursor_does_not_depend_on_the_rest_of_the_index(self):
+        posts = [Post.objects.create(user=self.author, text_content=f'Deploy número {i}.') for i in range(4)]
+        first = self.search('deploy', page_size=2)
+
+        # Posts novos mudam as estatísticas do índice, não a posição dos antigos
+        Post.objects.create(user=self.author, text_content='deploy deploy deploy deploy')
+        second = self.client.get(first.data['next'], format='json')
+        pages = [[post['id'] for post in page.data['results']] for page in (first, second)]
+        self.assertEqual(sum(pages, []), [post.id for post in reversed(posts)])
+
+    def test_cursor_pages_are_stable_and_deleted_posts_leave_the_index(self):
+        posts = [Post.objects.create(user=self.author, text_content=f'Projeto número {i}.') for i in range(5)]
+
+        first = self.search('projeto', page_size=2)
+        second = self.client.get(first.data['next'], format='json')
+        third = self.client.get(second.data['next'], format='json')
+        pages = [[post['id'] for post in page.data['results']] for page in (first, second, third)]
+        self.assertEqual(sum(pages, []), [post.id for post in reversed(posts)])
+        self.assertIsNone(third.data['next'])
+        back = self.client.get(second.data['previous'], format='json')
+        self.assertEqual([post['id'] for post in back.data['results']], pages[0])
+
+        self.client.force_authenticate(user=self.author)
+        self.client.delete(reverse('post-detail', kwargs={'pk': posts[-1].id}))
+        ids = [post['id'] for post in self.search('projeto').data['results']]
+        self.assertNotIn(posts[-1].id, ids)
+        self.assertEqual(len(ids), 4)
+
+class HashtagTests(APITestCase):
+
+    def setUp(self):
+        self.author = User.objects.create_user(
+            username='author', email='author@example.com', password='password123', display_name='Author'
+        )
+
+    def test_extraction_normalizes_and_skips_non_tags(self):
+        self.assertEqual(
+            extract_hashtags('#Deploy de sexta #deploy, #café! e#nao ##dupla #123 #v2'),
+            ['deploy', 'café', 'v2'],
+        )
+
+    def test_tags_are_written_with_the_post_and_feed_lists_them(self):
+        self.client.force_authenticate(user=self.author)
+        self.client.post(reverse('post-list-create'), {'text_content': 'Subiu o #Deploy'}, format='json')
+        newer = Post.objects.create(user=self.author, text_content='Outro #deploy do dia #café')
+        Post.objects.create(user=self.author, text_content='Sem hashtag')
+
+        self.assertEqual(set(Hashtag.objects.values_list('name', flat=True)), {'deploy', 'café'})
+        response = self.client.get(reverse('hashtag-post-list', kwargs={'name': 'DEPLOY'}), format='json')
+        self.assertEqual(
+            [post['text_content'] for post in response.data['results']], [newer.text_content, 'Subiu o #Deploy']
+        )
+
+        newer.text_content = 'Editado, só #café'
+        newer.save()
+        self.assertEqual(list(newer.hashtag_links.values_list('hashtag__name', flat=True)), ['café'])
+
+
+class TrendingTests(APITestCase):
+
+    def setUp(self):
+        self.author = User.objects.create_user(
+            username='author', email='author@example.com', password='password123', display_name='Author'
+        )
+
+    def test_space_saving_keeps_heavy_hitters_in_bounded_memory(self):
+        summary = SpaceSaving(capacity=3)
+        for key in ['a'] * 50 + ['b'] * 30 + [f'ruido{i}' for i in range(100)] + ['a'] * 5:
+            summary.add(key)
+        self.assertEqual(len(summary.counts), 3)
+        # Superestimativa limitada pelo erro registrado
+        self.assertGreaterEqual(summary.counts['a'], 55)
+        self.assertLessEqual(summary.counts['a'] - summary.errors['a'], 55)
+
+    def test_window_slides_by_bucket(self):
+        now = timezone.now()
+        engine = TrendingEngine(window=timedelta(hours=1), bucket_seconds=600, capacity=10)
+        engine.add('velha', now - timedelta(minutes=55), now)
+        engine.add('nova', now, now)
+        engine.add('nova', now - timedelta(minutes=5), now)
+        engine.add('antiga', now - timedelta(hours=3), now)
+        self.assertEqual(engine.top(), [{'hashtag': 'nova', 'posts_count': 2}, {'hashtag': 'velha', 'posts_count': 1}])
+
+        engine.expire(now + timedelta(minutes=20))
+        self.assertEqual(engine.top(), [{'hashtag': 'nova', 'posts_count': 2}])
+
+    def test_worker_streams_new_tags_and_view_serves_snapshot(self):
+        self.assertEqual(self.client.get(reverse('trends')).data['results'], [])
+        Post.objects.create(user=self.author, text_content='#python #django')
+        old = Post.objects.create(user=self.author, text_content='#antigo')
+        PostHashtag.objects.filter(post=old).update(created_at=timezone.now() - timedelta(days=2))
+
+        worker = TrendsWorker()
+        worker.tick()
+        Post.objects.create(user=self.author, text_content='#django de novo')
+        worker.tick()
+
+        response = self.client.get(reverse('trends'))
+        self.assertEqual(
+            response.data['results'],
+            [{'hashtag': 'django', 'posts_count': 2}, {'hashtag': 'python', 'posts_count': 1}],
+        )
+        self.assertIn('max-age', response['Cache-Control'])
+        self.assertEqual(TrendSnapshot.objects.count(), 1)
+
+    def test_worker_counts_rows_committed_out_of_id_order_once(self):
+        now = timezone.now()
+        early = Post.objects.create(user=self.author, text_content='#tarde')
+        Post.objects.create(user=self.author, text_content='#cedo')
+        # O uso de menor id só fica visível depois do primeiro tick (commit atrasado)
+        late = PostHashtag.objects.get(post=early)
+        late.delete()
+
+        worker = TrendsWorker(overlap=timedelta(minutes=1))
+        worker.tick(now)
+        PostHashtag.objects.create(pk=late.pk, post=early, hashtag=late.hashtag, created_at=now - timedelta(seconds=30))
+        worker.tick(now + timedelta(seconds=10))
+        worker.tick(now + timedelta(seconds=20))
+
+        self.assertCountEqual(
+            latest_snapshot().items,
+            [{'hashtag': 'cedo', 'posts_count': 1}, {'hashtag': 'tarde', 'posts_count': 1}],
+        )
+
+    def test_run_trends_once(self):
+        Post.objects.create(user=self.author, text_content='#python')
+        out = StringIO()
+        call_command('run_trends', '--once', stdout=out)
+        self.assertIn('1 hashtag(s)', out.getvalue())
+        self.assertEqual(latest_snapshot().items, [{'hashtag': 'python', 'posts_count': 1}])
+
+class PostImagePipelineTests(APITestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, IMAGE_PROCESSING_WORKERS=0)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.author = User.objects.create_user(
+            username='author', email='author@example.com', password='password123', display_name='Author'
+        )
+
+    def upload(self, size=(3000, 1500), mode='RGB', fmt='JPEG', **save_options):
+        content = BytesIO()
+        Image.new(mode, size, color='red').save(content, fmt, **save_options)
+        return SimpleUploadedFile(f'photo.{fmt.lower()}', content.getvalue(), content_type=f'image/{fmt.lower()}')
+
+    def test_variants_are_resized_reencoded_and_stripped(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Orientation: girada 90°
+        exif[0x010F] = 'Camera'
+        post = Post.objects.create(user=self.author, image=self.upload(exif=exif.tobytes()))
+
+        variants = store_variants(post.image.name, render_variants(post.image.name))
+        self.assertTrue(variants['placeholder'].startswith('data:image/jpeg;base64,'))
+        self.assertLess(len(variants['placeholder']), 1000)
+        timeline = variants['variants']['timeline']
+        # A orientação foi aplicada antes de descartar o EXIF
+        self.assertEqual((timeline['width'], timeline['height']), (340, 680))
+        for entry in variants['variants'].values():
+            for fmt in ('jpeg', 'webp'):
+                with default_storage.open(entry[fmt]) as stored, Image.open(stored) as image:
+                    self.assertEqual(image.format, fmt.upper())
+                    self.assertEqual(len(image.getexif()), 0)
+                    self.assertLessEqual(max(image.size), 2048)
+
+    def test_transparent_png_gets_white_jpeg_fallback(self):
+        post = Post.objects.create(user=self.author, image=self.upload(size=(40, 20), mode='RGBA', fmt='PNG'))
+        variants = store_variants(post.image.name, render_variants(post.image.name))['variants']
+        # Sem ampliar imagens pequenas
+        self.assertEqual((variants['full']['width'], variants['full']['height']), (40, 20))
+        with default_storage.open(variants['full']['jpeg']) as stored, Image.open(stored) as image:
+            self.assertEqual(image.mode, 'RGB')
+
+    def test_created_post_exposes_variant_urls_after_commit(self):
+        self.client.force_authenticate(user=self.author)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('post-list-create'), {'image': self.upload()}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        data = self.client.get(reverse('post-detail', kwargs={'pk': response.data['id']}), format='json').data
+        self.assertEqual(set(data['image_variants']), {'placeholder', 'thumbnail', 'timeline', 'full'})
+        self.assertRegex(data['image_variants']['thumbnail']['webp'], r'^http://testserver/media/cas/[0-9a-f/]+\.webp$')
+        self.assertEqual(data['image_variants']['thumbnail']['width'], 160)
+
+        post = Post.objects.get(pk=response.data['id'])
+        names = [post.image.name] + [entry['jpeg'] for entry in post.image_variants['variants'].values()]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse('post-detail', kwargs={'pk': post.pk}))
+        self.assertFalse(any(default_storage.exists(name) for name in names))
+        self.assertFalse(MediaBlob.objects.exists())
+
+    def test_applying_variants_moves_updated_at(self):
+        # O ETag do feed usa updated_at: o fim do render precisa trocá-lo
+        post = Post.objects.create(user=self.author, image=self.upload(size=(800, 600)))
+        Post.objects.filter(pk=post.pk).update(updated_at=timezone.now() - timedelta(minutes=1))
+        before = Post.objects.get(pk=post.pk).updated_at
+        apply_variants(post.pk, store_variants(post.image.name, render_variants(post.image.name)))
+        self.assertGreater(Post.objects.get(pk=post.pk).updated_at, before)
+
+    def test_variants_of_a_post_deleted_while_rendering_are_released(self):
+        post = Post.objects.create(user=self.author, image=self.upload(size=(800, 600)))
+        post_id, image_name = post.pk, post.image.name
+        rendered = render_variants(image_name)
+        with self.captureOnCommitCallbacks(execute=True):
+            post.delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_variants(post_id, store_variants(image_name, rendered))
+        self.assertFalse(MediaBlob.objects.exists())
+
+    def test_deleting_a_stale_instance_releases_variants_stored_after_it_loaded(self):
+        post = Post.objects.create(user=self.author, image=self.upload(size=(800, 600)))
+        stale = Post.objects.get(pk=post.pk)
+        apply_variants(post.pk, store_variants(post.image.name, render_variants(post.image.name)))
+        self.assertFalse(stale.image_variants)
+        with self.captureOnCommitCallbacks(execute=True):
+            stale.delete()
+        self.assertFalse(MediaBlob.objects.exists())
+
+    @override_settings(ALLOWED_HOSTS=['a.example.com', 'b.example.com'])
+    def test_cached_fragment_urls_follow_each_request_host(self):
+        post = Post.objects.create(user=self.author, image=self.upload(size=(800, 600)))
+        apply_variants(post.pk, store_variants(post.image.name, render_variants(post.image.name)))
+        url = reverse('post-detail', kwargs={'pk': post.pk})
+        self.client.get(url, format='json', HTTP_HOST='a.example.com')
+
+        # O segundo GET sai do fragmento em cache, preenchido pelo primeiro Host
+        data = self.client.get(url, format='json', HTTP_HOST='b.example.com').data
+        self.assertTrue(data['image'].startswith('http://b.example.com/media/'))
+        self.assertTrue(data['image_variants']['thumbnail']['webp'].startswith('http://b.example.com/media/'))
+
+    def test_text_posts_have_no_variants(self):
+        post = Post.objects.create(user=self.author, text_content='Sem imagem')
+        data = self.client.get(reverse('post-detail', kwargs={'pk': post.pk}), format='json').data
+        self.assertIsNone(data['image_variants'])
+
+    @override_settings(IMAGE_PROCESSING_WORKERS=1)
+    def test_rendering_runs_in_the_process_pool(self):
+        post = Post.objects.create(user=self.author, image=self.upload(size=(800, 600)))
+        variants = get_pool().submit(render_variants, post.image.name).result(timeout=60)
+        self.assertEqual(variants['variants']['timeline']['width'], 680)
+        # O filho não grava nada: o storage conta referências no banco do processo pai
+        self.assertEqual(MediaBlob.objects.count(), 1)
+
+class FakeS3Client:
+    """Cliente S3 em memória, com as chamadas usadas pelo S3ObjectStore."""
+
+    class NotFound(Exception):
+        response = {'Error': {'Code': '404'}}
+
+    def __init__(self):
+        self.objects = {}
+
+    def upload_fileobj(self, fileobj, bucket, key, ExtraArgs=None):
+        self.objects[(bucket, key)] = (fileobj.read(), ExtraArgs)
+
+    def head_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise self.NotFound()
+        return {'ContentLength': len(self.objects[(Bucket, Key)][0])}
+
+    def get_object(self, Bucket, Key):
+        return {'Body': BytesIO(self.objects[(Bucket, Key)][0])}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+
+class ContentAddressedStorageTests(APITestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, IMAGE_PROCESSING_WORKERS=0)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.author = User.objects.create_user(
+            username='author', email='author@example.com', password='password123', display_name='Author'
+        )
+
+    def upload(self, color='red', name='meme.PNG'):
+        content = BytesIO()
+        Image.new('RGB', (20, 20), color=color).save(content, 'PNG')
+        return SimpleUploadedFile(name, content.getvalue(), content_type='image/png')
+
+    def test_duplicate_uploads_share_one_file(self):
+        first = Post.objects.create(user=self.author, image=self.upload())
+        second = Post.objects.create(user=self.author, image=self.upload(name='repost.png'))
+
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertRegex(first.image.name, r'^cas/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.png$')
+        self.assertEqual(MediaBlob.objects.get(key=first.image.name).refcount, 2)
+        files = [name for _, _, names in os.walk(self.media_root) for name in names]
+        self.assertEqual(len(files), 1)
+
+    def test_file_is_collected_with_the_last_reference(self):
+        first = Post.objects.create(user=self.author, image=self.upload())
+        second = Post.objects.create(user=self.author, image=self.upload())
+        name = first.image.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(default_storage.exists(name))
+        self.assertEqual(MediaBlob.objects.get(key=name).refcount, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(default_storage.exists(name))
+        self.assertFalse(MediaBlob.objects.filter(key=name).exists())
+
+    def test_collect_media_sweeps_unreferenced_files(self):
+        post = Post.objects.create(user=self.author, image=self.upload())
+        name = post.image.name
+        # Callbacks de on_commit descartados, como em um processo que caiu antes de coletar
+        post.delete()
+        self.assertTrue(default_storage.exists(name))
+
+        out = StringIO()
+        call_command('collect_media', stdout=out)
+        self.assertIn('1 arquivo(s)', out.getvalue())
+        self.assertFalse(default_storage.exists(name))
+
+    def test_legacy_names_are_deleted_directly(self):
+        storage = ContentAddressedStorage(object_store=FileSystemObjectStore(self.media_root))
+        os.makedirs(os.path.join(self.media_root, 'post_images'))
+        with open(os.path.join(self.media_root, 'post_images', 'old.png'), 'wb') as legacy:
+            legacy.write(b'old')
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            storage.delete('post_images/old.png')
+        # Só depois do commit de quem apagou
+        self.assertTrue(storage.exists('post_images/old.png'))
+        callbacks[0]()
+        self.assertFalse(storage.exists('post_images/old.png'))
+
+    def test_collect_media_sweeps_objects_without_a_row(self):
+        # Como um post cuja transação desfez a linha do MediaBlob depois do put
+        post = Post.objects.create(user=self.author, image=self.upload())
+        name = post.image.name
+        MediaBlob.objects.filter(key=name).delete()
+        Post.objects.filter(pk=post.pk).delete()
+        self.assertEqual(default_storage.sweep_orphans(), 0)  # ainda dentro do prazo
+
+        old = (timezone.now() - timedelta(hours=48)).timestamp()
+        os.utime(default_storage.path(name), (old, old))
+        call_command('collect_media', stdout=StringIO())
+        self.assertFalse(default_storage.exists(name))
+
+    def test_s3_object_store(self):
+        client = FakeS3Client()
+        storage = ContentAddressedStorage(
+            object_store=S3ObjectStore('media', client=client), base_url='https://cdn.example.com/'
+        )
+        name = storage.save('post_images/meme.png', self.upload())
+        self.assertEqual(storage.save('post_images/again.png', self.upload()), name)
+
+        self.assertEqual(len(client.objects), 1)
+        data, extra = client.objects[('media', name)]
+        self.assertIn('immutable', extra['CacheControl'])
+        self.assertEqual(extra['ContentType'], 'image/png')
+        self.assertEqual(storage.size(name), len(data))
+        with storage.open(name) as stored:
+            self.assertEqual(stored.read(), data)
+        self.assertEqual(storage.url(name), f'https://cdn.example.com/{name}')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            storage.delete(name)
+            storage.delete(name)
+        self.assertFalse(storage.exists(name))
+
+class MediaServingTests(APITestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, MEDIA_SENDFILE_BACKEND='')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.data = bytes(range(256)) * 4
+        self.name = default_storage.save('post_images/photo.png', SimpleUploadedFile('photo.png', self.data))
+        self.url = reverse('media', args=[self.name])
+
+    def test_content_addressed_file_is_immutable(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b''.join(response.streaming_content), self.data)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(response['Content-Length'], str(len(self.data)))
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(response['ETag'], '"%s"' % os.path.basename(self.name)[:-len('.png')])
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_range_requests(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(b''.join(response.streaming_content), self.data[10:20])
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.data)}')
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-100')
+        self.assertEqual(b''.join(response.streaming_content), self.data[-100:])
+        response = self.client.get(self.url, HTTP_RANGE='bytes=1000-')
+        self.assertEqual(b''.join(response.streaming_content), self.data[1000:])
+
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={len(self.data)}-')
+        self.assertEqual(response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.data)}')
+
+        # Vários intervalos ou If-Range com outro ETag: o arquivo vai inteiro
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-1,5-6')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-1', HTTP_IF_RANGE='"outro"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_proxy_offload(self):
+        with override_settings(MEDIA_SENDFILE_BACKEND='x-accel-redirect'):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.name}')
+        self.assertIn('immutable', response['Cache-Control'])
+
+        with override_settings(MEDIA_SENDFILE_BACKEND='x-sendfile'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Sendfile'], os.path.join(self.media_root, self.name))
+
+    def test_legacy_names_and_missing_files(self):
+        os.makedirs(os.path.join(self.media_root, 'post_images'))
+        with open(os.path.join(self.media_root, 'post_images', 'old.png'), 'wb') as legacy:
+            legacy.write(b'old')
+        response = self.client.get(reverse('media', args=['post_images/old.png']))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=3600')
+        self.assertIn('Last-Modified', response)
+
+        self.assertEqual(self.client.get(reverse('media', args=['post_images/none.png'])).status_code, 404)
+        self.assertEqual(self.client.get('/media/post_images/../../settings.py').status_code, 404)
+        self.assertEqual(self.client.post(self.url).status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+class ChunkedUploadTests(APITestCase):
+
+    def setUp(self):
+        self.upload_dir = tempfile.mkdtemp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.upload_dir)
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(
+            CHUNKED_UPLOAD_DIR=self.upload_dir, MEDIA_ROOT=self.media_root, CHUNKED_UPLOAD_MAX_CHUNK_SIZE=4096,
+            IMAGE_PROCESSING_WORKERS=0,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user(
+            username='mobile', email='mobile@example.com', password='password123', display_name='Mobile'
+        )
+        self.client.force_authenticate(user=self.user)
+        content = BytesIO()
+        Image.effect_noise((120, 90), 64).convert('RGB').save(content, 'PNG')
+        self.image = content.getvalue()
+
+    def start(self, data=None, filename='foto.png'):
+        data = self.image if data is None else data
+        response = self.client.post(
+            reverse('media-upload-create'), {'filename': filename, 'size': len(data)}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data['id']
+
+    def send(self, upload_id, offset, chunk):
+        return self.client.patch(
+            reverse('media-upload-detail', kwargs={'upload_id': upload_id}), chunk,
+            content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    def test_chunks_resume_finalize_and_become_a_post(self):
+        upload_id = self.start()
+        first = self.send(upload_id, 0, self.image[:4000])
+        self.assertEqual(first['Upload-Offset'], '4000')
+        # O cabeçalho já foi validado na primeira parte
+        self.assertEqual((first.data['image_format'], first.data['width'], first.data['height']), ('PNG', 120, 90))
+
+        # Retomada: o cliente pergunta o offset e segue dali; repetir uma parte dá 409
+        status_response = self.client.get(reverse('media-upload-detail', kwargs={'upload_id': upload_id}))
+        self.assertEqual(status_response.data['offset'], 4000)
+        self.assertEqual(self.send(upload_id, 0, self.image[:4000]).status_code, status.HTTP_409_CONFLICT)
+        offset = 4000
+        while offset < len(self.image):
+            offset = int(self.send(upload_id, offset, self.image[offset:offset + 4000])['Upload-Offset'])
+
+        complete_url = reverse('media-upload-complete', kwargs={'upload_id': upload_id})
+        self.assertIsNotNone(self.client.post(complete_url).data['completed_at'])
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('post-list-create'), {'text_content': 'Enviada em partes', 'upload_id': upload_id}, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        post = Post.objects.get(pk=response.data['id'])
+        with post.image.open('rb') as stored:
+            self.assertEqual(stored.read(), self.image)
+        self.assertFalse(MediaUpload.objects.exists())
+        self.assertEqual(os.listdir(self.upload_dir), [])
+
+    def test_only_one_of_two_concurrent_posts_claims_the_upload(self):
+        upload_id = self.start()
+        offset = 0
+        while offset < len(self.image):
+            offset = int(self.send(upload_id, offset, self.image[offset:offset + 4000])['Upload-Offset'])
+        self.client.post(reverse('media-upload-complete', kwargs={'upload_id': upload_id}))
+
+        # Os dois passam pela validação antes de qualquer um criar o post
+        request = type('Request', (), {'user': self.user})()
+        creators = [
+            PostCreateSerializer(data={'upload_id': upload_id}, context={'request': request}) for _ in range(2)
+        ]
+        for creator in creators:
+            self.assertTrue(creator.is_valid())
+        with self.captureOnCommitCallbacks(execute=True):
+            winner = creators[0].save(user=self.user)
+        with self.assertRaises(ValidationError):
+            creators[1].save(user=self.user)
+
+        self.assertEqual(Post.objects.get().pk, winner.pk)
+        with winner.image.open('rb') as stored:
+            self.assertEqual(stored.read(), self.image)
+        self.assertEqual(os.listdir(self.upload_dir), [])
+
+    def test_losing_a_race_for_an_offset_writes_nothing(self):
+        upload_id = self.start()
+        first, second = MediaUpload.objects.get(pk=upload_id), MediaUpload.objects.get(pk=upload_id)
+        append_chunk(first, 0, BytesIO(self.image[:4000]), 4000)
+        # `second` ainda vê o offset 0, como uma requisição simultânea à primeira
+        with self.assertRaises(UploadOffsetConflict):
+            append_chunk(second, 0, BytesIO(b'\0' * 4000), 4000)
+        with open(upload_path(first), 'rb') as stored:
+            self.assertEqual(stored.read(), self.image[:4000])
+
+    def test_non_image_is_rejected_on_first_chunk(self):
+        upload_id = self.start(b'%PDF-1.4 ' + b'x' * 5000, filename='doc.pdf')
+        response = self.send(upload_id, 0, b'%PDF-1.4 ' + b'x' * 3000)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(MediaUpload.objects.filter(pk=upload_id).exists())
+
+    def test_limits_and_incomplete_uploads(self):
+        upload_id = self.start()
+        self.assertEqual(self.send(upload_id, 0, self.image[:5000]).status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        self.send(upload_id, 0, self.image[:100])
+        complete_url = reverse('media-upload-complete', kwargs={'upload_id': upload_id})
+        self.assertEqual(self.client.post(complete_url).status_code, status.HTTP_400_BAD_REQUEST)
+        # Post não aceita upload não finalizado, nem de outro usuário
+        response = self.client.post(reverse('post-list-create'), {'upload_id': upload_id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with override_settings(CHUNKED_UPLOAD_MAX_SIZE=10):
+            response = self.client.post(reverse('media-upload-create'), {'filename': 'a.png', 'size': 11}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_purge_removes_abandoned_uploads(self):
+        upload_id = self.start()
+        self.send(upload_id, 0, self.image[:100])
+        MediaUpload.objects.update(updated_at=timezone.now() - timedelta(days=2))
+        out = StringIO()
+        call_command('purge_uploads', stdout=out)
+        self.assertIn('1 upload(s)', out.getvalue())
+        self.assertEqual(os.listdir(self.upload_dir), [])
 
 class PostDetailAndDeletionTests(APITestCase, TemporaryMediaRootMixin): # Mixin adicionado aqui
 
@@ -239,6 +1328,14 @@ class PostLikeTests(APITestCase):
         self.post.refresh_from_db()
         self.assertEqual(self.post.likes_count, 0)
 
+    def test_legacy_post_toggle_goes_through_set_like(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.post_like_url(self.post.id), format='json')
+        self.assertEqual(response.data, {'status': 'liked', 'liked': True, 'likes_count': 1})
+        self.assertEqual(response['Deprecation'], 'true')
+        response = self.client.post(self.post_like_url(self.post.id), format='json')
+        self.assertEqual(response.data, {'status': 'unliked', 'liked': False, 'likes_count': 0})
+
     def test_like_post_unauthenticated(self):
         response = self.client.post(self.post_like_url(self.post.id), format='json')
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -249,4 +1346,137 @@ class PostLikeTests(APITestCase):
     def test_like_non_existent_post(self):
         self.client.force_authenticate(user=self.user)
         response = self.client.post(self.post_like_url(9999), format='json')
-        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_put_like_is_idempotent(self):
+        self.client.force_authenticate(user=self.user)
+        for _ in range(2):
+            response = self.client.put(self.post_like_url(self.post.id), format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data, {'status': 'liked', 'liked': True, 'likes_count': 1})
+        self.assertEqual(Like.objects.filter(user=self.user, post=self.post).count(), 1)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, 1)
+
+    def test_delete_like_is_idempotent(self):
+        Like.objects.create(user=self.user, post=self.post)
+        Post.objects.filter(pk=self.post.pk).update(likes_count=1)
+        self.client.force_authenticate(user=self.user)
+        for _ in range(2):
+            response = self.client.delete(self.post_like_url(self.post.id), format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data, {'status': 'unliked', 'liked': False, 'likes_count': 0})
+        self.assertFalse(Like.objects.exists())
+
+    def test_put_like_non_existent_post(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.put(self.post_like_url(9999), format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(Like.objects.count(), 0)
+
+    @override_settings(HOT_COUNTER_THRESHOLD=1)
+    def test_put_like_on_hot_post_reports_pending_count(self):
+        Post.objects.filter(pk=self.post.pk).update(likes_count=5)
+        self.client.force_authenticate(user=self.user)
+        response = self.client.put(self.post_like_url(self.post.id), format='json')
+        self.assertEqual(response.data['likes_count'], 6)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, 5)
+
+
+class SeedSocialGraphTests(APITestCase):
+    options = {
+        'users': 40, 'follows_per_user': 6, 'posts_per_user': 3, 'likes_per_post': 2,
+        'comments_per_post': 1, 'chunk_size': 15, 'batch_size': 50, 'end': '2025-01-01T00:00:00+00:00',
+    }
+
+    def seed(self, seed):
+        call_command('seed_social_graph', seed=seed, stdout=StringIO(), **self.options)
+        base = User.objects.filter(username__startswith='seed').order_by('id').first().id
+        post_base = Post.objects.order_by('id').first().id
+        snapshot = (
+            sorted((f.follower_id - base, f.following_id - base, f.created_at) for f in Follow.objects.all()),
+            sorted((p.id - post_base, p.user_id - base, p.created_at, p.text_content) for p in Post.objects.all()),
+            sorted((l.user_id - base, l.post_id - post_base) for l in Like.objects.all()),
+            Comment.objects.count(),
+        )
+        return snapshot
+
+    def reset(self):
+        User.objects.filter(username__startswith='seed').delete()
+
+    def test_same_seed_generates_the_same_graph(self):
+        first = self.seed(7)
+        self.reset()
+        self.assertEqual(self.seed(7), first)
+        self.reset()
+        self.assertNotEqual(self.seed(8), first)
+
+    def test_naive_end_is_read_in_the_configured_time_zone(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', RuntimeWarning)
+            call_command('seed_social_graph', **{**self.options, 'end': '2025-01-01T00:00:00', 'seed': 7}, stdout=StringIO())
+        end = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+        self.assertLessEqual(Post.objects.order_by('-created_at').first().created_at, end)
+
+    def test_counters_are_consistent(self):
+        self.seed(7)
+        for user in User.objects.all():
+            self.assertEqual(user.followers_count, Follow.objects.filter(following=user).count())
+            self.assertEqual(user.following_count, Follow.objects.filter(follower=user).count())
+        for post in Post.objects.all():
+            self.assertEqual(post.likes_count, Like.objects.filter(post=post).count())
+            self.assertEqual(post.comments_count, Comment.objects.filter(post=post).count())
+
+
+class BenchmarkEndpointsTests(APITestCase):
+
+    def test_reports_percentiles_and_queries_per_endpoint(self):
+        call_command('seed_social_graph', users=20, posts_per_user=2, seed=3, stdout=StringIO())
+        output = os.path.join(tempfile.mkdtemp(), 'bench.json')
+        call_command(
+            'benchmark_endpoints', 'timeline_global', 'like',
+            requests=6, concurrency=1, warmup=0, output=output, stdout=StringIO(),
+        )
+        with open(output) as results_file:
+            results = json.load(results_file)
+        shutil.rmtree(os.path.dirname(output))
+
+        self.assertEqual(set(results['endpoints']), {'timeline_global', 'like'})
+        like = results['endpoints']['like']
+        self.assertEqual(like['requests'], 6)
+        self.assertEqual(like['errors'], 0)
+        self.assertLessEqual(like['latency_ms']['p50'], like['latency_ms']['p99'])
+        self.assertGreater(like['queries']['mean'], 0)
+        self.assertEqual(results['meta']['dataset']['users'], 20)
+
+    def test_zero_requests_report_na(self):
+        call_command('seed_social_graph', users=20, posts_per_user=2, seed=3, stdout=StringIO())
+        out = StringIO()
+        call_command('benchmark_endpoints', 'timeline_global', requests=0, warmup=0, stdout=out)
+        self.assertIn('n/a', out.getvalue())
+
+    def test_only_expected_statuses_are_not_errors(self):
+        samples = [(0.01, 200, 3), (0.02, 404, 1), (0.03, 409, 2), (0.04, 500, 1)]
+        self.assertEqual(summarize(samples, 1.0)['errors'], 3)
+        self.assertEqual(summarize(samples, 1.0, expected_statuses=(409,))['errors'], 2)
+        self.assertIsNone(summarize([], 0)['latency_ms']['p95'])
+
+    def test_write_scenarios_leave_the_dataset_unchanged(self):
+        call_command('seed_social_graph', users=20, posts_per_user=2, seed=3, stdout=StringIO())
+
+        def snapshot():
+            return (
+                sorted(Like.objects.values_list('user_id', 'post_id')),
+                sorted(Follow.objects.values_list('follower_id', 'following_id')),
+                Comment.objects.count(),
+                sorted(Post.objects.values_list('id', 'likes_count', 'comments_count')),
+                sorted(User.objects.values_list('id', 'following_count')),
+            )
+
+        before = snapshot()
+        call_command(
+            'benchmark_endpoints', 'like', 'unlike', 'follow', 'unfollow', 'comment',
+            requests=8, concurrency=1, warmup=2, stdout=StringIO(),
+        )
+        self.assertEqual(snapshot(), before)
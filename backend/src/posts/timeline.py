@@ -0,0 +1,138 @@
+# backend/src/posts/timeline.py
+"""
+Timeline "Seguindo" materializada com fan-out na escrita.
+
+Cada post novo é copiado para a timeline de todos os seguidores do autor, de
+modo que ler o feed é uma varredura de intervalo em TimelineEntry em vez de um
+filtro por `user__in` sobre toda a tabela de posts. As timelines são limitadas
+a HOME_TIMELINE_MAX_LENGTH entradas por usuário pelo comando periódico
+`trim_timelines`, fora do fan-out: aparar a cada post faria o custo de postar
+crescer com o tamanho das timelines dos seguidores. Entre duas execuções, uma
+timeline pode passar um pouco do limite. Autores com muitos seguidores ficam
+de fora do fan-out e são mesclados na leitura (posts/feed_engine.py).
+"""
+from django.conf import settings
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+
+from users.models import Follow
+from .models import Post, TimelineEntry
+
+
+def get_max_length():
+    return getattr(settings, 'HOME_TIMELINE_MAX_LENGTH', 800)
+
+
+def get_batch_size():
+    return getattr(settings, 'TIMELINE_FANOUT_BATCH_SIZE', 1000)
+
+
+def get_pull_threshold():
+    return getattr(settings, 'TIMELINE_PULL_FOLLOWER_THRESHOLD', None)
+
+
+def is_pull_author(user):
+    """Autores acima do limite são lidos sob demanda (posts/feed_engine.py), sem fan-out."""
+    threshold = get_pull_threshold()
+    return threshold is not None and user.followers_count >= threshold
+
+
+def fan_out_post(post):
+    """Insere o post na timeline de cada seguidor do autor, em lotes."""
+    if is_pull_author(post.user):
+        return
+    batch_size = get_batch_size()
+    follower_ids = (
+        Follow.objects.filter(following_id=post.user_id)
+        .order_by('follower_id')
+        .values_list('follower_id', flat=True)
+    )
+    batch = []
+    for follower_id in follower_ids.iterator(chunk_size=batch_size):
+        batch.append(follower_id)
+        if len(batch) >= batch_size:
+            _push_post(post, batch)
+            batch = []
+    if batch:
+        _push_post(post, batch)
+
+
+def _push_post(post, owner_ids):
+    TimelineEntry.objects.bulk_create(
+        [TimelineEntry(owner_id=owner_id, post_id=post.pk, created_at=post.created_at) for owner_id in owner_ids],
+        ignore_conflicts=True,
+    )
+
+
+def backfill_timeline(owner_id, author_id):
+    """Copia os posts recentes de `author_id` para a timeline de quem passou a segui-lo."""
+    recent_posts = (
+        Post.objects.filter(user_id=author_id)
+        .order_by('-created_at', '-id')
+        .values_list('id', 'created_at')[:get_max_length()]
+    )
+    TimelineEntry.objects.bulk_create(
+        [TimelineEntry(owner_id=owner_id, post_id=post_id, created_at=created_at) for post_id, created_at in recent_posts],
+        ignore_conflicts=True,
+        batch_size=get_batch_size(),
+    )
+    trim_timelines([owner_id])
+
+
+def remove_author_from_timeline(owner_id, author_id):
+    """Remove da timeline de `owner_id` os posts de um autor que deixou de seguir."""
+    TimelineEntry.objects.filter(owner_id=owner_id, post__user_id=author_id).delete()
+
+
+def rebuild_timeline(owner_id):
+    """Reconstrói do zero a timeline de um usuário a partir de quem ele segue."""
+    followed_ids = Follow.objects.filter(follower_id=owner_id).values_list('following_id', flat=True)
+    recent_posts = (
+        Post.objects.filter(user_id__in=followed_ids)
+        .order_by('-created_at', '-id')
+        .values_list('id', 'created_at')[:get_max_length()]
+    )
+    TimelineEntry.objects.filter(owner_id=owner_id).delete()
+    TimelineEntry.objects.bulk_create(
+        [TimelineEntry(owner_id=owner_id, post_id=post_id, created_at=created_at) for post_id, created_at in recent_posts],
+        batch_size=get_batch_size(),
+    )
+
+
+def trim_timelines(owner_ids):
+    """Descarta as entradas além de HOME_TIMELINE_MAX_LENGTH, em uma consulta por lote de donos."""
+    overflow = (
+        TimelineEntry.objects.filter(owner_id__in=owner_ids)
+        .annotate(position=Window(
+            RowNumber(),
+            partition_by=[F('owner_id')],
+            order_by=[F('created_at').desc(), F('post_id').desc()],
+        ))
+        .filter(position__gt=get_max_length())
+        .values_list('pk', flat=True)
+    )
+    overflow_ids = list(overflow)
+    if overflow_ids:
+        TimelineEntry.objects.filter(pk__in=overflow_ids).delete()
+
+
+def trim_all_timelines(batch_size=None):
+    """Apara as timelines que passaram do limite, em lotes de donos; retorna quantas."""
+    batch_size = batch_size or get_batch_size()
+    oversized = (
+        TimelineEntry.objects.order_by()
+        .values('owner_id')
+        .annotate(total=Count('pk'))
+        .filter(total__gt=get_max_length())
+        .values_list('owner_id', flat=True)
+    )
+    owner_ids = list(oversized)
+    for start in range(0, len(owner_ids), batch_size):
+        trim_timelines(owner_ids[start:start + batch_size])
+    return len(owner_ids)
+
+
+def posts_for_entries(entries):
+    """Resolve uma página de TimelineEntry para os posts, preservando a ordem."""
+    posts = Post.objects.select_related('user').order_by().in_bulk([entry.post_id for entry in entries])
+    return [posts[entry.post_id] for entry in entries if entry.post_id in posts]
@@ -0,0 +1,208 @@
+# backend/src/posts/trends.py
+"""
+Motor de trending topics sobre o log de usos de hashtag (PostHashtag).
+
+O processo `run_trends` mantém em memória, para cada intervalo de
+TRENDS_BUCKET_MINUTES, um resumo Space-Saving das hashtags usadas nele: no
+máximo TRENDS_CAPACITY contadores por intervalo, qualquer que seja o número de
+hashtags distintas, com erro de no máximo (usos do intervalo / capacidade) por
+hashtag. A janela deslizante de TRENDS_WINDOW_MINUTES é a soma dos intervalos
+ainda dentro dela; os mais velhos são descartados inteiros.
+
+A cada TRENDS_SNAPSHOT_INTERVAL segundos o processo lê os usos novos pelo
+índice em created_at, atualiza os resumos e publica o ranking em
+TrendSnapshot. Id e created_at são atribuídos antes do commit, então um uso
+pode aparecer depois de outros mais novos: cada leitura recomeça
+TRENDS_CONSUME_OVERLAP_SECONDS antes da anterior e descarta os ids já
+contados nesse trecho.
+`/api/trends/` só lê o último snapshot, sem agregar sobre Post. Ao iniciar, o
+processo reconstrói a janela a partir do índice em created_at. Uma falha
+numa iteração (ex.: o banco fora do ar) é registrada no log e o processo
+tenta de novo no intervalo seguinte; a conexão é renovada a cada iteração.
+
+Posts apagados depois de contados continuam na janela até ela passar.
+"""
+import logging
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import PostHashtag, TrendSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+def get_window():
+    return timedelta(minutes=getattr(settings, 'TRENDS_WINDOW_MINUTES', 360))
+
+
+def get_overlap():
+    return timedelta(seconds=getattr(settings, 'TRENDS_CONSUME_OVERLAP_SECONDS', 60))
+
+
+def get_bucket_seconds():
+    return getattr(settings, 'TRENDS_BUCKET_MINUTES', 10) * 60
+
+
+def get_capacity():
+    return getattr(settings, 'TRENDS_CAPACITY', 1000)
+
+
+def get_size():
+    return getattr(settings, 'TRENDS_SIZE', 10)
+
+
+class SpaceSaving:
+    """
+    Heavy hitters aproximados com memória fixa (Metwally et al., 2005): uma
+    chave nova com os contadores cheios herda o contador do menor item, então
+    as contagens são superestimativas com erro limitado por `errors`.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+
+    def add(self, key, amount=1):
+        if key in self.counts:
+            self.counts[key] += amount
+            return
+        floor = 0
+        if len(self.counts) >= self.capacity:
+            victim = min(self.counts, key=self.counts.__getitem__)
+            floor = self.counts.pop(victim)
+            del self.errors[victim]
+        self.counts[key] = floor + amount
+        self.errors[key] = floor
+
+
+class TrendingEngine:
+    """Janela deslizante de resumos Space-Saving, um por intervalo de tempo."""
+
+    def __init__(self, window=None, bucket_seconds=None, capacity=None):
+        self.window = window or get_window()
+        self.bucket_seconds = bucket_seconds or get_bucket_seconds()
+        self.capacity = capacity or get_capacity()
+        self.buckets = {}
+
+    def _bucket(self, moment):
+        return int(moment.timestamp()) // self.bucket_seconds
+
+    def add(self, name, created_at, now=None):
+        key = self._bucket(created_at)
+        if key < self._bucket((now or timezone.now()) - self.window):
+            return
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = SpaceSaving(self.capacity)
+        bucket.add(name)
+
+    def expire(self, now=None):
+        oldest = self._bucket((now or timezone.now()) - self.window)
+        for key in [key for key in self.buckets if key < oldest]:
+            del self.buckets[key]
+
+    def top(self, size=None):
+        counts = Counter()
+        for bucket in self.buckets.values():
+            counts.update(bucket.counts)
+        ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:size or get_size()]
+        return [{'hashtag': name, 'posts_count': count} for name, count in ranked]
+
+
+class TrendsWorker:
+    """Alimenta um TrendingEngine com os usos novos de PostHashtag e publica snapshots."""
+
+    def __init__(self, engine=None, batch_size=5000, overlap=None):
+        self.engine = engine or TrendingEngine()
+        self.batch_size = batch_size
+        self.overlap = overlap or get_overlap()
+        self.read_from = None  # created_at a partir do qual a próxima leitura começa
+        self.seen = {}  # id -> created_at dos usos já contados desde read_from
+
+    def _add_rows(self, rows, now):
+        for pk, name, created_at in rows:
+            if pk in self.seen:
+                continue
+            self.engine.add(name, created_at, now)
+            if created_at >= now - self.overlap:
+                self.seen[pk] = created_at
+
+    def _advance(self, now):
+        self.read_from = now - self.overlap
+        self.seen = {pk: created_at for pk, created_at in self.seen.items() if created_at >= self.read_from}
+
+    def warm_up(self, now):
+        """Reconstrói a janela inteira pelo índice em created_at; o stream segue a partir daí."""
+        # Recomeça do zero: uma tentativa anterior pode ter caído no meio
+        self.engine.buckets.clear()
+        self.seen = {}
+        rows = (
+            PostHashtag.objects.filter(created_at__gte=now - self.engine.window)
+            .order_by().values_list('pk', 'hashtag__name', 'created_at')
+        )
+        self._add_rows(rows.iterator(chunk_size=self.batch_size), now)
+        self._advance(now)
+
+    def consume(self, now):
+        """Usos com created_at desde a leitura anterior (menos a sobreposição), em lotes por (created_at, id)."""
+        rows_since = PostHashtag.objects.filter(created_at__gte=self.read_from).order_by('created_at', 'pk')
+        last = None
+        while True:
+            batch = rows_since
+            if last is not None:
+                batch = batch.filter(Q(created_at__gt=last[0]) | Q(created_at=last[0], pk__gt=last[1]))
+            rows = list(batch.values_list('pk', 'hashtag__name', 'created_at')[:self.batch_size])
+            self._add_rows(rows, now)
+            if len(rows) < self.batch_size:
+                break
+            last = rows[-1][2], rows[-1][0]
+        self._advance(now)
+
+    def tick(self, now=None):
+        now = now or timezone.now()
+        if self.read_from is None:
+            self.warm_up(now)
+        else:
+            self.consume(now)
+        self.engine.expire(now)
+        return self.publish(now)
+
+    def publish(self, now):
+        snapshot = TrendSnapshot.objects.create(window_start=now - self.engine.window, items=self.engine.top())
+        # Só o último snapshot é servido
+        TrendSnapshot.objects.filter(pk__lt=snapshot.pk).delete()
+        return snapshot
+
+
+def run_trends(interval=None, once=False, log=None):
+    interval = interval or getattr(settings, 'TRENDS_SNAPSHOT_INTERVAL', 60)
+    worker = TrendsWorker()
+    while True:
+        # Processo longo: descarta conexões vencidas ou quebradas entre as
+        # iterações (com --once a conexão é nova, e a da transação de um teste não cai)
+        if not once:
+            close_old_connections()
+        try:
+            snapshot = worker.tick()
+        except Exception:
+            if once:
+                raise
+            logger.exception('Falha ao publicar o snapshot de trends; nova tentativa em %s s', interval)
+        else:
+            if log:
+                log(f'{len(snapshot.items)} hashtag(s) em alta publicadas.')
+            if once:
+                return snapshot
+        close_old_connections()
+        time.sleep(interval)
+
+
+def latest_snapshot():
+    return TrendSnapshot.objects.order_by('-created_at').first()
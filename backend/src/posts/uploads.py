@@ -0,0 +1,223 @@
+# backend/src/posts/uploads.py
+"""
+Upload de imagens em partes, retomável, sem segurar o arquivo inteiro em memória.
+
+  1. POST   /api/posts/uploads/            {filename, size} -> id e offset 0
+  2. PATCH  /api/posts/uploads/<id>/       corpo = bytes a partir de Upload-Offset
+  3. HEAD/GET /api/posts/uploads/<id>/     offset atual, para retomar após queda
+  4. POST   /api/posts/uploads/<id>/complete/
+  5. POST   /api/posts/                    {upload_id, text_content}
+
+Cada parte é copiada do corpo da requisição, em blocos de BLOCK_SIZE, para
+um arquivo de preparo próprio da requisição. Só depois o offset avança, com
+um UPDATE condicionado ao offset anterior, e só quem o avançou copia a parte
+para a posição pedida do arquivo do upload: duas requisições para a mesma
+posição não corrompem o arquivo, e a segunda recebe 409 com o offset atual
+sem ter gravado nada nele. Uma conexão que cai no meio de uma parte ainda
+registra os bytes que chegaram.
+
+O cabeçalho da imagem é validado assim que chega: a assinatura nos primeiros
+bytes e depois formato e dimensões, sem decodificar pixels. Um arquivo que
+não é imagem é recusado na primeira parte, não depois de enviado inteiro.
+
+Uploads abandonados são apagados por `purge_uploads`.
+"""
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from functools import partial
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from .models import MediaUpload
+
+BLOCK_SIZE = 64 * 1024
+# Bytes do início do arquivo que bastam para qualquer cabeçalho aceito
+HEADER_LIMIT = 256 * 1024
+ALLOWED_FORMATS = {'JPEG', 'PNG', 'WEBP', 'GIF'}
+NOT_AN_IMAGE = 'O arquivo não é uma imagem JPEG, PNG, WebP ou GIF.'
+SIGNATURE_LENGTH = 12
+
+
+def has_image_signature(head):
+    """Assinatura (magic bytes) de um dos formatos aceitos nos primeiros SIGNATURE_LENGTH bytes."""
+    return (
+        head.startswith(b'\xff\xd8\xff')
+        or head.startswith(b'\x89PNG\r\n\x1a\n')
+        or head[:6] in (b'GIF87a', b'GIF89a')
+        or (head.startswith(b'RIFF') and head[8:12] == b'WEBP')
+    )
+
+
+class UploadOffsetConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Offset diferente do já recebido.'
+    default_code = 'offset_conflict'
+
+
+class ChunkTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Parte maior que o permitido.'
+    default_code = 'chunk_too_large'
+
+
+def get_upload_dir():
+    return getattr(settings, 'CHUNKED_UPLOAD_DIR', os.path.join(settings.BASE_DIR, 'chunked_uploads'))
+
+
+def get_max_size():
+    return getattr(settings, 'CHUNKED_UPLOAD_MAX_SIZE', 20 * 1024 * 1024)
+
+
+def get_max_chunk_size():
+    return getattr(settings, 'CHUNKED_UPLOAD_MAX_CHUNK_SIZE', 4 * 1024 * 1024)
+
+
+def upload_path(upload):
+    return os.path.join(get_upload_dir(), f'{upload.pk.hex}.part')
+
+
+def create_upload(user, filename, size):
+    if size > get_max_size():
+        raise ValidationError({'size': f'Arquivo maior que o limite de {get_max_size()} bytes.'})
+    upload = MediaUpload.objects.create(user=user, filename=os.path.basename(filename)[:255], size=size)
+    os.makedirs(get_upload_dir(), exist_ok=True)
+    open(upload_path(upload), 'wb').close()
+    return upload
+
+
+def _remove_file(upload):
+    try:
+        os.remove(upload_path(upload))
+    except FileNotFoundError:
+        pass
+
+
+def discard_upload(upload):
+    _remove_file(upload)
+    upload.delete()
+
+
+def claim_upload(upload):
+    """
+    Reserva o upload finalizado para um post, dentro da transação atual:
+    apaga a linha e devolve True só para quem a apagou. Com dois posts
+    simultâneos com o mesmo upload_id, o DELETE do segundo espera o commit do
+    primeiro e não encontra nada. O arquivo temporário só sai depois do
+    commit, então quem reservou ainda o lê e um rollback devolve o upload.
+    """
+    claimed, _ = MediaUpload.objects.filter(pk=upload.pk, completed_at__isnull=False).delete()
+    if claimed:
+        transaction.on_commit(partial(_remove_file, upload))
+    return bool(claimed)
+
+
+def append_chunk(upload, offset, stream, length):
+    """Grava `length` bytes de `stream` na posição `offset`; retorna o upload com o offset novo."""
+    if upload.completed_at:
+        raise ValidationError({'detail': 'Upload já finalizado.'})
+    if offset != upload.offset:
+        raise UploadOffsetConflict({'detail': 'Offset diferente do já recebido.', 'offset': upload.offset})
+    if length > get_max_chunk_size():
+        raise ChunkTooLarge()
+    if offset + length > upload.size:
+        raise ValidationError({'detail': 'A parte ultrapassa o tamanho declarado do arquivo.'})
+
+    with tempfile.TemporaryFile(dir=get_upload_dir(), suffix='.chunk') as staged:
+        written = 0
+        while written < length:
+            block = stream.read(min(BLOCK_SIZE, length - written))
+            if not block:
+                break  # conexão caiu: vale o que chegou
+            staged.write(block)
+            written += len(block)
+
+        # Reserva a posição antes de tocar no arquivo do upload
+        advanced = MediaUpload.objects.filter(pk=upload.pk, offset=offset).update(
+            offset=offset + written, updated_at=timezone.now()
+        )
+        if advanced:
+            staged.seek(0)
+            with open(upload_path(upload), 'r+b') as target:
+                target.seek(offset)
+                shutil.copyfileobj(staged, target, BLOCK_SIZE)
+    upload.refresh_from_db()
+    if not advanced:
+        raise UploadOffsetConflict({'detail': 'Offset diferente do já recebido.', 'offset': upload.offset})
+    if not upload.image_format:
+        validate_header(upload)
+    return upload
+
+
+def _reject(upload, message):
+    discard_upload(upload)
+    raise ValidationError({'detail': message})
+
+
+def validate_header(upload):
+    """Identifica formato e dimensões pelo início do arquivo; recusa (e apaga) o que não for imagem aceita."""
+    with open(upload_path(upload), 'rb') as source:
+        head = source.read(min(upload.offset, HEADER_LIMIT))
+    if len(head) >= min(SIGNATURE_LENGTH, upload.size) and not has_image_signature(head):
+        _reject(upload, NOT_AN_IMAGE)
+    try:
+        # Image.open só lê o cabeçalho; os pixels não são decodificados
+        with Image.open(BytesIO(head)) as image:
+            image_format, (width, height) = image.format, image.size
+    except Image.DecompressionBombError:
+        _reject(upload, 'Imagem com dimensões grandes demais.')
+    except Exception:
+        # Cabeçalho truncado falha de formas diferentes em cada plugin do Pillow
+        if len(head) < HEADER_LIMIT and upload.offset < upload.size:
+            return  # espera a próxima parte
+        _reject(upload, NOT_AN_IMAGE)
+
+    if image_format not in ALLOWED_FORMATS:
+        _reject(upload, NOT_AN_IMAGE)
+    if width * height > Image.MAX_IMAGE_PIXELS:
+        _reject(upload, 'Imagem com dimensões grandes demais.')
+    MediaUpload.objects.filter(pk=upload.pk).update(image_format=image_format, width=width, height=height)
+    upload.image_format, upload.width, upload.height = image_format, width, height
+
+
+def finalize_upload(upload):
+    if upload.completed_at:
+        return upload
+    if upload.offset != upload.size:
+        raise ValidationError({'detail': 'Upload incompleto.', 'offset': upload.offset})
+    path = upload_path(upload)
+    # Descarta bytes de partes interrompidas além do tamanho declarado
+    os.truncate(path, upload.size)
+    try:
+        with Image.open(path) as image:
+            image.verify()
+    except Exception:
+        discard_upload(upload)
+        raise ValidationError({'detail': 'Imagem corrompida.'})
+    upload.completed_at = timezone.now()
+    upload.save(update_fields=['completed_at', 'updated_at'])
+    return upload
+
+
+def open_upload(upload):
+    """Arquivo do upload finalizado, para atribuir a Post.image (copiado em partes pelo storage)."""
+    return File(open(upload_path(upload), 'rb'), name=upload.filename)
+
+
+def purge_expired_uploads(hours=None):
+    """Apaga uploads sem atividade há mais de `hours` horas; retorna quantos."""
+    hours = hours or getattr(settings, 'CHUNKED_UPLOAD_EXPIRY_HOURS', 24)
+    expired = MediaUpload.objects.filter(updated_at__lt=timezone.now() - timedelta(hours=hours))
+    total = 0
+    for upload in expired.iterator():
+        discard_upload(upload)
+        total += 1
+    return total
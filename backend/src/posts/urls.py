@@ -5,7 +5,13 @@ from .views import (
     FollowingPostListView,
     PostDetailView,
     LikePostView,
-    CommentListCreateView
+    CommentListCreateView,
+    PostStateView,
+    PostSearchView,
+    HashtagPostListView,
+    MediaUploadCreateView,
+    MediaUploadView,
+    MediaUploadCompleteView,
 )
 
 urlpatterns = [
@@ -13,6 +19,12 @@ urlpatterns = [
     path('', PostListCreateView.as_view(), name='post-list-create'),
 
     path('following/', FollowingPostListView.as_view(), name='post-following-list'),
+    path('state/', PostStateView.as_view(), name='post-state'),
+    path('search/', PostSearchView.as_view(), name='post-search'),
+    path('hashtags/<str:name>/', HashtagPostListView.as_view(), name='hashtag-post-list'),
+    path('uploads/', MediaUploadCreateView.as_view(), name='media-upload-create'),
+    path('uploads/<uuid:upload_id>/', MediaUploadView.as_view(), name='media-upload-detail'),
+    path('uploads/<uuid:upload_id>/complete/', MediaUploadCompleteView.as_view(), name='media-upload-complete'),
 
     path('<int:pk>/', PostDetailView.as_view(), name='post-detail'), 
     path('<int:post_id>/like/', LikePostView.as_view(), name='post-like'),
@@ -1,36 +1,88 @@
 # posts/views.py
 
+from django.conf import settings
 from django.db.models import F
 from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_cache_control
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from rest_framework import generics, status
-from rest_framework.exceptions import PermissionDenied
-from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
+from rest_framework.permissions import AllowAny, IsAuthenticated, IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from users.models import Follow, User 
-from .models import Like, Post, Comment  # Adicionado Comment
+from users.models import User 
+from .models import MediaUpload, Post, Comment, PostHashtag  # Adicionado Comment
+from .feed_engine import HomeFeed
+from .images import schedule_post_image
+from .likes import set_like, toggle_like
+from .pagination import HomeTimelinePagination, KeysetPagination, MergedTimelinePagination, SearchPagination
+from . import response_cache
+from .conditional import home_feed_validators
+from .search import PostSearch, search_terms
+from .trends import latest_snapshot
+from . import uploads
+from .sharded_counters import POST_LIKES
+from .timeline import posts_for_entries
 from .serializers import (
     CommentCreateSerializer,
     CommentSerializer,
-    LikeSerializer,
+    MediaUploadCreateSerializer,
+    MediaUploadSerializer,
     PostCreateSerializer,
     PostSerializer,
+    PostStateRequestSerializer,
+    get_viewer_post_state,
 )
 
 
-class PostListCreateView(generics.ListCreateAPIView):
+class CachedPostListMixin:
+    """
+    Lista de posts montada a partir dos fragmentos em cache (posts/response_cache.py).
+    Se `get_timeline_cache_name` devolver um nome, a própria página (ids e links)
+    também fica em cache sob a versão daquela timeline.
+    """
+
+    def get_timeline_cache_name(self):
+        return None
+
+    def list(self, request, *args, **kwargs):
+        name = self.get_timeline_cache_name()
+        page = response_cache.get_cached_page(name, request) if name else None
+        posts = None
+        if page is None:
+            posts = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+            page = {
+                'ids': [post.pk for post in posts],
+                'next': response_cache.relative_link(self.paginator.get_next_link()),
+                'previous': response_cache.relative_link(self.paginator.get_previous_link()),
+            }
+            if name:
+                response_cache.set_cached_page(name, request, page)
+        return Response({
+            'next': response_cache.absolute_link(request, page['next']),
+            'previous': response_cache.absolute_link(request, page['previous']),
+            'results': response_cache.render_posts(page['ids'], request, posts),
+        })
+
+class PostListCreateView(CachedPostListMixin, generics.ListCreateAPIView):
     permission_classes = [IsAuthenticatedOrReadOnly] 
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
-        return Post.objects.all().order_by('-created_at')
+        return Post.objects.select_related('user').order_by('-created_at')
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return PostCreateSerializer
         return PostSerializer
 
+    def get_timeline_cache_name(self):
+        return response_cache.global_timeline()
+
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        post = serializer.save(user=self.request.user)
+        schedule_post_image(post)
     
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -44,24 +96,138 @@ class PostListCreateView(generics.ListCreateAPIView):
     def get_serializer_context(self):
         return {'request': self.request}
 
-class FollowingPostListView(generics.ListAPIView):
+class FollowingPostListView(CachedPostListMixin, generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = PostSerializer
+    pagination_class = MergedTimelinePagination
 
     def get_queryset(self):
-        user = self.request.user
-        followed_users_ids = Follow.objects.filter(follower=user).values_list('following__id', flat=True)
-        return Post.objects.filter(user__id__in=followed_users_ids).order_by('-created_at')
+        # Timeline materializada + buffers dos autores "pull" (ver posts/feed_engine.py)
+        return HomeFeed(self.request.user)
+
+    def paginate_queryset(self, queryset):
+        # A página já resolvida pelos validadores do GET condicional, se houver
+        page = getattr(self.request, '_home_feed_page', None)
+        if page is None:
+            return posts_for_entries(super().paginate_queryset(queryset))
+        self._paginator, entries = page
+        return posts_for_entries(entries)
+
+    @method_decorator(condition(etag_func=lambda request, *args, **kwargs: home_feed_validators(request)[0]))
+    def get(self, request, *args, **kwargs):
+        # Polling: 304 antes de serializar quando a página não mudou
+        return super().get(request, *args, **kwargs)
 
     def get_serializer_context(self):
         return {'request': self.request}
 
+class MediaUploadCreateView(APIView):
+    """Inicia um upload em partes (ver posts/uploads.py)."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = MediaUploadCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = uploads.create_upload(request.user, **serializer.validated_data)
+        return Response(MediaUploadSerializer(upload).data, status=status.HTTP_201_CREATED)
+
+class MediaUploadView(APIView):
+    """
+    GET/HEAD: quanto já foi recebido (para retomar). PATCH: grava o corpo a
+    partir do cabeçalho Upload-Offset, sem passar pelos parsers do DRF.
+    DELETE: cancela.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get_upload(self, request, upload_id):
+        return get_object_or_404(MediaUpload, pk=upload_id, user=request.user)
+
+    def offset_response(self, upload, status_code=status.HTTP_200_OK):
+        response = Response(MediaUploadSerializer(upload).data, status=status_code)
+        response['Upload-Offset'] = str(upload.offset)
+        return response
+
+    def get(self, request, upload_id):
+        return self.offset_response(self.get_upload(request, upload_id))
+
+    def patch(self, request, upload_id):
+        upload = self.get_upload(request, upload_id)
+        try:
+            offset = int(request.headers['Upload-Offset'])
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except (KeyError, ValueError):
+            raise ValidationError({'detail': 'Informe o cabeçalho Upload-Offset e o Content-Length.'})
+        if length <= 0:
+            raise ValidationError({'detail': 'Parte vazia.'})
+        upload = uploads.append_chunk(upload, offset, request.stream, length)
+        return self.offset_response(upload)
+
+    def delete(self, request, upload_id):
+        uploads.discard_upload(self.get_upload(request, upload_id))
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class MediaUploadCompleteView(MediaUploadView):
+    """Confere que todos os bytes chegaram e que a imagem é válida; o id passa a valer em `upload_id`."""
+    http_method_names = ['post', 'options']
+
+    def post(self, request, upload_id):
+        return self.offset_response(uploads.finalize_upload(self.get_upload(request, upload_id)))
+
+class PostSearchView(generics.GenericAPIView):
+    """
+    Busca em `?q=` pelo índice de texto (posts/search.py), ordenada por
+    relevância e recência, com os mesmos fragmentos em cache das timelines.
+    """
+    serializer_class = PostSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = SearchPagination
+
+    def get(self, request, *args, **kwargs):
+        query = request.query_params.get('q', '')
+        if not search_terms(query):
+            raise ValidationError({'q': 'Informe o termo de busca.'})
+        hits = self.paginate_queryset(PostSearch(query))
+        return self.get_paginated_response(response_cache.render_posts([hit.pk for hit in hits], request))
+
+class HashtagPostListView(CachedPostListMixin, generics.ListAPIView):
+    """Posts de uma hashtag, paginados pelas linhas de PostHashtag (hashtag, created_at, post)."""
+    serializer_class = PostSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = HomeTimelinePagination
+
+    def get_queryset(self):
+        return PostHashtag.objects.filter(hashtag__name=self.kwargs['name'].lower())
+
+    def paginate_queryset(self, queryset):
+        return posts_for_entries(super().paginate_queryset(queryset))
+
+class TrendsView(APIView):
+    """Hashtags em alta do último snapshot do motor de trending (posts/trends.py)."""
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        snapshot = latest_snapshot()
+        response = Response({
+            'generated_at': snapshot.created_at if snapshot else None,
+            'window_start': snapshot.window_start if snapshot else None,
+            'results': snapshot.items if snapshot else [],
+        })
+        # O ranking só muda no próximo snapshot
+        patch_cache_control(response, public=True, max_age=getattr(settings, 'TRENDS_SNAPSHOT_INTERVAL', 60))
+        return response
+
 class PostDetailView(generics.RetrieveDestroyAPIView):
-    queryset = Post.objects.all()
+    queryset = Post.objects.select_related('user')
     serializer_class = PostSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     lookup_field = 'pk'
 
+    def retrieve(self, request, *args, **kwargs):
+        payloads = response_cache.render_posts([int(kwargs[self.lookup_field])], request)
+        if not payloads:
+            raise NotFound()
+        return Response(payloads[0])
+
     def perform_destroy(self, instance):
         if instance.user != self.request.user:
             raise PermissionDenied("Você não tem permissão para deletar esta postagem.")
@@ -73,21 +239,67 @@ class PostDetailView(generics.RetrieveDestroyAPIView):
 class LikePostView(APIView):
     permission_classes = [IsAuthenticated]
 
+    def put(self, request, post_id):
+        # Idempotente: curtir de novo não altera nada (seguro para retries do app)
+        return self._set_like(request, post_id, liked=True)
+
+    def delete(self, request, post_id):
+        return self._set_like(request, post_id, liked=False)
+
     def post(self, request, post_id):
-        post = get_object_or_404(Post, id=post_id)
-        user = request.user
+        # Legado: alterna o estado e não é seguro para retries; mantido para clientes antigos
+        response = self._like_response(post_id, toggle_like(request.user, post_id))
+        response['Deprecation'] = 'true'
+        return response
+
+    def _set_like(self, request, post_id, liked):
+        return self._like_response(post_id, set_like(request.user, post_id, liked))
 
-        like, created = Like.objects.get_or_create(user=user, post=post)
+    def _like_response(self, post_id, result):
+        if result is None:
+            raise NotFound('Postagem não encontrada.')
+        response_cache.invalidate_post(post_id)
+        likes_count, liked = result
+        return Response({
+            'status': 'liked' if liked else 'unliked',
+            'liked': liked,
+            'likes_count': likes_count,
+        }, status=status.HTTP_200_OK)
 
-        if created:
-            post.likes_count = F('likes_count') + 1
-            post.save(update_fields=['likes_count'])
-            return Response({'status': 'liked'}, status=status.HTTP_200_OK)
+class PostStateView(APIView):
+    """
+    Revalida contadores e estado do viewer de vários posts de uma vez (para
+    timelines em cache no cliente): uma consulta de posts e uma de likes.
+    """
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        serializer = PostStateRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = list(dict.fromkeys(serializer.validated_data['ids']))
+
+        posts = Post.objects.filter(id__in=ids).only('id', 'likes_count', 'comments_count', 'reposts_count').order_by().in_bulk()
+        if request.user.is_authenticated:
+            viewer_state = get_viewer_post_state(request.user, list(posts))
         else:
-            like.delete()
-            post.likes_count = F('likes_count') - 1
-            post.save(update_fields=['likes_count'])
-            return Response({'status': 'unliked'}, status=status.HTTP_200_OK)
+            viewer_state = {'liked_post_ids': set(), 'reposted_post_ids': set()}
+        pending_likes = POST_LIKES.pending_for(posts.values())
+
+        results = [
+            {
+                'id': post_id,
+                'likes_count': posts[post_id].likes_count + pending_likes.get(post_id, 0),
+                'comments_count': posts[post_id].comments_count,
+                'reposts_count': posts[post_id].reposts_count,
+                'is_liked_by_viewer': post_id in viewer_state['liked_post_ids'],
+                'is_reposted_by_viewer': post_id in viewer_state['reposted_post_ids'],
+            }
+            for post_id in ids if post_id in posts
+        ]
+        return Response({
+            'results': results,
+            'missing': [post_id for post_id in ids if post_id not in posts],
+        })
 
 # --- Views de Comentários Corrigidas ---
 class CommentListCreateView(generics.ListCreateAPIView):
@@ -96,7 +308,7 @@ class CommentListCreateView(generics.ListCreateAPIView):
     def get_queryset(self):
         post_id = self.kwargs.get('post_id')
         post = get_object_or_404(Post, id=post_id)
-        return Comment.objects.filter(post=post)
+        return Comment.objects.filter(post=post).select_related('author')
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -110,7 +322,8 @@ class CommentListCreateView(generics.ListCreateAPIView):
         
         serializer.save(post=post, author=self.request.user)
         post.comments_count = F('comments_count') + 1
-        post.save(update_fields=['comments_count'])
+        post.save(update_fields=['comments_count', 'updated_at'])
+        response_cache.invalidate_post(post.pk)
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -127,9 +340,10 @@ class CommentListCreateView(generics.ListCreateAPIView):
         context['request'] = self.request
         return context
 
-class UserPostListView(generics.ListAPIView):
+class UserPostListView(CachedPostListMixin, generics.ListAPIView):
     serializer_class = PostSerializer
     permission_classes = [IsAuthenticatedOrReadOnly] # Qualquer um pode ver os posts de um perfil
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         """
@@ -138,7 +352,10 @@ class UserPostListView(generics.ListAPIView):
         """
         username = self.kwargs['username']
         user = get_object_or_404(User, username=username)
-        return Post.objects.filter(user=user).order_by('-created_at')
+        return Post.objects.filter(user=user).select_related('user').order_by('-created_at')
+
+    def get_timeline_cache_name(self):
+        return response_cache.user_timeline(self.kwargs['username'])
 
     def get_serializer_context(self):
         return {'request': self.request}
\ No newline at end of file
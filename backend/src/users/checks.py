@@ -0,0 +1,13 @@
+# backend/src/users/checks.py
+from django.conf import settings
+from django.core import checks
+
+from config.caching import check_shared_cache
+
+
+@checks.register(checks.Tags.caches)
+def check_profile_cache(app_configs, **kwargs):
+    return check_shared_cache(
+        getattr(settings, 'PROFILE_CACHE_ALIAS', 'default'), 'PROFILE_CACHE_ALIAS',
+        'o cache de perfis (e o GET condicional que depende dos carimbos de versão)',
+    )
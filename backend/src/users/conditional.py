@@ -0,0 +1,65 @@
+# backend/src/users/conditional.py
+"""
+Validadores de GET condicional (ETag / Last-Modified) para os perfis.
+
+São calculados sem montar a resposta: uma busca indexada por username (ou
+nenhuma, no caso do /me/) mais os carimbos de versão em cache. Quando o
+cliente já tem a versão atual, a view responde 304 antes de serializar.
+
+Os carimbos só valem com um cache compartilhado entre os workers; sem ele
+(versioning.is_enabled), cada worker teria os seus e poderia responder 304
+para uma versão que outro já trocou, então não há validadores.
+
+O ETag é o validador principal. O Last-Modified tem resolução de 1 s, e duas
+mudanças no mesmo segundo teriam a mesma data: um If-Modified-Since recebido
+entre elas responderia 304 para a versão velha. Por isso a data só é enviada
+quando a última versão tem pelo menos SETTLE_TIME; qualquer mudança depois
+da resposta cai em um segundo posterior.
+"""
+import hashlib
+from datetime import timedelta
+
+from django.utils import timezone
+
+from posts.sharded_counters import USER_FOLLOWERS
+from .models import User
+from .versioning import get_profile_versions, is_enabled, version_to_datetime
+
+SETTLE_TIME = timedelta(seconds=1)
+
+
+def make_etag(*parts):
+    return hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def _profile_validators(request, user):
+    if user is None or not is_enabled():
+        return None, None
+    viewer_id = request.user.pk if request.user.is_authenticated else None
+    versions = get_profile_versions({user.pk, viewer_id} - {None})
+    followers_count = USER_FOLLOWERS.current_value(user)
+    etag = make_etag(
+        'profile', user.pk, followers_count, user.following_count,
+        versions[user.pk], viewer_id, versions.get(viewer_id),
+    )
+    last_modified = version_to_datetime(max(versions.values()))
+    if timezone.now() - last_modified < SETTLE_TIME:
+        last_modified = None
+    return etag, last_modified
+
+
+def user_detail_validators(request, username):
+    cached = getattr(request, '_profile_validators', None)
+    if cached is None:
+        user = None
+        if is_enabled():
+            user = User.objects.filter(username=username).only('id', 'followers_count', 'following_count').first()
+        cached = request._profile_validators = _profile_validators(request, user)
+    return cached
+
+
+def me_validators(request):
+    cached = getattr(request, '_profile_validators', None)
+    if cached is None:
+        cached = request._profile_validators = _profile_validators(request, request.user)
+    return cached
@@ -0,0 +1,16 @@
+# backend/src/users/management/commands/compute_suggestions.py
+from django.core.management.base import BaseCommand
+
+from users.suggestions import compute_all_suggestions
+
+
+class Command(BaseCommand):
+    help = 'Recalcula as sugestões de "quem seguir" de todos os usuários a partir do grafo de follows.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='Usuários por lote.')
+        parser.add_argument('--top-k', type=int, default=None, help='Sugestões guardadas por usuário.')
+
+    def handle(self, *args, **options):
+        processed = compute_all_suggestions(options['batch_size'], options['top_k'])
+        self.stdout.write(self.style.SUCCESS(f'Sugestões calculadas para {processed} usuário(s).'))
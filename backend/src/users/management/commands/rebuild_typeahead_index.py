@@ -0,0 +1,20 @@
+# backend/src/users/management/commands/rebuild_typeahead_index.py
+from django.core.management.base import BaseCommand
+
+from users.typeahead import rebuild_typeahead_index, refresh_typeahead_ranks
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói os prefixos do autocompletar de usuários ou, com --ranks, só atualiza a popularidade copiada.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ranks', action='store_true', help='Só copia o followers_count atual para os prefixos.')
+        parser.add_argument('--batch-size', type=int, default=500, help='Usuários por lote.')
+
+    def handle(self, *args, **options):
+        if options['ranks']:
+            updated = refresh_typeahead_ranks()
+            self.stdout.write(self.style.SUCCESS(f'{updated} prefixo(s) com popularidade atualizada.'))
+            return
+        indexed = rebuild_typeahead_index(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{indexed} usuário(s) indexado(s).'))
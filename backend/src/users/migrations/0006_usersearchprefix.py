@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def index_existing_users(apps, schema_editor):
+    from users.typeahead import user_prefixes
+
+    User = apps.get_model("users", "User")
+    UserSearchPrefix = apps.get_model("users", "UserSearchPrefix")
+    users = User.objects.only("id", "username", "display_name", "followers_count").iterator()
+    UserSearchPrefix.objects.bulk_create(
+        (
+            UserSearchPrefix(prefix=prefix, user_id=user.pk, followers_count=user.followers_count)
+            for user in users
+            for prefix in user_prefixes(user.username, user.display_name)
+        ),
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0005_follow_created_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserSearchPrefix",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("prefix", models.CharField(max_length=30)),
+                ("followers_count", models.PositiveIntegerField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["prefix", "-followers_count", "user"],
+                        name="user_prefix_rank_idx",
+                    )
+                ],
+                "unique_together": {("prefix", "user")},
+            },
+        ),
+        migrations.RunPython(index_existing_users, migrations.RunPython.noop),
+    ]
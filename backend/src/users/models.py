@@ -27,6 +27,42 @@ class Follow(models.Model):
     class Meta:
 
         unique_together = ('follower', 'following')
+        indexes = [
+            # Listas de seguidores/seguidos paginadas por (created_at, id) do follow
+            models.Index(fields=['following', '-created_at', '-id'], name='follow_following_created_idx'),
+            models.Index(fields=['follower', '-created_at', '-id'], name='follow_follower_created_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.follower.username} → {self.following.username}"
\ No newline at end of file
+        return f"{self.follower.username} → {self.following.username}"
+
+class FollowSuggestion(models.Model):
+    """Sugestões de "quem seguir" pré-calculadas (ver users/suggestions.py), em ordem de `rank`."""
+    user = models.ForeignKey(User, related_name='follow_suggestions', on_delete=models.CASCADE)
+    candidate = models.ForeignKey(User, related_name='+', on_delete=models.CASCADE)
+    rank = models.PositiveIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        unique_together = ('user', 'candidate')
+        indexes = [
+            models.Index(fields=['user', 'rank'], name='suggestion_user_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"Suggest {self.candidate_id} to {self.user_id} (#{self.rank})"
+
+class UserSearchPrefix(models.Model):
+    """Prefixo normalizado de username/display_name para o autocompletar (ver users/typeahead.py)."""
+    prefix = models.CharField(max_length=30)
+    user = models.ForeignKey(User, related_name='+', on_delete=models.CASCADE)
+    followers_count = models.PositiveIntegerField(default=0)  # cópia para ordenar pelo índice
+
+    class Meta:
+        unique_together = ('prefix', 'user')
+        indexes = [
+            models.Index(fields=['prefix', '-followers_count', 'user'], name='user_prefix_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.prefix} → {self.user_id}"
@@ -0,0 +1,44 @@
+# backend/src/users/profile_cache.py
+"""
+Cache versionado dos perfis serializados.
+
+Cada usuário tem um fragmento (UserFragmentSerializer, sem os campos que
+dependem do viewer) guardado sob a sua versão de perfil (ver versioning.py).
+Quem altera o perfil troca a versão, então não há invalidação explícita: a
+chave antiga deixa de ser lida e expira sozinha.
+
+Sem cache compartilhado entre os workers (versioning.is_enabled), os
+fragmentos são serializados a cada requisição.
+"""
+from django.conf import settings
+
+from .versioning import get_cache, get_profile_versions, is_enabled
+
+FRAGMENT_KEY = 'profile:fragment:{}:{}'
+
+
+def get_timeout():
+    return getattr(settings, 'PROFILE_CACHE_TIMEOUT', 3600)
+
+
+def get_profile_fragments(user_ids, serialize):
+    """
+    {id: fragmento} de `user_ids`. `serialize(ids)` devolve {id: fragmento}
+    dos que faltam no cache, que são guardados sob a versão lida aqui.
+    """
+    if not is_enabled():
+        return serialize(list(user_ids))
+    cache = get_cache()
+    versions = get_profile_versions(user_ids)
+    keys = {FRAGMENT_KEY.format(user_id, version): user_id for user_id, version in versions.items()}
+    fragments = {keys[key]: fragment for key, fragment in cache.get_many(list(keys)).items()}
+
+    missing = [user_id for user_id in versions if user_id not in fragments]
+    if missing:
+        fresh = serialize(missing)
+        cache.set_many(
+            {FRAGMENT_KEY.format(user_id, versions[user_id]): fragment for user_id, fragment in fresh.items()},
+            get_timeout(),
+        )
+        fragments.update(fresh)
+    return fragments
@@ -3,10 +3,83 @@ from rest_framework import serializers
 from .models import User, Follow
 from django.contrib.auth import authenticate
 from django.contrib.auth import get_user_model # Importar get_user_model
+from posts.sharded_counters import USER_FOLLOWERS
+from .profile_cache import get_profile_fragments
 User = get_user_model() # Obter o modelo de usuário para usar no serializer
 
-class UserSerializer(serializers.ModelSerializer):
-    is_followed_by_viewer = serializers.SerializerMethodField()
+class ViewerFollowState:
+    """
+    Quem o viewer segue, resolvido em lote e memorizado na requisição: todos os
+    usuários de uma resposta (posts, comentários, listas) custam uma consulta IN.
+    """
+
+    def __init__(self, viewer):
+        self.viewer = viewer
+        self.followed_ids = set()
+        self.resolved_ids = set()
+
+    @classmethod
+    def for_request(cls, request):
+        state = getattr(request, '_viewer_follow_state', None)
+        if state is None:
+            state = cls(request.user)
+            request._viewer_follow_state = state
+        return state
+
+    def prime(self, user_ids):
+        missing = set(user_ids) - self.resolved_ids
+        if missing:
+            followed = Follow.objects.filter(follower=self.viewer, following_id__in=missing)
+            self.followed_ids.update(followed.values_list('following_id', flat=True))
+            self.resolved_ids.update(missing)
+
+    def resolve(self, user_ids, followed_ids):
+        """Registra um estado já conhecido (ex.: vindo da própria consulta), sem consultar."""
+        self.followed_ids.update(followed_ids)
+        self.resolved_ids.update(user_ids)
+
+    def is_following(self, user_id):
+        self.prime([user_id])
+        return user_id in self.followed_ids
+
+
+def prime_viewer_follow_state(context, user_ids):
+    """Antecipa o estado de follow de `user_ids` antes de serializar uma lista."""
+    request = context.get('request')
+    if request and request.user.is_authenticated:
+        ViewerFollowState.for_request(request).prime(user_ids)
+
+
+def get_user_fragments(context, users=(), user_ids=()):
+    """
+    Fragmentos de perfil ({id: fragmento}) de `users` e `user_ids`, lidos do
+    cache versionado e memorizados no contexto; os ausentes do cache são
+    serializados a partir de `users` ou carregados em uma consulta.
+    """
+    memo = context.setdefault('profile_fragments', {})
+    loaded = {user.pk: user for user in users}
+    wanted = (loaded.keys() | set(user_ids)) - memo.keys()
+    if wanted:
+        def serialize(ids):
+            instances = [loaded[user_id] for user_id in ids if user_id in loaded]
+            unloaded = [user_id for user_id in ids if user_id not in loaded]
+            if unloaded:
+                instances += User.objects.in_bulk(unloaded).values()
+            USER_FOLLOWERS.pending_for(instances, context.setdefault('pending_counters', {}))
+            serializer = UserFragmentSerializer(instances, many=True, context=context)
+            return {fragment['id']: fragment for fragment in serializer.data}
+
+        memo.update(get_profile_fragments(list(wanted), serialize))
+    return memo
+
+
+def prime_profile_fragments(context, users):
+    """Antecipa os fragmentos de perfil de `users` antes de serializar uma lista."""
+    get_user_fragments(context, users=[user for user in users if user is not None])
+
+
+class UserFragmentSerializer(serializers.ModelSerializer):
+    """Perfil sem os campos que dependem do viewer; é o que vai para o cache de perfis."""
 
     class Meta:
         model = User
@@ -24,16 +97,45 @@ class UserSerializer(serializers.ModelSerializer):
             'created_at',
             'followers_count',
             'following_count',
-            'is_followed_by_viewer',
         ]
         read_only_fields = ['id', 'created_at', 'followers_count', 'following_count']
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data['followers_count'] = USER_FOLLOWERS.current_value(instance, self.context)
+        return data
+
+
+class UserListSerializer(serializers.ListSerializer):
+
+    def to_representation(self, data):
+        users = list(data.all() if hasattr(data, 'all') else data)
+        prime_viewer_follow_state(self.context, [user.pk for user in users])
+        prime_profile_fragments(self.context, users)
+        return super().to_representation(users)
+
+
+class UserSerializer(serializers.ModelSerializer):
+    """Fragmento de perfil em cache mais o estado de follow do viewer."""
+    is_followed_by_viewer = serializers.SerializerMethodField()
+
+    class Meta:
+        model = User
+        fields = UserFragmentSerializer.Meta.fields + ['is_followed_by_viewer']
+        read_only_fields = UserFragmentSerializer.Meta.read_only_fields
+        list_serializer_class = UserListSerializer
+
+    def to_representation(self, instance):
+        data = dict(get_user_fragments(self.context, users=[instance])[instance.pk])
+        data['is_followed_by_viewer'] = self.get_is_followed_by_viewer(instance)
+        return data
+
     # MOVIDO: get_is_followed_by_viewer para o UserSerializer
     def get_is_followed_by_viewer(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             # Verifica se o usuário autenticado (viewer) segue o objeto sendo serializado (obj)
-            return Follow.objects.filter(follower=request.user, following=obj).exists()
+            return ViewerFollowState.for_request(request).is_following(obj.pk)
         return False
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -0,0 +1,25 @@
+# backend/src/users/signals.py
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from . import typeahead
+from .models import User
+from .versioning import bump_profile_version
+
+TYPEAHEAD_FIELDS = {'username', 'display_name'}
+# Campos que não aparecem no perfil (login atualiza só last_login)
+INVISIBLE_FIELDS = {'last_login'}
+
+
+@receiver(post_save, sender=User)
+def index_user_prefixes(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    # last_login e contadores não mudam os prefixos
+    if not raw and (created or update_fields is None or TYPEAHEAD_FIELDS & set(update_fields)):
+        typeahead.index_user(instance)
+
+
+@receiver(post_save, sender=User)
+def bump_profile_on_save(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    # Qualquer save (views, admin, shell) invalida o fragmento do perfil em cache
+    if not raw and not created and (update_fields is None or set(update_fields) - INVISIBLE_FIELDS):
+        bump_profile_version(instance.pk)
@@ -0,0 +1,172 @@
+# backend/src/users/suggestions.py
+"""
+Sugestões de "quem seguir" calculadas em lote sobre o grafo de follows.
+
+O comando `compute_suggestions` pontua, para cada usuário, os candidatos
+vindos de amigos-de-amigos (quantos dos seus seguidos seguem o candidato)
+mais um grupo fixo dos perfis mais seguidos, combinando:
+
+  * seguidos em comum (peso FOF_WEIGHT);
+  * popularidade, log(1 + followers_count) (peso POPULARITY_WEIGHT);
+  * engajamento recente, log(1 + likes recebidos nos últimos dias)
+    (peso ENGAGEMENT_WEIGHT).
+
+Os K melhores ficam em FollowSuggestion e o endpoint só lê as primeiras
+linhas pelo índice (user, rank). Quem ainda não tem sugestões calculadas
+recebe usuários a partir de um id aleatório, sem ORDER BY RANDOM().
+"""
+import heapq
+import math
+import random
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from posts.models import Like
+from .models import Follow, FollowSuggestion, User
+
+FOF_WEIGHT = 3.0
+POPULARITY_WEIGHT = 1.0
+ENGAGEMENT_WEIGHT = 0.5
+
+
+def get_top_k():
+    return getattr(settings, 'FOLLOW_SUGGESTIONS_TOP_K', 50)
+
+
+def get_batch_size():
+    return getattr(settings, 'FOLLOW_SUGGESTIONS_BATCH_SIZE', 500)
+
+
+# --- Cálculo em lote ---
+
+def _following_by_user(user_ids):
+    following = defaultdict(set)
+    rows = Follow.objects.filter(follower_id__in=user_ids).values_list('follower_id', 'following_id')
+    for follower_id, following_id in rows.iterator():
+        following[follower_id].add(following_id)
+    return following
+
+
+def _mutual_counts(user_ids):
+    """{usuário: {candidato: seguidos em comum}} — uma consulta agregada para o lote."""
+    mutual = defaultdict(dict)
+    rows = (
+        Follow.objects.filter(follower__followers_set__follower_id__in=user_ids)
+        .values_list('follower__followers_set__follower_id', 'following_id')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    for user_id, candidate_id, total in rows.iterator():
+        mutual[user_id][candidate_id] = total
+    return mutual
+
+
+def _candidate_features(candidate_ids, since):
+    """{candidato: (followers_count, likes recentes)} dos candidatos do lote."""
+    followers = dict(User.objects.filter(id__in=candidate_ids).values_list('id', 'followers_count'))
+    engagement = dict(
+        Like.objects.filter(post__user_id__in=candidate_ids, created_at__gte=since)
+        .values('post__user_id')
+        .annotate(total=Count('id'))
+        .values_list('post__user_id', 'total')
+    )
+    return {
+        candidate_id: (followers_count, engagement.get(candidate_id, 0))
+        for candidate_id, followers_count in followers.items()
+    }
+
+
+def score_candidate(mutual, followers_count, recent_likes):
+    return (
+        FOF_WEIGHT * mutual
+        + POPULARITY_WEIGHT * math.log1p(followers_count)
+        + ENGAGEMENT_WEIGHT * math.log1p(recent_likes)
+    )
+
+
+def compute_suggestions(user_ids, top_k=None, popular_ids=()):
+    """Recalcula e substitui as sugestões de `user_ids`; retorna quantas linhas foram gravadas."""
+    top_k = top_k or get_top_k()
+    since = timezone.now() - timedelta(days=getattr(settings, 'FOLLOW_SUGGESTIONS_ENGAGEMENT_DAYS', 7))
+    following = _following_by_user(user_ids)
+    mutual = _mutual_counts(user_ids)
+
+    candidate_ids = set(popular_ids)
+    for counts in mutual.values():
+        candidate_ids.update(counts)
+    features = _candidate_features(candidate_ids, since)
+
+    suggestions = []
+    for user_id in user_ids:
+        excluded = following[user_id] | {user_id}
+        candidates = (set(mutual[user_id]) | set(popular_ids)) - excluded
+        scored = (
+            (score_candidate(mutual[user_id].get(candidate_id, 0), *features[candidate_id]), candidate_id)
+            for candidate_id in candidates if candidate_id in features
+        )
+        best = heapq.nlargest(top_k, scored)
+        suggestions += [
+            FollowSuggestion(user_id=user_id, candidate_id=candidate_id, rank=rank, score=score)
+            for rank, (score, candidate_id) in enumerate(best)
+        ]
+
+    with transaction.atomic():
+        FollowSuggestion.objects.filter(user_id__in=user_ids).delete()
+        FollowSuggestion.objects.bulk_create(suggestions, batch_size=1000)
+    return len(suggestions)
+
+
+def compute_all_suggestions(batch_size=None, top_k=None):
+    """Percorre todos os usuários em lotes por id; retorna quantos usuários foram processados."""
+    batch_size = batch_size or get_batch_size()
+    pool_size = getattr(settings, 'FOLLOW_SUGGESTIONS_POPULAR_POOL', 200)
+    popular_ids = list(User.objects.order_by('-followers_count').values_list('id', flat=True)[:pool_size])
+
+    processed = 0
+    last_id = 0
+    while True:
+        user_ids = list(User.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size])
+        if not user_ids:
+            break
+        compute_suggestions(user_ids, top_k, popular_ids)
+        processed += len(user_ids)
+        last_id = user_ids[-1]
+    return processed
+
+
+# --- Leitura ---
+
+def _random_offset_users(user, limit, exclude_ids):
+    """`limit` usuários a partir de um id aleatório (com volta ao início), fora de `exclude_ids`."""
+    max_id = User.objects.aggregate(max_id=Max('id'))['max_id']
+    if max_id is None:
+        return []
+    start = random.randint(1, max_id)
+    followed = Follow.objects.filter(follower=user).values('following_id')
+    users = User.objects.exclude(id__in=followed).exclude(id__in=exclude_ids | {user.pk})
+
+    picked = list(users.filter(id__gte=start).order_by('id')[:limit])
+    if len(picked) < limit:
+        picked += users.filter(id__lt=start).order_by('id')[:limit - len(picked)]
+    return picked
+
+
+def get_suggestions(user, limit):
+    """Primeiras `limit` sugestões pré-calculadas, completadas pelo fallback se faltarem."""
+    suggestions = list(
+        FollowSuggestion.objects.filter(user=user).select_related('candidate').order_by('rank')[:limit]
+    )
+    users = [suggestion.candidate for suggestion in suggestions]
+    if len(users) < limit:
+        users += _random_offset_users(user, limit - len(users), {candidate.pk for candidate in users})
+    return users
+
+
+def discard_suggestion(user_id, candidate_id):
+    """Remove a sugestão quando o usuário passa a seguir o candidato."""
+    FollowSuggestion.objects.filter(user_id=user_id, candidate_id=candidate_id).delete()
@@ -1,9 +1,19 @@
 # backend/src/users/tests.py
+import time
+from django.db import connection
+from django.db.models import F
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.auth import get_user_model # Para obter o modelo de usuário atual
 from rest_framework import status
-from rest_framework.test import APITestCase
+from config.testing import APITestCase
 from users.models import Follow # Importe o modelo Follow
+from posts.models import Post
+from users.models import FollowSuggestion
+from users.versioning import VERSION_KEY, get_cache
+from django.core.management import call_command
+from io import StringIO
 
 User = get_user_model() # Obtém o seu modelo de usuário customizado
 
@@ -297,4 +307,281 @@ class UserFollowTests(APITestCase):
             if item['username'] == self.another_user.username:
                 # O usuário logado (self.user) não segue 'another_user'
                 self.assertFalse(item['is_followed_by_viewer'])
-            # Todos os outros usuários nas sugestões não deveriam ser seguidos pelo viewer
\ No newline at end of file
+            # Todos os outros usuários nas sugestões não deveriam ser seguidos pelo viewer
+
+class ViewerFollowStateBatchingTests(APITestCase):
+
+    def setUp(self):
+        self.viewer = User.objects.create_user(
+            username='viewer', email='viewer@example.com', password='password123', display_name='Viewer'
+        )
+        self.celebrity = User.objects.create_user(
+            username='celebrity', email='celebrity@example.com', password='password123', display_name='Celebrity'
+        )
+        self.followers_url = reverse('user-followers-list', kwargs={'username': self.celebrity.username})
+
+    def _add_followers(self, count, followed_by_viewer):
+        start = User.objects.count()
+        for i in range(start, start + count):
+            fan = User.objects.create_user(
+                username=f'fan{i}', email=f'fan{i}@example.com', password='password123', display_name=f'Fan {i}'
+            )
+            Follow.objects.create(follower=fan, following=self.celebrity)
+            if followed_by_viewer:
+                Follow.objects.create(follower=self.viewer, following=fan)
+
+    def _get_followers(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.followers_url, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, len(queries.captured_queries)
+
+    def test_query_count_does_not_grow_with_list_size(self):
+        self.client.force_authenticate(user=self.viewer)
+        self._add_followers(2, followed_by_viewer=True)
+        _, small_count = self._get_followers()
+
+        self._add_followers(4, followed_by_viewer=False)
+        response, large_count = self._get_followers()
+
+        self.assertEqual(small_count, large_count)
+        followed = [item for item in response.data['results'] if item['is_followed_by_viewer']]
+        self.assertEqual(len(followed), 2)
+
+    def test_lists_are_cursor_paginated_by_follow_date(self):
+        self._add_followers(5, followed_by_viewer=False)
+        Follow.objects.create(follower=self.celebrity, following=self.viewer)
+        newest_first = list(
+            Follow.objects.filter(following=self.celebrity)
+            .order_by('-created_at', '-id').values_list('follower__username', flat=True)
+        )
+
+        response = self.client.get(self.followers_url, {'page_size': 3}, format='json')
+        usernames = [item['username'] for item in response.data['results']]
+        response = self.client.get(response.data['next'], format='json')
+        usernames += [item['username'] for item in response.data['results']]
+        self.assertEqual(usernames, newest_first)
+        self.assertIsNone(response.data['next'])
+
+        following_url = reverse('user-following-list', kwargs={'username': self.celebrity.username})
+        response = self.client.get(following_url, format='json')
+        self.assertEqual([item['username'] for item in response.data['results']], [self.viewer.username])
+
+    def test_unknown_user_returns_404(self):
+        response = self.client.get(reverse('user-followers-list', kwargs={'username': 'nobody'}), format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+class ProfileConditionalGetTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='polled', email='polled@example.com', password='password123', display_name='Polled'
+        )
+        self.viewer = User.objects.create_user(
+            username='poller', email='poller@example.com', password='password123', display_name='Poller'
+        )
+        self.me_url = reverse('me')
+        self.detail_url = reverse('user-detail', kwargs={'username': self.user.username})
+
+    def test_me_answers_304_until_profile_changes(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.me_url, format='json')
+        etag = response['ETag']
+        # A versão acabou de ser criada: uma mudança no mesmo segundo teria a mesma data
+        self.assertFalse(response.has_header('Last-Modified'))
+
+        response = self.client.get(self.me_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.put(reverse('user-update', kwargs={'id': self.user.id}), {'bio': 'New'}, format='json')
+        response = self.client.get(self.me_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_last_modified_once_the_version_settles(self):
+        settled = time.time_ns() - 5 * 10 ** 9
+        get_cache().set(VERSION_KEY.format(self.user.pk), settled, None)
+        self.client.force_authenticate(user=self.user)
+        last_modified = self.client.get(self.me_url, format='json')['Last-Modified']
+        response = self.client.get(self.me_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Mudança logo depois: sem data, o If-Modified-Since antigo não dá 304
+        self.client.put(reverse('user-update', kwargs={'id': self.user.id}), {'bio': 'New'}, format='json')
+        response = self.client.get(self.me_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_user_detail_304_costs_one_query_and_follow_invalidates(self):
+        self.client.force_authenticate(user=self.viewer)
+        etag = self.client.get(self.detail_url, format='json')['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.post(reverse('follow-user', kwargs={'id': self.user.id}), format='json')
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['is_followed_by_viewer'])
+
+    @override_settings(WEB_CONCURRENCY=4)
+    def test_no_validators_when_versions_are_per_worker(self):
+        self.client.force_authenticate(user=self.viewer)
+        response = self.client.get(self.detail_url, format='json')
+        self.assertFalse(response.has_header('ETag'))
+        self.assertFalse(response.has_header('Last-Modified'))
+
+
+class ProfileCacheTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='cached', email='cached@example.com', password='password123', display_name='Cached'
+        )
+        self.detail_url = reverse('user-detail', kwargs={'username': self.user.username})
+
+    def test_profile_is_served_from_cache_until_version_bump(self):
+        self.client.get(self.detail_url, format='json')
+        User.objects.filter(pk=self.user.pk).update(display_name='Behind the cache')
+        self.assertEqual(self.client.get(self.detail_url, format='json').data['display_name'], 'Cached')
+
+        self.client.force_authenticate(user=self.user)
+        self.client.put(reverse('user-update', kwargs={'id': self.user.id}), {'bio': 'Updated'}, format='json')
+        response = self.client.get(self.detail_url, format='json')
+        self.assertEqual(response.data['display_name'], 'Behind the cache')
+        self.assertEqual(response.data['bio'], 'Updated')
+
+    def test_saving_the_user_anywhere_bumps_the_version(self):
+        self.client.get(self.detail_url, format='json')
+        self.user.bio = 'Saved from the shell'
+        self.user.save()
+        self.assertEqual(self.client.get(self.detail_url, format='json').data['bio'], 'Saved from the shell')
+
+    @override_settings(WEB_CONCURRENCY=4)
+    def test_process_local_cache_is_bypassed_with_several_workers(self):
+        self.client.get(self.detail_url, format='json')
+        User.objects.filter(pk=self.user.pk).update(display_name='Seen by every worker')
+        self.assertEqual(self.client.get(self.detail_url, format='json').data['display_name'], 'Seen by every worker')
+
+        from users.checks import check_profile_cache
+        self.assertEqual([warning.id for warning in check_profile_cache(None)], ['config.W001'])
+
+    def test_follow_updates_counts_and_embedded_author(self):
+        post = Post.objects.create(user=self.user, text_content='Embedded author.')
+        post_url = reverse('post-detail', kwargs={'pk': post.id})
+        self.assertEqual(self.client.get(post_url, format='json').data['user']['followers_count'], 0)
+
+        follower = User.objects.create_user(
+            username='fan', email='fan@example.com', password='password123', display_name='Fan'
+        )
+        self.client.force_authenticate(user=follower)
+        self.client.post(reverse('follow-user', kwargs={'id': self.user.id}), format='json')
+
+        author = self.client.get(post_url, format='json').data['user']
+        self.assertEqual(author['followers_count'], 1)
+        self.assertTrue(author['is_followed_by_viewer'])
+        follower_url = reverse('user-detail', kwargs={'username': follower.username})
+        self.assertEqual(self.client.get(follower_url, format='json').data['following_count'], 1)
+
+
+class FollowSuggestionTests(APITestCase):
+
+    def setUp(self):
+        self.users = {
+            name: User.objects.create_user(
+                username=name, email=f'{name}@example.com', password='password123', display_name=name.title()
+            )
+            for name in ['viewer', 'friend', 'mutual', 'popular', 'loner']
+        }
+        self.follow('viewer', 'friend')
+        self.follow('friend', 'mutual')
+        self.follow('friend', 'popular')
+        self.follow('mutual', 'popular')
+        self.follow('loner', 'popular')
+        self.who_to_follow_url = reverse('who-to-follow')
+
+    def follow(self, follower, following):
+        Follow.objects.create(follower=self.users[follower], following=self.users[following])
+        User.objects.filter(pk=self.users[following].pk).update(followers_count=F('followers_count') + 1)
+
+    def suggested(self):
+        self.client.force_authenticate(user=self.users['viewer'])
+        response = self.client.get(self.who_to_follow_url, format='json')
+        return [item['username'] for item in response.data]
+
+    def test_batch_job_ranks_friends_of_friends_and_serves_top_k(self):
+        out = StringIO()
+        call_command('compute_suggestions', stdout=out)
+        self.assertIn('5 usuário(s)', out.getvalue())
+
+        ranked = list(
+            FollowSuggestion.objects.filter(user=self.users['viewer']).order_by('rank')
+            .values_list('candidate__username', flat=True)
+        )
+        # popular e mutual têm um seguido em comum, mas popular tem mais seguidores; loner vem só do grupo popular
+        self.assertEqual(ranked, ['popular', 'mutual', 'loner'])
+        self.assertEqual(self.suggested(), ['popular', 'mutual', 'loner'])
+
+    def test_follow_discards_suggestion(self):
+        call_command('compute_suggestions', stdout=StringIO())
+        self.client.force_authenticate(user=self.users['viewer'])
+        self.client.post(reverse('follow-user', kwargs={'id': self.users['popular'].id}), format='json')
+        self.assertNotIn('popular', self.suggested())
+
+    def test_new_user_falls_back_to_random_offset(self):
+        suggested = self.suggested()
+        self.assertCountEqual(suggested, ['mutual', 'popular', 'loner'])
+
+class UserTypeaheadTests(APITestCase):
+
+    def setUp(self):
+        self.viewer = User.objects.create_user(
+            username='viewer', email='viewer@example.com', password='password123', display_name='Viewer'
+        )
+        self.users = {
+            username: User.objects.create_user(
+                username=username, email=f'{username}@example.com', password='password123', display_name=display_name
+            )
+            for username, display_name in [('joana', 'Joana Souza'), ('jsilva', 'João Silva'), ('jonas', 'Jonas'), ('maria', 'Maria')]
+        }
+        User.objects.filter(username='jsilva').update(followers_count=5)
+        User.objects.filter(username='jonas').update(followers_count=2)
+        call_command('rebuild_typeahead_index', '--ranks', stdout=StringIO())
+        Follow.objects.create(follower=self.viewer, following=self.users['joana'])
+        self.typeahead_url = reverse('user-typeahead')
+
+    def search(self, query, **params):
+        response = self.client.get(self.typeahead_url, {'q': query, **params}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item['username'] for item in response.data]
+
+    def test_prefix_matches_username_and_display_name_words_by_popularity(self):
+        # "jo" casa com o username de jonas/joana e com "João", sem acento
+        self.assertEqual(self.search('jo'), ['jsilva', 'jonas', 'joana'])
+        self.assertEqual(self.search('SOUZ'), ['joana'])
+        self.assertEqual(self.search('joão s'), ['jsilva'])
+        self.assertEqual(self.search('  '), [])
+
+    def test_followed_users_come_first_with_viewer_state(self):
+        self.client.force_authenticate(user=self.viewer)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.typeahead_url, {'q': '@jo'}, format='json')
+        self.assertEqual([item['username'] for item in response.data], ['joana', 'jsilva', 'jonas'])
+        self.assertEqual([item['is_followed_by_viewer'] for item in response.data], [True, False, False])
+        # Seguidos + populares; o estado de follow sai da própria consulta
+        self.assertEqual(len(queries), 2)
+
+    @override_settings(TYPEAHEAD_MAX_RESULTS=2)
+    def test_limit_is_capped(self):
+        self.assertEqual(self.search('jo', limit=1), ['jsilva'])
+        self.assertEqual(self.search('jo', limit=50), ['jsilva', 'jonas'])
+
+    def test_renaming_reindexes_prefixes(self):
+        user = self.users['maria']
+        user.display_name = 'Maria Joaquina'
+        user.save()
+        self.assertIn('maria', self.search('joaq'))
+        user.username = 'mjoaquina'
+        user.save(update_fields=['username'])
+        self.assertEqual(self.search('mar'), ['mjoaquina'])
+        self.assertEqual(self.search('maria j'), ['mjoaquina'])
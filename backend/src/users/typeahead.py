@@ -0,0 +1,116 @@
+# backend/src/users/typeahead.py
+"""
+Autocompletar de usuários (menções e caixa de busca) sobre username e
+display_name.
+
+Cada usuário tem uma linha em UserSearchPrefix para cada prefixo normalizado
+(minúsculas, sem acentos) do username, do display_name e de cada palavra do
+display_name, com o followers_count copiado. Uma busca é então uma igualdade
+no prefixo lida já na ordem de popularidade pelo índice
+(prefix, -followers_count, user): LIMIT n linhas, qualquer que seja o tamanho
+da base ou do conjunto de usuários que casam.
+
+Quem o viewer segue vem primeiro: uma segunda consulta parte dos seus follows
+e confere o prefixo pela chave única (prefix, user).
+
+Os prefixos são mantidos pelo signal de User; o followers_count copiado é
+acertado por `rebuild_typeahead_index --ranks` (cron), já que os contadores
+mudam por UPDATE em lote, sem signals.
+"""
+import re
+import unicodedata
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery
+
+from .models import Follow, User, UserSearchPrefix
+
+PREFIX_MAX_LENGTH = UserSearchPrefix._meta.get_field('prefix').max_length
+TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+def get_max_results():
+    return getattr(settings, 'TYPEAHEAD_MAX_RESULTS', 10)
+
+
+def normalize(text):
+    """Minúsculas, sem acentos e com espaços colapsados."""
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ' '.join(''.join(char for char in decomposed if not unicodedata.combining(char)).split())
+
+
+def normalize_query(query):
+    return normalize(query.lstrip().lstrip('@'))[:PREFIX_MAX_LENGTH]
+
+
+def user_prefixes(username, display_name):
+    name = normalize(display_name)
+    keys = {normalize(username), name, *TOKEN.findall(name)} - {''}
+    return {key[:length] for key in keys for length in range(1, min(len(key), PREFIX_MAX_LENGTH) + 1)}
+
+
+# --- Manutenção do índice ---
+
+def _prefix_rows(users):
+    return [
+        UserSearchPrefix(prefix=prefix, user_id=user.pk, followers_count=user.followers_count)
+        for user in users
+        for prefix in sorted(user_prefixes(user.username, user.display_name))
+    ]
+
+
+def index_user(user):
+    with transaction.atomic():
+        UserSearchPrefix.objects.filter(user_id=user.pk).delete()
+        UserSearchPrefix.objects.bulk_create(_prefix_rows([user]))
+
+
+def rebuild_typeahead_index(batch_size=500):
+    """Regrava os prefixos de todos os usuários em lotes por faixa de id; retorna quantos foram indexados."""
+    indexed = 0
+    last_pk = 0
+    while True:
+        users = list(
+            User.objects.filter(pk__gt=last_pk).order_by('pk')
+            .only('id', 'username', 'display_name', 'followers_count')[:batch_size]
+        )
+        if not users:
+            return indexed
+        with transaction.atomic():
+            UserSearchPrefix.objects.filter(user_id__gte=users[0].pk, user_id__lte=users[-1].pk).delete()
+            UserSearchPrefix.objects.bulk_create(_prefix_rows(users), batch_size=batch_size * 10)
+        indexed += len(users)
+        last_pk = users[-1].pk
+
+
+def refresh_typeahead_ranks():
+    """Copia o followers_count atual só para as linhas divergentes; retorna quantas mudaram."""
+    current = User.objects.filter(pk=OuterRef('user_id')).values('followers_count')[:1]
+    return (
+        UserSearchPrefix.objects.exclude(followers_count=F('user__followers_count'))
+        .update(followers_count=Subquery(current))
+    )
+
+
+# --- Consulta ---
+
+def typeahead(query, viewer=None, limit=None):
+    """
+    Até `limit` usuários que casam com `query`: primeiro os seguidos pelo
+    viewer, depois os demais, cada grupo por followers_count. Devolve
+    (usuários, ids seguidos entre eles).
+    """
+    prefix = normalize_query(query)
+    limit = max(1, min(limit or get_max_results(), get_max_results()))
+    if not prefix:
+        return [], set()
+
+    matches = UserSearchPrefix.objects.filter(prefix=prefix).select_related('user').order_by('-followers_count', 'user_id')
+    followed = []
+    if viewer is not None and viewer.is_authenticated:
+        following = Follow.objects.filter(follower=viewer).values('following_id')
+        followed = [row.user for row in matches.filter(user_id__in=following)[:limit]]
+    followed_ids = {user.pk for user in followed}
+    popular = [row.user for row in matches[:limit + len(followed)] if row.user_id not in followed_ids]
+    return (followed + popular)[:limit], followed_ids
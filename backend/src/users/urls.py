@@ -9,6 +9,7 @@ from .views import (
     follow_user,
     unfollow_user,
     who_to_follow,
+    user_typeahead,
     PasswordChangeView,
     UserFollowersListView,
     UserFollowingListView,
@@ -27,4 +28,5 @@ urlpatterns = [
     path('users/<str:username>/followers/', UserFollowersListView.as_view(), name='user-followers-list'),
     path('users/<str:username>/following/', UserFollowingListView.as_view(), name='user-following-list'),
     path('who-to-follow/', who_to_follow, name='who-to-follow'),
+    path('typeahead/', user_typeahead, name='user-typeahead'),
 ]
\ No newline at end of file
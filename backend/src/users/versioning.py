@@ -0,0 +1,60 @@
+# backend/src/users/versioning.py
+"""
+Carimbo de versão por usuário, guardado no cache do Django.
+
+O carimbo muda sempre que algo visível no perfil muda (edição, follows,
+troca de senha) e serve de validador barato para ETag/Last-Modified e de
+chave para caches de perfil. O valor é o instante da última mudança em
+nanossegundos, então também pode ser usado como data de modificação.
+
+Os carimbos precisam de um cache compartilhado entre os workers (ver
+config/caching.py): com LocMem e WEB_CONCURRENCY > 1, `is_enabled()` é False
+e quem depende deles (profile_cache, conditional) deixa de usá-los.
+"""
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import caches
+
+from config.caching import is_shared
+
+VERSION_KEY = 'profile:version:{}'
+
+
+def get_alias():
+    return getattr(settings, 'PROFILE_CACHE_ALIAS', 'default')
+
+
+def get_cache():
+    return caches[get_alias()]
+
+
+def is_enabled():
+    return is_shared(get_alias())
+
+
+def get_profile_versions(user_ids):
+    """{id: versão}; usuários sem carimbo recebem um novo (o instante atual)."""
+    cache = get_cache()
+    keys = {VERSION_KEY.format(user_id): user_id for user_id in user_ids}
+    versions = {keys[key]: version for key, version in cache.get_many(list(keys)).items()}
+    for key, user_id in keys.items():
+        if user_id not in versions:
+            candidate = time.time_ns()
+            cache.add(key, candidate, None)
+            versions[user_id] = cache.get(key) or candidate
+    return versions
+
+
+def get_profile_version(user_id):
+    return get_profile_versions([user_id])[user_id]
+
+
+def bump_profile_version(*user_ids):
+    now = time.time_ns()
+    get_cache().set_many({VERSION_KEY.format(user_id): now for user_id in user_ids}, None)
+
+
+def version_to_datetime(version):
+    return datetime.fromtimestamp(version / 1e9, tz=timezone.utc)
@@ -1,5 +1,7 @@
 # backend/src/users/views.py
 from django.shortcuts import get_object_or_404
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from django.db.models import F
 
 from rest_framework import status
@@ -8,10 +10,16 @@ from rest_framework.response import Response
 from rest_framework.generics import RetrieveAPIView, ListAPIView
 from rest_framework.decorators import api_view, permission_classes 
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly 
-from django.db.models import F, Subquery, OuterRef
 
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from posts.pagination import KeysetPagination
+from posts.sharded_counters import USER_FOLLOWERS
+from .conditional import me_validators, user_detail_validators
+from .suggestions import discard_suggestion, get_suggestions
+from .typeahead import typeahead
+from .versioning import bump_profile_version
+
 from .models import User, Follow
 from .serializers import (
     RegisterSerializer,
@@ -20,6 +28,7 @@ from .serializers import (
     UserUpdateSerializer,
     SuggestedUserSerializer,
     PasswordChangeSerializer, 
+    ViewerFollowState,
 )
 
 
@@ -67,6 +76,10 @@ class LoginView(APIView):
 class MeView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @method_decorator(condition(
+        etag_func=lambda request: me_validators(request)[0],
+        last_modified_func=lambda request: me_validators(request)[1],
+    ))
     def get(self, request):
         serializer = UserSerializer(request.user, context={'request': request}) # Passar request para o serializer
         return Response(serializer.data)
@@ -76,6 +89,13 @@ class UserDetailView(RetrieveAPIView):
     serializer_class = UserSerializer
     lookup_field = 'username'
 
+    @method_decorator(condition(
+        etag_func=lambda request, username: user_detail_validators(request, username)[0],
+        last_modified_func=lambda request, username: user_detail_validators(request, username)[1],
+    ))
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
     def get_object(self):
         queryset = self.filter_queryset(self.get_queryset())
         filter_kwargs = {self.lookup_field: self.kwargs[self.lookup_field]}
@@ -132,7 +152,9 @@ def follow_user(request, id):
     
     if created:
         User.objects.filter(id=request.user.id).update(following_count=F('following_count') + 1)
-        User.objects.filter(id=target_user.id).update(followers_count=F('followers_count') + 1)
+        USER_FOLLOWERS.add(target_user.id, 1, current_value=target_user.followers_count)
+        bump_profile_version(request.user.id, target_user.id)
+        discard_suggestion(request.user.id, target_user.id)
         return Response({'status': 'followed'}, status=status.HTTP_200_OK)
     else:
         return Response({'detail': 'Você já segue este usuário.'}, status=status.HTTP_409_CONFLICT)
@@ -145,8 +167,10 @@ def unfollow_user(request, id):
     deleted_count, _ = Follow.objects.filter(follower=request.user, following=target_user).delete()
     
     if deleted_count > 0:
-        User.objects.filter(id=request.user.id).update(following_count=F('following_count') - 1)
-        User.objects.filter(id=target_user.id).update(followers_count=F('followers_count') - 1)
+        # O filtro evita decrementar abaixo de zero quando o contador já divergiu
+        User.objects.filter(id=request.user.id, following_count__gt=0).update(following_count=F('following_count') - 1)
+        USER_FOLLOWERS.add(target_user.id, -1, current_value=target_user.followers_count)
+        bump_profile_version(request.user.id, target_user.id)
         return Response({'status': 'unfollowed'}, status=status.HTTP_200_OK)
     else:
         return Response({'detail': 'Você não segue este usuário.'}, status=status.HTTP_404_NOT_FOUND)
@@ -154,61 +178,56 @@ def unfollow_user(request, id):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def who_to_follow(request):
-    user = request.user
-
-    following_ids = Follow.objects.filter(follower=user).values_list('following_id', flat=True)
-
-    suggestions = User.objects.exclude(id__in=following_ids).exclude(id=user.id).order_by('?')[:5]
+    # Lidas do top-K pré-calculado por `compute_suggestions`, sem ordenar a tabela de usuários
+    suggestions = get_suggestions(request.user, limit=5)
     
     serializer = SuggestedUserSerializer(suggestions, many=True, context={'request': request})
     return Response(serializer.data)
 
-class UserFollowersListView(ListAPIView):
+@api_view(['GET'])
+@permission_classes([IsAuthenticatedOrReadOnly])
+def user_typeahead(request):
+    # Autocompletar de menções/busca: igualdade no prefixo lida na ordem do índice (users/typeahead.py)
+    try:
+        limit = int(request.query_params['limit'])
+    except (KeyError, ValueError):
+        limit = None
+    users, followed_ids = typeahead(request.query_params.get('q', ''), request.user, limit)
+    if request.user.is_authenticated:
+        ViewerFollowState.for_request(request).resolve([user.pk for user in users], followed_ids)
+
+    serializer = UserSerializer(users, many=True, context={'request': request})
+    return Response(serializer.data)
+
+class FollowListView(ListAPIView):
+    """
+    Base das listas de seguidores/seguidos: parte de Follow, junta o usuário do
+    outro lado e pagina por (created_at, id) do follow. Cada página é uma
+    varredura de intervalo no índice composto, mesmo com milhões de seguidores.
+    """
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = KeysetPagination
+    owner_field = None  # lado do follow que aponta para o dono da lista
+    listed_field = None  # lado do follow que aponta para o usuário listado
 
     def get_queryset(self):
-        username = self.kwargs.get('username')
-        user = get_object_or_404(User, username=username)
-        queryset = Follow.objects.filter(following=user)
-        users_with_follow_date = User.objects.filter(
-            id__in=queryset.values_list('follower__id', flat=True) 
-        ).annotate(
-            # Adiciona um campo temporário 'follow_date' com a data do follow
-            follow_date=Subquery(
-                queryset.filter(follower=OuterRef('pk')).values('created_at')[:1]
-            )
-        ).order_by('-follow_date') # Ordena por essa data
-
-        return users_with_follow_date
-
-    def get_serializer_context(self):
-        context = super().get_serializer_context()
-        context['request'] = self.request
-        return context
+        user = get_object_or_404(User.objects.only('id'), username=self.kwargs.get('username'))
+        return Follow.objects.filter(**{self.owner_field: user}).select_related(self.listed_field)
 
+    def list(self, request, *args, **kwargs):
+        follows = self.paginate_queryset(self.get_queryset())
+        # O estado de follow do viewer é resolvido em lote pelo UserListSerializer
+        users = [getattr(follow, self.listed_field) for follow in follows]
+        serializer = self.get_serializer(users, many=True)
+        return self.get_paginated_response(serializer.data)
 
-class UserFollowingListView(ListAPIView):
-    serializer_class = UserSerializer
-    permission_classes = [IsAuthenticatedOrReadOnly]
 
-    def get_queryset(self):
-        username = self.kwargs.get('username')
-        user = get_object_or_404(User, username=username)
-        
-        queryset = Follow.objects.filter(follower=user) # Quem 'user' segue
-        
-        users_with_follow_date = User.objects.filter(
-            id__in=queryset.values_list('following__id', flat=True)
-        ).annotate(
-            follow_date=Subquery(
-                queryset.filter(following=OuterRef('pk')).values('created_at')[:1]
-            )
-        ).order_by('-follow_date')
-
-        return users_with_follow_date
-
-    def get_serializer_context(self):
-        context = super().get_serializer_context()
-        context['request'] = self.request
-        return context
\ No newline at end of file
+class UserFollowersListView(FollowListView):
+    owner_field = 'following'
+    listed_field = 'follower'
+
+
+class UserFollowingListView(FollowListView):
+    owner_field = 'follower'
+    listed_field = 'following'
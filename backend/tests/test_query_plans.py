@@ -0,0 +1,213 @@
+# backend/tests/test_query_plans.py
+"""
+Regressão de consultas dos endpoints quentes.
+
+Para cada endpoint, fixamos quantas consultas a resposta custa (assertNumQueries)
+e que esse número não cresce com o tamanho da página (N+1), e passamos cada
+SELECT executado por EXPLAIN para garantir que as tabelas grandes são lidas por
+índice: nada de varredura completa nem ordenação em tabela temporária.
+
+Rodar a partir de backend/src:
+
+    python manage.py test ../tests
+"""
+import re
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from config.testing import APITestCase
+
+from posts.models import Comment, Like, Post, PostHashtag
+from posts.trends import TrendsWorker
+from users.models import Follow, FollowSuggestion, User
+
+# Tabelas que crescem com o uso e nunca devem ser varridas por inteiro
+HOT_TABLES = {
+    Post._meta.db_table,
+    Like._meta.db_table,
+    Comment._meta.db_table,
+    Follow._meta.db_table,
+    FollowSuggestion._meta.db_table,
+    'posts_timelineentry',
+    PostHashtag._meta.db_table,
+}
+
+SQLITE_FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+POSTGRES_FULL_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+def explain(sql):
+    """Linhas do plano de execução de `sql` (já com os parâmetros interpolados)."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+        cursor.execute(f'EXPLAIN {sql}')
+        return [row[0] for row in cursor.fetchall()]
+
+
+def plan_problems(plan):
+    """Varreduras completas de tabelas quentes e ordenações fora de índice encontradas em `plan`."""
+    pattern = SQLITE_FULL_SCAN if connection.vendor == 'sqlite' else POSTGRES_FULL_SCAN
+    problems = []
+    for line in plan:
+        match = pattern.search(line.strip())
+        if match and match.group(1) in HOT_TABLES:
+            problems.append(line.strip())
+        if 'TEMP B-TREE FOR ORDER BY' in line:
+            problems.append(line.strip())
+    return problems
+
+
+class QueryPlanTestCase(APITestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        if connection.vendor == 'postgresql':
+            # Com poucas linhas o planner prefere Seq Scan; desligado, ele só aparece sem índice utilizável
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = off')
+
+    @classmethod
+    def tearDownClass(cls):
+        if connection.vendor == 'postgresql':
+            # O SET vale para a sessão: as classes seguintes na mesma conexão voltam ao padrão
+            with connection.cursor() as cursor:
+                cursor.execute('RESET enable_seqscan')
+        super().tearDownClass()
+
+    def create_user(self, username):
+        return User.objects.create_user(
+            username=username, email=f'{username}@example.com', password='password123', display_name=username.title()
+        )
+
+    def get(self, url, expected_queries, **params):
+        """GET que confere o número de consultas e o plano de cada SELECT."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            len(queries), expected_queries,
+            '\n'.join(query['sql'] for query in queries.captured_queries),
+        )
+        for query in queries.captured_queries:
+            if not query['sql'].lstrip().upper().startswith('SELECT'):
+                continue
+            plan = explain(query['sql'])
+            self.assertEqual(plan_problems(plan), [], f"{query['sql']}\n{plan}")
+        return response
+
+
+class PostEndpointQueryTests(QueryPlanTestCase):
+
+    def setUp(self):
+        self.author = self.create_user('author')
+        self.viewer = self.create_user('viewer')
+        self.client.force_authenticate(user=self.viewer)
+        self.client.post(reverse('follow-user', kwargs={'id': self.author.id}), format='json')
+        self.posts = [Post.objects.create(user=self.author, text_content=f'Post {i}') for i in range(3)]
+        for post in self.posts:
+            Like.objects.create(user=self.viewer, post=post)
+            Comment.objects.create(post=post, author=self.viewer, content='Comment')
+
+    def add_posts(self, count):
+        # As versões das timelines em cache só trocam no commit
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(count):
+                post = Post.objects.create(user=self.create_user(f'extra{Post.objects.count()}'), text_content='More')
+                Like.objects.create(user=self.viewer, post=post)
+                Comment.objects.create(post=self.posts[0], author=post.user, content='Another comment')
+
+    def test_global_timeline(self):
+        # página de posts com autor, likes do viewer e follow state
+        self.get(reverse('post-list-create'), 3)
+        self.add_posts(5)
+        self.get(reverse('post-list-create'), 3)
+
+    def test_user_timeline(self):
+        url = reverse('user-post-list', kwargs={'username': self.author.username})
+        self.get(url, 4)
+        self.get(url, 4, page_size=2)
+
+    def test_home_timeline(self):
+        # validadores do GET condicional (feed + estado); a página resolvida
+        # por eles é reaproveitada na resposta
+        url = reverse('post-following-list')
+        self.get(url, 6)
+        for _ in range(5):
+            Post.objects.create(user=self.author, text_content='Fan-out')
+        self.get(url, 6)
+
+    def test_post_detail(self):
+        self.get(reverse('post-detail', kwargs={'pk': self.posts[0].id}), 3)
+
+    def test_comment_list(self):
+        url = reverse('comment-list-create', kwargs={'post_id': self.posts[0].id})
+        self.get(url, 3)
+        self.add_posts(5)
+        self.get(url, 3)
+
+    def test_hashtag_feed(self):
+        # página de PostHashtag, os posts, likes do viewer e follow state
+        url = reverse('hashtag-post-list', kwargs={'name': 'deploy'})
+        for i in range(3):
+            Post.objects.create(user=self.author, text_content=f'#deploy {i}')
+        self.get(url, 4)
+        self.get(url, 4, page_size=2)
+
+    def test_trends(self):
+        Post.objects.create(user=self.author, text_content='#deploy')
+        TrendsWorker().tick()
+        response = self.get(reverse('trends'), 1)
+        self.assertEqual(response.data['results'], [{'hashtag': 'deploy', 'posts_count': 1}])
+
+
+class UserEndpointQueryTests(QueryPlanTestCase):
+
+    def setUp(self):
+        self.celebrity = self.create_user('celebrity')
+        self.viewer = self.create_user('viewer')
+        Follow.objects.create(follower=self.viewer, following=self.celebrity)
+        self.client.force_authenticate(user=self.viewer)
+
+    def add_followers(self, count):
+        for i in range(count):
+            fan = self.create_user(f'fan{User.objects.count()}')
+            Follow.objects.create(follower=fan, following=self.celebrity)
+            Follow.objects.create(follower=self.celebrity, following=fan)
+
+    def test_user_detail(self):
+        # validadores do GET condicional, o perfil e o follow state
+        self.get(reverse('user-detail', kwargs={'username': self.celebrity.username}), 3)
+
+    def test_me(self):
+        self.get(reverse('me'), 1)
+
+    def test_followers_and_following(self):
+        followers_url = reverse('user-followers-list', kwargs={'username': self.celebrity.username})
+        following_url = reverse('user-following-list', kwargs={'username': self.celebrity.username})
+        self.add_followers(2)
+        self.get(followers_url, 3)
+        self.get(following_url, 3)
+        self.add_followers(5)
+        self.get(followers_url, 3)
+        self.get(following_url, 3)
+
+    def test_who_to_follow(self):
+        # sugestões pré-calculadas (com o candidato) e follow state
+        self.add_followers(6)
+        FollowSuggestion.objects.bulk_create([
+            FollowSuggestion(user=self.viewer, candidate=fan, rank=rank, score=1.0)
+            for rank, fan in enumerate(User.objects.filter(username__startswith='fan'))
+        ])
+        response = self.get(reverse('who-to-follow'), 2)
+        self.assertEqual(len(response.data), 5)
+
+    def test_who_to_follow_fallback(self):
+        # sem sugestões: MAX(id), as duas faixas de ids a partir do ponto sorteado e follow state
+        self.add_followers(3)
+        response = self.get(reverse('who-to-follow'), 5)
+        self.assertEqual(len(response.data), 3)
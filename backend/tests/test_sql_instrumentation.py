@@ -0,0 +1,59 @@
+# backend/tests/test_sql_instrumentation.py
+"""Middleware de instrumentação de SQL (config/middleware.py)."""
+import json
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from config.testing import APITestCase
+
+from config.middleware import QueryRecorder, fingerprint
+from posts.models import Post
+from users.models import User
+
+
+class FingerprintTests(TestCase):
+
+    def test_in_lists_and_numbers_collapse_to_one_shape(self):
+        self.assertEqual(
+            fingerprint('SELECT 1 FROM t WHERE id IN (%s, %s, %s) LIMIT 21'),
+            fingerprint('SELECT 1 FROM t WHERE id IN (%s) LIMIT 5'),
+        )
+
+    def test_repeated_shapes_are_flagged_as_n_plus_one(self):
+        user = User.objects.create_user(
+            username='author', email='author@example.com', password='password123', display_name='Author'
+        )
+        posts = [Post.objects.create(user=user, text_content=f'Post {i}') for i in range(4)]
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            for post in posts:
+                Post.objects.filter(pk=post.pk).exists()
+            Post.objects.filter(pk=posts[0].pk).exists()
+
+        summary = recorder.summary(threshold=3)
+        self.assertEqual(summary['queries'], 5)
+        self.assertEqual(summary['duplicates'], 1)
+        self.assertEqual(len(summary['n_plus_one']), 1)
+        self.assertEqual(summary['n_plus_one'][0]['count'], 5)
+        self.assertIsNotNone(summary['slowest'])
+
+
+@override_settings(SQL_INSTRUMENTATION=True)
+class SQLInstrumentationMiddlewareTests(APITestCase):
+
+    def test_response_carries_server_timing_and_structured_log(self):
+        with self.assertLogs('sql_instrumentation', level='INFO') as logs:
+            response = self.client.get(reverse('post-list-create'), format='json')
+
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('1 queries', response['Server-Timing'])
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['path'], reverse('post-list-create'))
+        self.assertEqual(record['queries'], 1)
+        self.assertEqual(record['n_plus_one'], [])
+
+    @override_settings(SQL_INSTRUMENTATION=False)
+    def test_disabled_by_default(self):
+        response = self.client.get(reverse('post-list-create'), format='json')
+        self.assertFalse(response.has_header('Server-Timing'))
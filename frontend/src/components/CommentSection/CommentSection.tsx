@@ -7,6 +7,7 @@ import { useNavigate } from 'react-router-dom'
 import userdefault from '../../assets/images/default-avatar-icon-of-social-media-user-vector.jpg'
 import { useAuth } from '../../contexts/AuthContext'
 import api from '../../services/api'
+import { setPostLike } from '../../services/likes'
 import type { CommentType } from '../../types'
 import * as S from './styles'
 
@@ -75,7 +76,7 @@ export default function CommentSection({ postId }: CommentSectionProps) {
         console.warn('Você precisa estar logado para curtir um comentário.')
         return
       }
-      await api.post(`posts/${commentId}/like/`)
+      await setPostLike(commentId, !isCurrentlyLiked)
       console.log(
         `Comentário ${commentId} ${isCurrentlyLiked ? 'descurtido' : 'curtido'}.`
       )
@@ -13,6 +13,9 @@ interface MainFeedProps {
   feedType: 'forYou' | 'following'
   setFeedType: (type: 'forYou' | 'following') => void
   onLikeToggle: (postId: string | number, isCurrentlyLiked: boolean) => void
+  hasMorePosts: boolean
+  isLoadingMorePosts: boolean
+  onLoadMorePosts: () => void
 }
 
 const MainFeed: React.FC<MainFeedProps> = ({
@@ -22,7 +25,10 @@ const MainFeed: React.FC<MainFeedProps> = ({
   isLoadingPosts,
   feedType,
   setFeedType,
-  onLikeToggle
+  onLikeToggle,
+  hasMorePosts,
+  isLoadingMorePosts,
+  onLoadMorePosts
 }) => {
   const navigate = useNavigate()
   const { user } = useAuth()
@@ -67,6 +73,14 @@ const MainFeed: React.FC<MainFeedProps> = ({
           <Post key={post.id} post={post} onLikeToggle={onLikeToggle} />
         ))
       )}
+      {!isLoadingPosts && hasMorePosts && (
+        <S.LoadMoreButton
+          onClick={onLoadMorePosts}
+          disabled={isLoadingMorePosts}
+        >
+          {isLoadingMorePosts ? 'Carregando...' : 'Mostrar mais posts'}
+        </S.LoadMoreButton>
+      )}
       {!isLoadingPosts && posts.length === 0 && (
         <S.NoPostsMessage>Nenhuma postagem para exibir.</S.NoPostsMessage>
       )}
@@ -7,15 +7,19 @@ import LeftSidebar from '../../components/LeftSideBar/LeftSideBar'
 import MainFeed from '../../components/MainFeed/MainFeed'
 import RightSidebar from '../../components/RightSideBar/RightSideBar'
 import api from '../../services/api'
+import { setPostLike } from '../../services/likes'
 
 import { useAuth } from '../../contexts/AuthContext'
-import type { PostType } from '../../types'
+import type { PaginatedResponse, PostType } from '../../types'
 
 export default function FeedPage() {
   const navigate = useNavigate()
   const { user, isAuthenticated, isLoadingAuth } = useAuth()
 
   const [posts, setPosts] = useState<PostType[]>([])
+  // URL da próxima página (cursor), null quando não há mais posts
+  const [nextPage, setNextPage] = useState<string | null>(null)
+  const [isLoadingMorePosts, setIsLoadingMorePosts] = useState(false)
 
   const [showCreatePostModal, setShowCreatePostModal] = useState(false)
   const [feedType, setFeedType] = useState<'forYou' | 'following'>('forYou')
@@ -27,22 +31,27 @@ export default function FeedPage() {
       try {
         let response
         if (feedType === 'forYou') {
-          response = await api.get<PostType[]>('posts/')
+          response = await api.get<PaginatedResponse<PostType>>('posts/')
         } else {
           if (!isAuthenticated) {
             console.warn(
               'Usuário não autenticado. Não é possível carregar feed "Seguindo".'
             )
             setPosts([])
+            setNextPage(null)
             setIsLoadingPosts(false)
             return
           }
-          response = await api.get<PostType[]>('posts/following/')
+          response = await api.get<PaginatedResponse<PostType>>(
+            'posts/following/'
+          )
         }
-        setPosts(response.data)
+        setPosts(response.data.results)
+        setNextPage(response.data.next)
       } catch (error) {
         console.error('Erro ao buscar posts:', error)
         setPosts([])
+        setNextPage(null)
       } finally {
         setIsLoadingPosts(false)
       }
@@ -53,6 +62,20 @@ export default function FeedPage() {
     }
   }, [feedType, isAuthenticated, isLoadingAuth])
 
+  const handleLoadMorePosts = async () => {
+    if (!nextPage || isLoadingMorePosts) return
+    setIsLoadingMorePosts(true)
+    try {
+      const response = await api.get<PaginatedResponse<PostType>>(nextPage)
+      setPosts((prevPosts) => [...prevPosts, ...response.data.results])
+      setNextPage(response.data.next)
+    } catch (error) {
+      console.error('Erro ao buscar mais posts:', error)
+    } finally {
+      setIsLoadingMorePosts(false)
+    }
+  }
+
   const handlePostSubmit = async (text: string, imageFile?: File) => {
     try {
       if (!isAuthenticated) {
@@ -99,8 +122,11 @@ export default function FeedPage() {
       }
 
       if (feedType === 'following') {
-        const postsResponse = await api.get<PostType[]>('posts/following/')
-        setPosts(postsResponse.data)
+        const postsResponse = await api.get<PaginatedResponse<PostType>>(
+          'posts/following/'
+        )
+        setPosts(postsResponse.data.results)
+        setNextPage(postsResponse.data.next)
       }
     } catch (error) {
       console.error('Erro ao seguir/deixar de seguir:', error)
@@ -116,7 +142,7 @@ export default function FeedPage() {
         console.warn('Usuário não autenticado. Não é possível curtir.')
         return
       }
-      await api.post(`posts/${postId}/like/`)
+      const { data } = await setPostLike(postId, !isCurrentlyLiked)
       console.log(
         `Post ${postId} ${isCurrentlyLiked ? 'descurtido' : 'curtido'}.`
       )
@@ -126,10 +152,8 @@ export default function FeedPage() {
           if (post.id === postId) {
             return {
               ...post,
-              is_liked_by_viewer: !isCurrentlyLiked,
-              likes_count: isCurrentlyLiked
-                ? post.likes_count - 1
-                : post.likes_count + 1
+              is_liked_by_viewer: data.liked,
+              likes_count: data.likes_count
             }
           }
           return post
@@ -170,6 +194,9 @@ export default function FeedPage() {
         feedType={feedType}
         setFeedType={setFeedType}
         onLikeToggle={handleLikeToggle}
+        hasMorePosts={nextPage !== null}
+        isLoadingMorePosts={isLoadingMorePosts}
+        onLoadMorePosts={handleLoadMorePosts}
       />
 
       <RightSidebar onFollowUser={handleFollowUser} />
@@ -11,7 +11,11 @@ import LeftSidebar from '../../components/LeftSideBar/LeftSideBar'
 import RightSidebar from '../../components/RightSideBar/RightSideBar'
 
 // Importar tipos
-import type { UserToFollowType, AuthSuccessResponse } from '../../types'
+import type {
+  UserToFollowType,
+  AuthSuccessResponse,
+  PaginatedResponse
+} from '../../types'
 import { AxiosError } from 'axios'
 
 type ProfileUserType = AuthSuccessResponse['user']
@@ -24,6 +28,8 @@ export default function FollowsListPage() {
 
   const [profileUser, setProfileUser] = useState<ProfileUserType | null>(null)
   const [followsList, setFollowsList] = useState<UserToFollowType[]>([])
+  const [nextListPage, setNextListPage] = useState<string | null>(null)
+  const [isLoadingMore, setIsLoadingMore] = useState(false)
   const [isLoadingList, setIsLoadingList] = useState(true)
   const [activeTab, setActiveTab] = useState<'followers' | 'following'>(
     'followers'
@@ -48,20 +54,16 @@ export default function FollowsListPage() {
         )
         setProfileUser(profileResponse.data)
 
-        let listResponse
-        if (activeTab === 'followers') {
-          listResponse = await api.get<UserToFollowType[]>(
-            `users/${username}/followers/`
-          )
-        } else {
-          listResponse = await api.get<UserToFollowType[]>(
-            `users/${username}/following/`
-          )
-        }
-        setFollowsList(listResponse.data)
+        // As listas são paginadas: { next, previous, results }
+        const listResponse = await api.get<PaginatedResponse<UserToFollowType>>(
+          `users/${username}/${activeTab}/`
+        )
+        setFollowsList(listResponse.data.results)
+        setNextListPage(listResponse.data.next)
       } catch (error) {
         console.error('Erro ao buscar lista de seguidores/seguidos:', error)
         setFollowsList([])
+        setNextListPage(null)
         setProfileUser(null)
         if (error instanceof AxiosError && error.response?.status === 404) {
           navigate('/not-found')
@@ -84,6 +86,22 @@ export default function FollowsListPage() {
     }
   }, [username, activeTab, isAuthenticated, isLoadingAuth, navigate]) // Dependências atualizadas
 
+  const handleLoadMore = async () => {
+    if (!nextListPage || isLoadingMore) return
+    setIsLoadingMore(true)
+    try {
+      const response = await api.get<PaginatedResponse<UserToFollowType>>(
+        nextListPage
+      )
+      setFollowsList((prev) => [...prev, ...response.data.results])
+      setNextListPage(response.data.next)
+    } catch (error) {
+      console.error('Erro ao buscar mais seguidores/seguidos:', error)
+    } finally {
+      setIsLoadingMore(false)
+    }
+  }
+
   // === Handler para seguir/deixar de seguir (passado para UserListItem) ===
   const handleFollowUser = async (
     userId: number | string,
@@ -204,6 +222,11 @@ export default function FollowsListPage() {
             </S.UserListItem>
           ))
         )}
+        {!isLoadingList && nextListPage && (
+          <S.LoadMoreButton onClick={handleLoadMore} disabled={isLoadingMore}>
+            {isLoadingMore ? 'Carregando...' : 'Mostrar mais'}
+          </S.LoadMoreButton>
+        )}
       </S.FollowsMainContent>
 
       <RightSidebar onFollowUser={handleFollowUser} />
@@ -196,3 +196,22 @@ export const NoContentMessage = styled.div`
   color: ${colors.lightGray};
   font-size: 16px;
 `
+
+export const LoadMoreButton = styled.button`
+  padding: 16px;
+  background: none;
+  border: none;
+  border-bottom: 1px solid #2f3336;
+  color: #1d9bf0;
+  font-size: 15px;
+  cursor: pointer;
+
+  &:hover {
+    background-color: #080808;
+  }
+
+  &:disabled {
+    color: ${colors.lightGray};
+    cursor: default;
+  }
+`
@@ -4,6 +4,7 @@ import { FiArrowLeft } from 'react-icons/fi'
 import { useNavigate, useParams } from 'react-router-dom'
 import { useAuth } from '../../contexts/AuthContext'
 import api from '../../services/api'
+import { setPostLike } from '../../services/likes'
 import * as S from './styles'
 
 import CommentSection from '../../components/CommentSection/CommentSection'
@@ -30,16 +31,14 @@ export default function PostDetailPage() {
         return
       }
 
-      await api.post(`posts/${postId}/like/`)
+      const { data } = await setPostLike(postId, !isCurrentlyLiked)
 
       setPost((prevPost) => {
         if (!prevPost) return prevPost
         return {
           ...prevPost,
-          is_liked_by_viewer: !isCurrentlyLiked,
-          likes_count: isCurrentlyLiked
-            ? prevPost.likes_count - 1
-            : prevPost.likes_count + 1
+          is_liked_by_viewer: data.liked,
+          likes_count: data.likes_count
         }
       })
     } catch (error) {
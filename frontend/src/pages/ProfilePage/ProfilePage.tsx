@@ -5,6 +5,7 @@ import { FiArrowLeft, FiCalendar, FiLink, FiMapPin } from 'react-icons/fi'
 import { useNavigate, useParams } from 'react-router-dom'
 import { useAuth } from '../../contexts/AuthContext'
 import api from '../../services/api'
+import { setPostLike } from '../../services/likes'
 import * as S from './styles'
 
 import LeftSidebar from '../../components/LeftSideBar/LeftSideBar'
@@ -15,7 +16,11 @@ import { AxiosError } from 'axios'
 import Button from '../../components/Button/Button'
 import ChangePasswordModal from '../../components/ChangePasswordModal/ChangePasswordModal'
 import EditProfileModal from '../../components/EditProfileModal/EditProfileModal'
-import type { AuthSuccessResponse, PostType } from '../../types'
+import type {
+  AuthSuccessResponse,
+  PaginatedResponse,
+  PostType
+} from '../../types'
 
 type ProfileUserType = AuthSuccessResponse['user']
 
@@ -31,6 +36,8 @@ export default function ProfilePage() {
 
   const [profileUser, setProfileUser] = useState<ProfileUserType | null>(null)
   const [userPosts, setUserPosts] = useState<PostType[]>([])
+  const [nextPostsPage, setNextPostsPage] = useState<string | null>(null)
+  const [isLoadingMorePosts, setIsLoadingMorePosts] = useState(false)
   const [isLoadingProfile, setIsLoadingProfile] = useState(true)
   const [isLoadingPosts, setIsLoadingPosts] = useState(true)
   const [showEditProfileModal, setShowEditProfileModal] = useState(false)
@@ -68,11 +75,15 @@ export default function ProfilePage() {
     const fetchUserPosts = async () => {
       setIsLoadingPosts(true)
       try {
-        const response = await api.get<PostType[]>(`/users/${username}/posts`)
-        setUserPosts(response.data)
+        const response = await api.get<PaginatedResponse<PostType>>(
+          `/users/${username}/posts`
+        )
+        setUserPosts(response.data.results)
+        setNextPostsPage(response.data.next)
       } catch (error) {
         console.error('Erro ao buscar posts do usuário:', error)
         setUserPosts([])
+        setNextPostsPage(null)
       } finally {
         setIsLoadingPosts(false)
       }
@@ -84,6 +95,22 @@ export default function ProfilePage() {
     }
   }, [username, navigate])
 
+  const handleLoadMorePosts = async () => {
+    if (!nextPostsPage || isLoadingMorePosts) return
+    setIsLoadingMorePosts(true)
+    try {
+      const response = await api.get<PaginatedResponse<PostType>>(
+        nextPostsPage
+      )
+      setUserPosts((prevPosts) => [...prevPosts, ...response.data.results])
+      setNextPostsPage(response.data.next)
+    } catch (error) {
+      console.error('Erro ao buscar mais posts do usuário:', error)
+    } finally {
+      setIsLoadingMorePosts(false)
+    }
+  }
+
   const handleFollowUser = async (
     userId: number | string,
     isCurrentlyFollowing: boolean
@@ -134,16 +161,14 @@ export default function ProfilePage() {
         console.warn('Você precisa estar logado para curtir.')
         return
       }
-      await api.post(`posts/${postId}/like/`)
+      const { data } = await setPostLike(postId, !isCurrentlyLiked)
       setUserPosts((prevPosts) =>
         prevPosts.map((post) => {
           if (post.id === postId) {
             return {
               ...post,
-              is_liked_by_viewer: !isCurrentlyLiked,
-              likes_count: isCurrentlyLiked
-                ? post.likes_count - 1
-                : post.likes_count + 1
+              is_liked_by_viewer: data.liked,
+              likes_count: data.likes_count
             }
           }
           return post
@@ -331,6 +356,14 @@ export default function ProfilePage() {
             <Post key={post.id} post={post} onLikeToggle={handleLikeToggle} />
           ))
         )}
+        {!isLoadingPosts && nextPostsPage && (
+          <S.LoadMoreButton
+            onClick={handleLoadMorePosts}
+            disabled={isLoadingMorePosts}
+          >
+            {isLoadingMorePosts ? 'Carregando...' : 'Mostrar mais posts'}
+          </S.LoadMoreButton>
+        )}
       </S.ProfileMainContent>
 
       <RightSidebar onFollowUser={handleFollowUser} />
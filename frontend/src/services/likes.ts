@@ -0,0 +1,9 @@
+// src/services/likes.ts
+import api from './api'
+import type { LikeResponse } from '../types'
+
+// PUT curte e DELETE descurte: repetir a mesma chamada (retry) não muda nada
+export const setPostLike = (postId: string | number, liked: boolean) =>
+  liked
+    ? api.put<LikeResponse>(`posts/${postId}/like/`)
+    : api.delete<LikeResponse>(`posts/${postId}/like/`)
@@ -66,6 +66,19 @@ export interface PostType {
   is_reposted_by_viewer?: boolean
 }
 
+export interface LikeResponse {
+  status: 'liked' | 'unliked'
+  liked: boolean
+  likes_count: number
+}
+
+// Listas paginadas por cursor: `next` já traz o cursor da página seguinte
+export interface PaginatedResponse<T> {
+  next: string | null
+  previous: string | null
+  results: T[]
+}
+
 export interface UserToFollowType {
   id: number | string
   avatar_url: string